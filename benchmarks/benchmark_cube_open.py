@@ -0,0 +1,76 @@
+"""Benchmark the latency of opening a cube.
+
+Opening many run files (e.g., to scan the metadata of an ensemble) is
+dominated by the time to open each cube. This script reports the median
+time to open a :obj:`~deltametrics.cube.DataCube`, with and without
+``fast_open``, and to read its metadata.
+
+Run with the path of a file to open, or without arguments to open a
+synthetic file, e.g.::
+
+    $ python benchmarks/benchmark_cube_open.py pyDeltaRCM_output.nc
+"""
+import os
+import sys
+import tempfile
+import timeit
+import warnings
+
+import numpy as np
+import xarray as xr
+
+import deltametrics as dm
+from deltametrics import io
+
+
+def _write_synthetic(data_path, shape=(100, 200, 300)):
+    """Write a synthetic file shaped like a pyDeltaRCM output file.
+    """
+    _t, _l, _w = shape
+    _dims = ('time', 'length', 'width')
+    _data = {var: (_dims, np.random.rand(*shape).astype(np.float32))
+             for var in ('eta', 'velocity', 'depth', 'discharge')}
+    _x, _y = np.meshgrid(np.arange(_w), np.arange(_l))
+    _coords = {'time': ('time', np.arange(_t) * 25000.),
+               'x': (('length', 'width'), _x),
+               'y': (('length', 'width'), _y)}
+    xr.Dataset(_data, coords=_coords).to_netcdf(data_path)
+    xr.Dataset({'L0': 3, 'N0': 9}).to_netcdf(data_path, mode='a',
+                                             group='meta')
+
+
+def _time_open(data_path, meta=False, number=50, repeat=5, **kwargs):
+    """Median time, in ms, to open a cube and read its shape.
+
+    If `meta` is True, the metadata of the cube is read too.
+    """
+    def _open():
+        # release the pooled handle, so every cube opens the file again
+        io._release_pooled(data_path)
+        _cube = dm.cube.DataCube(data_path, **kwargs)
+        if meta:
+            return _cube.shape, _cube.meta
+        return _cube.shape
+
+    _times = timeit.repeat(_open, number=number, repeat=repeat)
+    return np.median(_times) / number * 1e3
+
+
+def main(data_path=None):
+    warnings.simplefilter('ignore')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if data_path is None:
+            data_path = os.path.join(tmpdir, 'synthetic.nc')
+            _write_synthetic(data_path)
+
+        print('Opening: %s' % data_path)
+        for meta in (False, True):
+            print('  %s' % ('open, read metadata' if meta else 'open'))
+            print('    default:   %8.3f ms' % _time_open(data_path, meta))
+            print('    fast_open: %8.3f ms' % _time_open(data_path, meta,
+                                                         fast_open=True))
+        io._release_pooled(data_path)
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:2])
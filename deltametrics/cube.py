@@ -1,6 +1,7 @@
 import os
-import copy
 import abc
+import glob
+import shutil
 
 import numpy as np
 import xarray as xr
@@ -55,6 +56,7 @@ class CubeVariable():
         self.ndim = len(self.shape)
         variable = kwargs.pop('variable', None)
         self.variable = variable
+        self._dataio = kwargs.pop('dataio', None)
         coords = kwargs.pop('coords', None)
         if not coords:
             self.t, self.x, self.y = [np.arange(itm) for itm in self.shape]
@@ -77,7 +79,20 @@ class CubeVariable():
         slc : a `numpy` slice
             A valid `numpy` style slice. For example, :code:`[10, ...]`.
             Dimension validation is not performed before slicing.
+
+        .. note::
+            If a window of the variable has been read into memory (see
+            :meth:`~deltametrics.cube.BaseCube.read`), slices entirely inside
+            the window are taken from memory, and any other slices are taken
+            from the underlying data. Slices at a single time of a cube of a
+            dual-layout file are taken from the plan layout (see
+            :obj:`~deltametrics.io.rechunk`), and are read ahead if the cube
+            was created with ``prefetch``.
         """
+        if not (self._dataio is None):
+            _arr = self._dataio._read_slice(self.variable, self.shape, slc)
+            if not (_arr is None):
+                return _arr
         return self.data[slc]
 
 
@@ -98,17 +113,30 @@ class BaseCube(abc.ABC):
 
     """
 
-    def __init__(self, data, read=[], varset=None):
+    # dimension to concatenate several files along
+    _concat_dim = 'time'
+
+    def __init__(self, data, read=[], varset=None, chunks=None,
+                 cache_bytes=None, prefetch=None, fast_open=False,
+                 dtype=None):
         """Initialize the BaseCube.
 
         Parameters
         ----------
-        data : :obj:`str`, :obj:`dict`
+        data : :obj:`str`, :obj:`list`, :obj:`dict`, :obj:`xarray.Dataset`
             If data is type `str`, the string points to a NetCDF or HDF5 file
-            that can be read. Typically this is used to directly import files
-            output from the pyDeltaRCM model. Alternatively, pass a
+            (or a Zarr store, with extension ``.zarr``, or a directory of
+            memory-mapped arrays, with extension ``.mmap``) that can be read.
+            Typically this is used to directly import files output from the
+            pyDeltaRCM model. A `list` of NetCDF or HDF5 files, or a `str`
+            pattern matching several files (e.g., ``'run/output_*.nc'``), is
+            lazily concatenated along time (e.g., to stitch checkpoints of a
+            model run together). Alternatively, pass a
             :obj:`dict` with keys indicating variable names, and values with
-            corresponding t-x-y `ndarray` of data.
+            corresponding t-x-y `ndarray` of data (optionally with 1D arrays
+            of the coordinates ``'time'``, ``'x'``, and ``'y'``), or an
+            :obj:`xarray.Dataset`. The data are wrapped, not copied; see
+            :obj:`~deltametrics.io.DictIO`.
 
         read : :obj:`bool`, optional
             Which variables to read from dataset into memory. Special option
@@ -117,16 +145,63 @@ class BaseCube(abc.ABC):
         varset : :class:`~deltametrics.plot.VariableSet`, optional
             Pass a `~deltametrics.plot.VariableSet` instance if you wish
             to style this cube similarly to another cube.
+
+        chunks : :obj:`dict`, :obj:`int`, :obj:`str`, optional
+            Chunking to use when connecting to a file, so that slicing only
+            reads the blocks of data it touches. See
+            :obj:`~deltametrics.io.NetCDFIO` for valid options. Default is
+            `None`, which does not chunk the data.
+
+        cache_bytes : :obj:`int`, :obj:`float`, optional
+            Limit on the memory, in bytes, used by variables read into memory
+            with :meth:`read`. Least recently used variables are dropped from
+            memory to stay within the limit. Default is `None`, which does
+            not limit the memory used.
+
+        prefetch : :obj:`int`, optional
+            Number of time slices to read ahead from a NetCDF4 or HDF5 file.
+            See :obj:`~deltametrics.io.NetCDFIO`. Default is `None`, which
+            does not read ahead.
+
+        fast_open : :obj:`bool`, optional
+            Whether to read only the header of a NetCDF4 or HDF5 file when
+            opening the cube, and defer everything else until first access.
+            See :obj:`~deltametrics.io.NetCDFIO`. Default is `False`.
+
+        dtype : :obj:`str`, :obj:`numpy.dtype`, optional
+            Floating point type of arrays derived from the data of the cube,
+            e.g., ``'float32'``. Default is `None`, which uses ``float64``.
         """
+        self._dtype = _validate_dtype(dtype)
+
+        if (type(data) is str) and glob.has_magic(data):
+            # handle a pattern matching several files
+            _paths = sorted(glob.glob(data))
+            if len(_paths) == 0:
+                raise FileNotFoundError('No files match pattern: %s' % data)
+            data = _paths
+
         if type(data) is str:
             # handle a path to netCDF file
             self._data_path = data
-            self._connect_to_file(data_path=data)
+            self._connect_to_file(data_path=data, chunks=chunks,
+                                  cache_bytes=cache_bytes, prefetch=prefetch,
+                                  fast_open=fast_open)
+            self._read_meta_from_file()
+        elif isinstance(data, (list, tuple)):
+            # handle several netCDF files, concatenated lazily
+            self._data_path = list(data)
+            self._connect_to_file(data_path=self._data_path, chunks=chunks,
+                                  cache_bytes=cache_bytes, prefetch=prefetch,
+                                  fast_open=fast_open)
             self._read_meta_from_file()
-        elif type(data) is dict:
+        elif (type(data) is dict) or isinstance(data, xr.Dataset):
             # handle a dict, arrays set up already, make an io class to wrap it
+            _validate_io_options(data, prefetch, fast_open)
             self._data_path = None
-            raise NotImplementedError
+            self._dataio = io.DictIO(data, chunks=chunks,
+                                     cache_bytes=cache_bytes)
+            self._read_meta_from_file()
         elif isinstance(data, DataCube):
             # handle initializing one cube type from another
             self._data_path = data.data_path
@@ -141,7 +216,8 @@ class BaseCube(abc.ABC):
         if varset:
             self.varset = varset
         else:
-            self.varset = plot.VariableSet()
+            # the default is created on first access, see `varset`
+            self._varset = None
 
     @abc.abstractmethod
     def __getitem__(self, var):
@@ -152,17 +228,106 @@ class BaseCube(abc.ABC):
         """
         ...
 
-    def _connect_to_file(self, data_path):
+    def get_many(self, variables, index=Ellipsis):
+        """Get several variables at once.
+
+        The `index` is converted once, and applied to all variables, and the
+        data of all variables are then read together; for data stored in
+        chunks, each chunk is visited once for all variables. This is
+        equivalent to, but faster than, slicing each variable, i.e.,
+        ``cube[var][index]``.
+
+        Parameters
+        ----------
+        variables : :obj:`list` of :obj:`str`
+            Which variables to get. The variables must have the same
+            dimensions.
+
+        index : optional
+            Index applied to each variable, e.g., an `int`, `slice`, or
+            `tuple` of these, with the same meaning as slicing a
+            :obj:`~deltametrics.cube.CubeVariable`. Default is to get all
+            data of the variables.
+
+        Returns
+        -------
+        dataset : :obj:`xarray.Dataset`
+            Dataset with the data of each variable, in memory.
+
+        Examples
+        --------
+        Get the final elevation, velocity, and depth of a cube.
+
+        >>> golfcube = dm.sample_data.golf()
+        >>> final = golfcube.get_many(['eta', 'velocity', 'depth'], -1)
+        >>> final['eta'].shape
+        (100, 200)
+        """
+        if isinstance(variables, str):
+            variables = [variables]
+        _dataset = self._get_many_dataset(variables)
+        _dims = _dataset[variables[0]].dims
+        for var in variables:
+            if _dataset[var].dims != _dims:
+                raise ValueError(
+                    'Variables must have the same dimensions, but "%s" has '
+                    'dimensions %s and "%s" has dimensions %s.' % (
+                        variables[0], _dims, var, _dataset[var].dims))
+        return _dataset.isel(_index_to_indexers(index, _dims)).load()
+
+    def _get_many_dataset(self, variables):
+        """Dataset of (possibly lazy) variables for :meth:`get_many`.
+        """
+        return xr.Dataset({var: self[var].data for var in variables})
+
+    def _connect_to_file(self, data_path, chunks=None, cache_bytes=None,
+                         prefetch=None, fast_open=False):
         """Connect to file.
 
         This method is used internally to send the ``data_path`` to the
         correct IO handler.
         """
-        _, ext = os.path.splitext(data_path)
+        self._dataio = self._dataio_from_path(data_path, chunks=chunks,
+                                              cache_bytes=cache_bytes,
+                                              concat_dim=self._concat_dim,
+                                              prefetch=prefetch,
+                                              fast_open=fast_open)
+
+    @staticmethod
+    def _dataio_from_path(data_path, write=False, chunks=None,
+                          cache_bytes=None, concat_dim='time',
+                          prefetch=None, fast_open=False):
+        """Create the IO handler for a file.
+
+        This method is used internally to determine the correct IO handler
+        from the extension of ``data_path``. A `list` of paths is
+        concatenated along `concat_dim`. Reading ahead (`prefetch`) and
+        `fast_open` are only supported for a single NetCDF4 or HDF5 file.
+        """
+        _validate_io_options(data_path, prefetch, fast_open)
+
+        if isinstance(data_path, list):
+            _, ext = os.path.splitext(data_path[0])
+            _type = 'hdf5' if (ext == '.hdf5') else 'netcdf'
+            return io.MultiNetCDFIO(data_path, _type, write=write,
+                                    chunks=chunks, cache_bytes=cache_bytes,
+                                    concat_dim=concat_dim)
+
+        _, ext = os.path.splitext(os.path.normpath(data_path))
         if ext == '.nc':
-            self._dataio = io.NetCDFIO(data_path, 'netcdf')
+            return io.NetCDFIO(data_path, 'netcdf', write=write,
+                               chunks=chunks, cache_bytes=cache_bytes,
+                               prefetch=prefetch, fast_open=fast_open)
         elif ext == '.hdf5':
-            self._dataio = io.NetCDFIO(data_path, 'hdf5')
+            return io.NetCDFIO(data_path, 'hdf5', write=write,
+                               chunks=chunks, cache_bytes=cache_bytes,
+                               prefetch=prefetch, fast_open=fast_open)
+        elif ext == '.zarr':
+            return io.ZarrIO(data_path, 'zarr', write=write, chunks=chunks,
+                             cache_bytes=cache_bytes)
+        elif ext == '.mmap':
+            return io.MemmapIO(data_path, 'mmap', write=write, chunks=chunks,
+                               cache_bytes=cache_bytes)
         else:
             raise ValueError(
                 'Invalid file extension for "data_path": %s' % data_path)
@@ -175,35 +340,65 @@ class BaseCube(abc.ABC):
         """
         self._coords = self._dataio.known_coords
         self._variables = self._dataio.known_variables
+        # the coordinates are read on first access, see `_read_coordinates`
+        self._x, self._y, self._X, self._Y = None, None, None, None
+
+    def _read_coordinates(self):
+        """Read the x and y coordinates from file.
+
+        This method is used internally the first time the coordinates of the
+        cube are accessed, so that opening a cube does not read them.
+        """
         # if x is 2-D then we assume x and y are mesh grid values
         if np.ndim(self._dataio['x']) == 2:
             self._X = self._dataio['x']  # mesh grid of x values of cube
             self._Y = self._dataio['y']  # mesh grid of y values of cube
             self._x = np.copy(self._X[0, :].squeeze())  # array of xval of cube
             self._y = np.copy(self._Y[:, 0].squeeze())  # array of yval of cube
-        # if x is 1-D we do mesh-gridding
+        # if x is 1-D the mesh grids are broadcast on demand
         elif np.ndim(self._dataio['x']) == 1:
             self._x = self._dataio['x']  # array of xval of cube
             self._y = self._dataio['y']  # array of yval of cube
-            self._X, self._Y = np.meshgrid(self._x, self._y)  # mesh grids x&y
+            self._X, self._Y = None, None
 
-    def read(self, variables):
+    def read(self, variables, t=None, region=None):
         """Read variable into memory.
 
         Parameters
         ----------
         variables : :obj:`list` of :obj:`str`, :obj:`str`
             Which variables to read into memory.
+
+        t : :obj:`slice`, :obj:`int`, optional
+            Which times (indices along the first dimension) to read into
+            memory. Default is `None`, which reads all times.
+
+        region : :obj:`tuple` of :obj:`int`, optional
+            Which part of the domain to read into memory, as indices ``(y0,
+            y1, x0, x1)``. Default is `None`, which reads the entire domain.
+
+        Examples
+        --------
+        Read a window of the `eta` variable into memory. Slices of the
+        variable entirely inside the window are taken from memory, and any
+        other slices are read from the file.
+
+        >>> golfcube = dm.sample_data.golf()
+        >>> golfcube.read('eta', t=slice(50, 100), region=(0, 50, 0, 200))
+        >>> inside = golfcube['eta'][60:70, 10, :]  # from memory
+        >>> outside = golfcube['eta'][10, 10, :]  # from file
         """
         if variables is True:  # special case, read all variables
             variables = self.variables
         elif type(variables) is str:
             variables = [variables]
+        elif type(variables) is list:
+            pass
         else:
             raise TypeError('Invalid type for "variables": %s ' % variables)
 
         for var in variables:
-            self._dataio.read(var)
+            self._dataio.read(var, t=t, region=region)
 
     @property
     def meta(self):
@@ -215,8 +410,11 @@ class BaseCube(abc.ABC):
 
         Can be set with :code:`cube.varset = VariableSetInstance` where
         ``VariableSetInstance`` is a valid instance of
-        :class:`~deltametrics.plot.VariableSet`.
+        :class:`~deltametrics.plot.VariableSet`. If no instance was set, a
+        new default instance is created the first time it is accessed.
         """
+        if self._varset is None:
+            self._varset = plot.VariableSet()
         return self._varset
 
     @varset.setter
@@ -226,6 +424,15 @@ class BaseCube(abc.ABC):
         else:
             raise TypeError('Pass a valid VariableSet instance.')
 
+    @property
+    def dtype(self):
+        """Floating point type of arrays derived from the data of the cube.
+
+        For example, stratigraphy attributes and stratigraphy volumes. `None`
+        uses ``float64``.
+        """
+        return self._dtype
+
     @property
     def data_path(self):
         """:obj:`str` : Path connected to for file IO.
@@ -328,21 +535,43 @@ class BaseCube(abc.ABC):
     @property
     def x(self):
         """x-direction coordinate."""
+        if self._x is None:
+            self._read_coordinates()
         return self._x
 
     @property
     def X(self):
-        """x-direction mesh."""
+        """x-direction mesh.
+
+        If the cube has 1D coordinates, the mesh is a read-only view of
+        :obj:`x`, broadcast without copying.
+        """
+        if self._x is None:
+            self._read_coordinates()
+        if self._X is None:
+            return _broadcast_coordinate(self._x, 1,
+                                         (len(self._y), len(self._x)))
         return self._X
 
     @property
     def y(self):
         """y-direction coordinate."""
+        if self._y is None:
+            self._read_coordinates()
         return self._y
 
     @property
     def Y(self):
-        """y-direction mesh."""
+        """y-direction mesh.
+
+        If the cube has 1D coordinates, the mesh is a read-only view of
+        :obj:`y`, broadcast without copying.
+        """
+        if self._y is None:
+            self._read_coordinates()
+        if self._Y is None:
+            return _broadcast_coordinate(self._y, 0,
+                                         (len(self._y), len(self._x)))
         return self._Y
 
     @property
@@ -377,7 +606,93 @@ class BaseCube(abc.ABC):
         """Number of elements in data (HxLxW)."""
         return (self.H, self.L, self.W)
 
-    def export_frozen_variable(self, var, return_cube=False):
+    def to_file(self, data_path, variables=[], complevel=4, chunksizes=None,
+                compression=None, dtype=None):
+        """Write the cube to a file.
+
+        Writes the coordinates, metadata, and values of `variables` to a new
+        NetCDF4 (``.nc``) or HDF5 (``.hdf5``) file, a Zarr (``.zarr``)
+        store, or a directory of memory-mapped arrays (``.mmap``, see
+        :obj:`~deltametrics.io.MemmapIO`). A
+        :obj:`~deltametrics.cube.StratigraphyCube` additionally
+        writes its stratigraphy, so that it can be reloaded by passing the
+        path to :obj:`~deltametrics.cube.StratigraphyCube`. Values are
+        written one variable, and one block of chunks, at a time, so that
+        cubes larger than the available memory can be written.
+
+        Parameters
+        ----------
+        data_path : :obj:`str`
+            Path to write the file to. Any existing file is overwritten.
+
+        variables : :obj:`list` of :obj:`str`, optional
+            Which variables to write values to the file for.
+
+        complevel : :obj:`int`, optional
+            Level of compression, from 0 (no compression) to 9. Default is 4.
+
+        chunksizes : :obj:`tuple`, :obj:`str`, optional
+            Shape of chunks in the file for three-dimensional variables, or
+            one of the named layouts ``'section'`` (time-contiguous chunks,
+            for fast sections) or ``'plan'`` (one chunk per time, for fast
+            planform access). ``'dual'`` writes both layouts; see
+            :obj:`~deltametrics.io.rechunk`.
+
+        compression : :obj:`str`, optional
+            Compression filter, ``'zlib'`` or ``'blosc'``. Default is `None`,
+            which uses ``'zlib'`` for NetCDF4 and HDF5 files, and
+            ``'blosc'`` for Zarr stores.
+
+        dtype : :obj:`str`, :obj:`numpy.dtype`, :obj:`dict`, optional
+            Data type to write the values of `variables` as, or a
+            :obj:`dict` mapping variables to data types.
+
+        Examples
+        --------
+        Save a stratigraphy cube, with frozen velocity data, to reload it
+        later without recomputing the stratigraphy:
+
+        >>> rcm8cube = dm.sample_data.rcm8()
+        >>> sc8cube = dm.cube.StratigraphyCube.from_DataCube(rcm8cube)
+        >>> sc8cube.to_file('sc8cube.nc', variables=['velocity'])  # doctest: +SKIP
+        >>> sc8cube = dm.cube.StratigraphyCube('sc8cube.nc')  # doctest: +SKIP
+        """
+        if isinstance(self.data_path, list):
+            _connected = self.data_path
+        else:
+            _connected = [self.data_path]
+        if any((not (p is None)) and
+               (os.path.abspath(data_path) == os.path.abspath(p))
+               for p in _connected):
+            raise ValueError('Cannot write over the file connected to cube.')
+
+        # connecting creates an empty file at a new path, which is removed
+        # again if the write fails
+        _existed = os.path.exists(data_path)
+        _dataio = self._dataio_from_path(data_path, write=True)
+        _kwargs = dict(variables=variables, complevel=complevel,
+                       chunksizes=chunksizes, dtype=dtype)
+        if not (compression is None):
+            _kwargs['compression'] = compression
+        try:
+            _dataio.write(self, **_kwargs)
+        except BaseException:
+            if not _existed:
+                _dataio.close()
+                if os.path.isdir(data_path):
+                    shutil.rmtree(data_path)
+                elif os.path.exists(data_path):
+                    os.remove(data_path)
+            raise
+
+        # release the handle, so the file can be reopened or overwritten
+        _dataio.dataset.close()
+        if not (_dataio.meta is None):
+            _dataio.meta.close()
+
+    def export_frozen_variable(self, var, return_cube=False, data_path=None,
+                               dtype=None, compression=None, complevel=4,
+                               chunksizes='section'):
         """Export a cube with frozen values.
 
         Creates a `H x L x W` `ndarray` with values from variable `var` placed
@@ -386,9 +701,63 @@ class BaseCube(abc.ABC):
         computations. Access to underlying data is comparatively slow to data
         loaded in memory, because the `Cube` utilities are configured to read
         data off-disk as needed.
+
+        With ``return_cube=True``, the frozen values are instead written to a
+        new file (see :meth:`to_file`), and a cube connected to the file is
+        returned. Choosing a smaller `dtype` (e.g., ``'float32'``, or
+        ``'int8'`` for masks), compression, and chunks that match how the
+        data will be accessed can greatly reduce the volume of data read by
+        downstream computations.
+
+        Parameters
+        ----------
+        var : :obj:`str`
+            Which variable to export.
+
+        return_cube : :obj:`bool`, optional
+            Whether to write the frozen values to `data_path` and return a
+            cube of the file. Default is `False`, which returns the values.
+
+        data_path : :obj:`str`, optional
+            Path to write the file to, required if `return_cube` is `True`.
+
+        dtype : :obj:`str`, :obj:`numpy.dtype`, optional
+            Data type of the values in the file. Default is `None`, which
+            uses the type of the variable.
+
+        compression, complevel : optional
+            Compression of the file. See :meth:`to_file`.
+
+        chunksizes : :obj:`tuple`, :obj:`str`, optional
+            Chunks of the file. Default is ``'section'``, which is
+            efficient for sections and time series; use ``'plan'`` for
+            planform access. See :meth:`to_file`.
+
+        Returns
+        -------
+        frozen : :obj:`xarray.DataArray` or cube
+            The frozen values, or, if `return_cube` is `True`, a cube of the
+            same type as this cube, connected to the file at `data_path`.
+
+        Examples
+        --------
+        Export a float32 copy of the stratigraphic velocity, chunked for
+        planform access:
+
+        >>> rcm8cube = dm.sample_data.rcm8()
+        >>> sc8cube = dm.cube.StratigraphyCube.from_DataCube(rcm8cube)
+        >>> frozen = sc8cube.export_frozen_variable(
+        ...     'velocity', return_cube=True, data_path='velocity.nc',
+        ...     dtype='float32', chunksizes='plan')  # doctest: +SKIP
         """
         if return_cube:
-            raise NotImplementedError
+            if data_path is None:
+                raise ValueError(
+                    'Must supply "data_path" when "return_cube" is True.')
+            self.to_file(data_path, variables=[var], complevel=complevel,
+                         chunksizes=chunksizes, compression=compression,
+                         dtype=dtype)
+            return type(self)(data_path)
         else:
             return self[var].data
 
@@ -481,17 +850,27 @@ class DataCube(BaseCube):
     number of attached attributes (grain size, mud frac, elevation).
     """
 
-    def __init__(self, data, read=[], varset=None, stratigraphy_from=None):
+    def __init__(self, data, read=[], varset=None, stratigraphy_from=None,
+                 chunks=None, cache_bytes=None, prefetch=None,
+                 fast_open=False, dtype=None):
         """Initialize the BaseCube.
 
         Parameters
         ----------
-        data : :obj:`str`, :obj:`dict`
+        data : :obj:`str`, :obj:`list`, :obj:`dict`, :obj:`xarray.Dataset`
             If data is type `str`, the string points to a NetCDF or HDF5 file
-            that can be read. Typically this is used to directly import files
-            output from the pyDeltaRCM model. Alternatively, pass a
+            (or a Zarr store, with extension ``.zarr``, or a directory of
+            memory-mapped arrays, with extension ``.mmap``) that can be read.
+            Typically this is used to directly import files output from the
+            pyDeltaRCM model. A `list` of NetCDF or HDF5 files, or a `str`
+            pattern matching several files (e.g., ``'run/output_*.nc'``), is
+            lazily concatenated along time (e.g., to stitch checkpoints of a
+            model run together). Alternatively, pass a
             :obj:`dict` with keys indicating variable names, and values with
-            corresponding t-x-y `ndarray` of data.
+            corresponding t-x-y `ndarray` of data (optionally with 1D arrays
+            of the coordinates ``'time'``, ``'x'``, and ``'y'``), or an
+            :obj:`xarray.Dataset`. The data are wrapped, not copied; see
+            :obj:`~deltametrics.io.DictIO`.
 
         read : :obj:`bool`, optional
             Which variables to read from dataset into memory. Special option
@@ -509,11 +888,50 @@ class DataCube(BaseCube):
             outputs. Stratigraphy can be computed on an existing data cube
             with the :meth:`~deltametrics.cube.DataCube.stratigraphy_from`
             method.
+
+        chunks : :obj:`dict`, :obj:`int`, :obj:`str`, optional
+            Chunking to use when connecting to a file. Use chunks to keep
+            memory use bounded for cubes that do not fit in memory; slices,
+            sections, and masks then only read the chunks they touch. See
+            :obj:`~deltametrics.io.NetCDFIO` for valid options.
+
+        cache_bytes : :obj:`int`, :obj:`float`, optional
+            Limit on the memory, in bytes, used by variables read into memory
+            with :meth:`~deltametrics.cube.BaseCube.read`, e.g.,
+            ``cache_bytes=8e9``. Least recently used variables are dropped
+            from memory to stay within the limit. Statistics of the variables
+            in memory are available from ``cube.dataio.cache_info``.
+
+        prefetch : :obj:`int`, optional
+            Number of time slices to read ahead in a background thread when
+            slicing a variable at a single time, e.g., ``prefetch=4`` for a
+            loop over ``cube['eta'][t, :, :]``. Reading the next slices then
+            overlaps with computation on the current slice. Only supported
+            for NetCDF4 and HDF5 files; see :obj:`~deltametrics.io.NetCDFIO`.
+
+        fast_open : :obj:`bool`, optional
+            Whether to read only the header of the file (variables, their
+            shapes, and dimensions) when opening the cube. Coordinates,
+            data, and metadata are then read when first accessed. Use to
+            quickly scan many files, e.g., for their shape or metadata. Only
+            supported for NetCDF4 and HDF5 files; see
+            :obj:`~deltametrics.io.NetCDFIO`.
+
+        dtype : :obj:`str`, :obj:`numpy.dtype`, optional
+            Floating point type of arrays derived from the data of the cube,
+            e.g., ``dtype='float32'`` to match the output of pyDeltaRCM and
+            halve the memory of derived arrays. The type is used by the
+            stratigraphy attributes (see :meth:`stratigraphy_from`), and by
+            a :obj:`~deltametrics.cube.StratigraphyCube` created from this
+            cube. Variables are read with the type stored in the file.
+            Default is `None`, which uses ``float64``.
         """
-        super().__init__(data, read, varset)
+        super().__init__(data, read, varset, chunks=chunks,
+                         cache_bytes=cache_bytes, prefetch=prefetch,
+                         fast_open=fast_open, dtype=dtype)
 
-        self._t = np.array(self._dataio['time'], copy=True)
-        _, self._T, _ = np.meshgrid(self.y, self.t, self.x)
+        # the time coordinate is read on first access, see `t`
+        self._t = None
 
         # get shape from a variable that is not x, y, or time
         i = 0
@@ -525,7 +943,7 @@ class DataCube(BaseCube):
                 _var = self.variables[i]
                 i = len(self.variables)
 
-        self._H, self._L, self._W = self[_var].data.shape
+        self._H, self._L, self._W = self._dataio._variable_shape(_var)
 
         self._knows_stratigraphy = False
 
@@ -555,9 +973,9 @@ class DataCube(BaseCube):
             _coords['x'] = self.X
             _coords['y'] = self.Y
             if var == 'time':  # special case for time
-                _t = np.expand_dims(self.dataio.dataset['time'].values,
-                                    axis=(1, 2))
-                _xrt = xr.DataArray(np.tile(_t, (1, *self.shape[1:])))
+                # a read-only view at the shape of the cube, not a copy
+                _xrt = xr.DataArray(_broadcast_coordinate(
+                    self.dataio.dataset['time'].values, 0, self.shape))
                 _obj = _xrt.cubevar
             else:
                 _obj = self._dataio.dataset[var].cubevar
@@ -565,8 +983,11 @@ class DataCube(BaseCube):
             return _obj
 
         elif var in self._variables:
-            _obj = self._dataio.dataset[var].cubevar
-            _obj.initialize(variable=var)
+            _arr = self._dataio._read_from_memory(var)
+            if _arr is None:
+                _arr = self._dataio.dataset[var]
+            _obj = _arr.cubevar
+            _obj.initialize(variable=var, dataio=self._dataio)
             return _obj
 
         else:
@@ -589,8 +1010,9 @@ class DataCube(BaseCube):
             <deltametrics.strat.MeshStratigraphyAttributes>` or :obj:`'boxy'
             <deltametrics.strat.BoxyStratigraphyAttributes>`. Additional
             keyword arguments are passed to stratigraphy attribute
-            initializers.
+            initializers; the `dtype` of the cube is passed unless given.
         """
+        kwargs.setdefault('dtype', self.dtype)
         if style == 'mesh':
             self.strat_attr = \
                 strat.MeshStratigraphyAttributes(elev=self[variable],
@@ -616,12 +1038,18 @@ class DataCube(BaseCube):
     @property
     def t(self):
         """time coordinate."""
+        if self._t is None:
+            self._t = np.array(self._dataio['time'], copy=True)
         return self._t
 
     @property
     def T(self):
-        """Vertical mesh."""
-        return self._T
+        """Vertical mesh.
+
+        A read-only view of :obj:`t`, broadcast without copying.
+        """
+        return _broadcast_coordinate(self.t, 0,
+                                     (len(self.t), len(self.y), len(self.x)))
 
 
 class StratigraphyCube(BaseCube):
@@ -670,7 +1098,8 @@ class StratigraphyCube(BaseCube):
                                 dz=dz)
 
     def __init__(self, data, read=[], varset=None,
-                 stratigraphy_from=None, dz=None):
+                 stratigraphy_from=None, dz=None, chunks=None,
+                 cache_bytes=None, dtype=None):
         """Initialize the StratigraphicCube.
 
         Any instantiation pathway must configure :obj:`z`, :obj:`H`, :obj:`L`,
@@ -678,12 +1107,14 @@ class StratigraphyCube(BaseCube):
 
         Parameters
         ----------
-        data : :obj:`str`, :obj:`dict`
+        data : :obj:`str`, :obj:`DataCube`
             If data is type `str`, the string points to a NetCDF or HDF5 file
-            that can be read. Typically this is used to directly import files
-            output from the pyDeltaRCM model. Alternatively, pass a
-            :obj:`dict` with keys indicating variable names, and values with
-            corresponding t-x-y `ndarray` of data.
+            previously written with :meth:`to_file`, and the stratigraphy is
+            reloaded from the file. Variables written to the file are
+            available as "frozen" variables, and if the `DataCube` the
+            stratigraphy was computed from is still found at the same path,
+            all of its variables are available too. Alternatively, pass a
+            :obj:`DataCube` to compute the stratigraphy from.
 
         read : :obj:`bool`, optional
             Which variables to read from dataset into memory. Special option
@@ -693,26 +1124,84 @@ class StratigraphyCube(BaseCube):
             Pass a `~deltametrics.plot.VariableSet` instance if you wish
             to style this cube similarly to another cube. If no argument is
             supplied, a new default VariableSet instance is created.
+
+        chunks : optional
+            Passed to the I/O handler when reloading from a file. See
+            :obj:`~deltametrics.cube.DataCube` for details.
+
+        cache_bytes : :obj:`int`, :obj:`float`, optional
+            Limit on the memory, in bytes, used by variables placed into
+            stratigraphic position. Variables are placed into stratigraphic
+            position the first time they are accessed, and are kept in
+            memory, so that repeated access (e.g., by several sections) does
+            not repeat the work; least recently used variables are dropped
+            from memory to stay within the limit. Also passed to the I/O
+            handler when reloading from a file. Default is `None`, which
+            does not limit the memory used.
+
+        dtype : :obj:`str`, :obj:`numpy.dtype`, optional
+            Floating point type of variables placed into stratigraphic
+            position, and of the stratal surfaces, e.g., ``'float32'`` to
+            halve the memory used. Default is `None`, which uses the `dtype`
+            of the :obj:`~deltametrics.cube.DataCube` the stratigraphy is
+            computed from, or ``float64``.
         """
-        super().__init__(data, read, varset)
+        if (dtype is None) and isinstance(data, DataCube):
+            dtype = data.dtype
+        super().__init__(data, read, varset, chunks=chunks,
+                         cache_bytes=cache_bytes, dtype=dtype)
+        self._cache_bytes = cache_bytes
+        self._stratigraphic_data = io._VariableCache()
+        self._strata_columns = None
         if isinstance(data, str):
-            raise NotImplementedError('Precomputed NetCDF?')
+            # i.e., reloading stratigraphy written to file
+            _strat = self._dataio.read_group('stratigraphy')
+            if _strat is None:
+                raise ValueError(
+                    'No stratigraphy found in file: %s' % data)
+
+            self._z = np.array(self._dataio['z'], copy=True)
+            self._H = len(self.z)
+            self._L, self._W = _strat['strata'].shape[1:]
+
+            self.strata_coords = _strat['strata_coords'].values
+            self.data_coords = _strat['data_coords'].values
+            self.strata = _strat['strata'].values
+
+            # frozen variables are read from this file, others from source
+            self._frozen_variables = list(self._variables)
+            self._source_path = _strat.attrs.get('source_path', None)
+            if (not (self._source_path is None)) and \
+               os.path.exists(self._source_path):
+                self._sourceio = self._dataio_from_path(
+                    self._source_path, chunks=chunks, cache_bytes=cache_bytes)
+                self._variables = self._variables + \
+                    [v for v in self._sourceio.known_variables
+                     if v not in self._frozen_variables]
+            else:
+                self._sourceio = None
         elif isinstance(data, np.ndarray):
             raise NotImplementedError('Precomputed numpy array?')
         elif isinstance(data, DataCube):
             # i.e., creating from a DataCube
-            _elev = copy.deepcopy(data[stratigraphy_from])
+            # a copy of the values only, computed in memory even if chunked
+            _elev = data[stratigraphy_from].data.copy().load()
 
             # set up coordinates of the array
-            self._z = strat._determine_strat_coordinates(_elev.data, dz=dz)
+            self._z = strat._determine_strat_coordinates(_elev, dz=dz)
             self._H = len(self.z)
             self._L, self._W = _elev.shape[1:]
-            self._Z = np.tile(self.z, (self.W, self.L, 1)).T
 
             _out = strat.compute_boxy_stratigraphy_coordinates(_elev,
                                                                z=self.z,
                                                             return_strata=True)
             self.strata_coords, self.data_coords, self.strata = _out
+            if not (self.dtype is None):
+                self.strata = self.strata.astype(self.dtype, copy=False)
+
+            self._frozen_variables = []
+            self._source_path = data.data_path
+            self._sourceio = data._dataio
         else:
             raise TypeError('No other input types implemented yet.')
 
@@ -723,6 +1212,11 @@ class StratigraphyCube(BaseCube):
         :obj:`~deltametrics.cube.CubeVariable` instance when slicing, where
         the data have been placed into stratigraphic position.
 
+        The data placed into stratigraphic position are kept in memory, and
+        reused when the variable is accessed again. The data are read-only.
+        See `cache_bytes` and `dtype` of
+        :obj:`~deltametrics.cube.StratigraphyCube`.
+
         Parameters
         ----------
         var : :obj:`str`
@@ -733,26 +1227,145 @@ class StratigraphyCube(BaseCube):
         CubeVariable : `~deltametrics.cube.CubeVariable`
             The instantiated CubeVariable.
         """
-        if var == 'time':
+        if var in self._frozen_variables:
+            # already in stratigraphic position, slice directly from file
+            _obj = self._dataio.dataset[var].cubevar
+            _obj.initialize(variable=var)
+            return _obj
+
+        _obj = xr.DataArray(self._stratigraphic_values(var)).cubevar
+        _obj.initialize(variable=var)
+        return _obj
+
+    def _stratigraphic_values(self, var, cache=True):
+        """Values of a variable placed into stratigraphic position.
+
+        Values already in memory are reused. Otherwise, the values are
+        placed, and kept in memory if `cache` is True.
+        """
+        if var in self._stratigraphic_data:
+            return self._stratigraphic_data[var]
+        elif var == 'time':
             # a special attribute we add, which matches eta.shape
-            _t = np.expand_dims(self.dataio['time'], axis=(1, 2))
-            _arr = np.full(self.shape, np.nan)
-            _var = np.tile(_t, (1, *self.shape[1:]))
+            _t = np.asarray(self.dataio['time'])
+            _var = _broadcast_coordinate(_t, 0, (len(_t), *self.shape[1:]))
         elif var in self._variables:
-            _arr = np.full(self.shape, np.nan)
-            _var = np.array(self.dataio[var], copy=True)
+            _var = np.asarray(self._sourceio[var])
         else:
             raise AttributeError('No variable of {cube} named {var}'.format(
                                  cube=str(self), var=var))
+        return self._place_stratigraphy(var, _var, cache=cache)
+
+    def _place_stratigraphy(self, var, data, strata_index=None, cache=True):
+        """Place the data of a variable into stratigraphic position.
+
+        The linear index of :obj:`strata_coords` in the cube can be given as
+        `strata_index`, to be shared by several variables. If `cache` is
+        True, the result is kept in memory, dropping the least recently used
+        variables if :obj:`cache_bytes` is exceeded.
+        """
+        if strata_index is None:
+            strata_index = np.ravel_multi_index(
+                tuple(self.strata_coords.T), self.shape)
+        _dtype = float if (self.dtype is None) else self.dtype
+        _arr = np.full(self.shape, np.nan, dtype=_dtype)
 
         # the following lines apply the data to stratigraphy mapping
-        _cut = _var[self.data_coords[:, 0], self.data_coords[:, 1],
-                    self.data_coords[:, 2]]
-        _arr[self.strata_coords[:, 0], self.strata_coords[:, 1],
-             self.strata_coords[:, 2]] = _cut
-        _obj = xr.DataArray(_arr).cubevar
-        _obj.initialize(variable=var)
-        return _obj
+        _cut = data[tuple(self.data_coords.T)]
+        np.put(_arr, strata_index, _cut)
+        _arr.flags.writeable = False  # shared by all accesses
+        if not cache:
+            return _arr
+
+        self._stratigraphic_data[var] = _arr
+        io._evict_caches((self._stratigraphic_data,), self._cache_bytes)
+        return _arr
+
+    def _get_many_dataset(self, variables):
+        """Variables in stratigraphic position, for :meth:`get_many`.
+
+        The source data of variables not yet in stratigraphic position are
+        read together, and placed with a single index of the stratigraphy.
+        """
+        _missing = [var for var in variables if (var in self._variables)
+                    and not (var in self._frozen_variables)
+                    and not (var in self._stratigraphic_data)]
+        _arrays = {}
+        if _missing:
+            _source = xr.Dataset({var: xr.DataArray(self._sourceio[var])
+                                  for var in _missing}).load()
+            _index = np.ravel_multi_index(
+                tuple(self.strata_coords.T), self.shape)
+            for var in _missing:
+                _arrays[var] = xr.DataArray(self._place_stratigraphy(
+                    var, _source[var].values, strata_index=_index))
+
+        _dims = ('z', 'x', 'y')
+        _dataset = xr.Dataset(coords={'z': np.asarray(self.z)})
+        for var in variables:
+            _arr = _arrays[var] if (var in _arrays) else self[var].data
+            _dataset[var] = _arr.rename(
+                {d: n for d, n in zip(_arr.dims, _dims) if d != n})
+        return _dataset
+
+    def _take_section(self, var, y, x):
+        """Place a variable into stratigraphic position, along a section.
+
+        Only the stratigraphic columns at the section cells (`y`, `x`) are
+        filled, by selecting the rows of :obj:`strata_coords` and
+        :obj:`data_coords` in those columns, so that the cost scales with the
+        section rather than the cube. Variables frozen in a file or already
+        in memory are sliced directly. Equivalent to
+        ``self[var].data.values[:, y, x]``.
+        """
+        _y = xr.DataArray(y, dims='s')
+        _x = xr.DataArray(x, dims='s')
+        if (var in self._frozen_variables) or \
+           (var in self._stratigraphic_data):
+            return self[var].data[:, _y, _x].values
+        elif var == 'time':
+            _t = np.asarray(self.dataio['time'])
+            _data = _broadcast_coordinate(_t, 0, (len(_t), len(_y)))
+        elif var in self._variables:
+            # read only the section columns from the source data
+            _data = xr.DataArray(self._sourceio[var])[:, _y, _x].values
+        else:
+            raise AttributeError('No variable of {cube} named {var}'.format(
+                                 cube=str(self), var=var))
+
+        # rows of the mapping in each section column, in section order
+        _order, _bounds = self._column_rows()
+        _cells = np.ravel_multi_index((y, x), (self.L, self.W))
+        _start = _bounds[_cells]
+        _count = _bounds[_cells + 1] - _start
+        _s = np.repeat(np.arange(len(_cells)), _count)
+        _offset = np.arange(_count.sum()) - np.repeat(
+            np.cumsum(_count) - _count, _count)
+        _rows = _order[np.repeat(_start, _count) + _offset]
+
+        _dtype = float if (self.dtype is None) else self.dtype
+        _arr = np.full((self.H, len(_cells)), np.nan, dtype=_dtype)
+        _arr[self.strata_coords[_rows, 0], _s] = \
+            _data[self.data_coords[_rows, 0], _s]
+        return _arr
+
+    def _column_rows(self):
+        """Rows of the stratigraphy mapping, grouped by x-y column.
+
+        Returns the order that sorts the rows of :obj:`strata_coords` by
+        column, and the bounds of each column in the sorted rows, such that
+        the rows of column ``c`` are ``order[bounds[c]:bounds[c+1]]``.
+        Computed once, on first use.
+        """
+        if self._strata_columns is None:
+            _cols = np.ravel_multi_index(
+                (self.strata_coords[:, 1], self.strata_coords[:, 2]),
+                (self.L, self.W))
+            _order = np.argsort(_cols, kind='stable')
+            _bounds = np.searchsorted(_cols[_order],
+                                      np.arange(self.L * self.W + 1))
+            self._strata_columns = (_order, _bounds)
+        return self._strata_columns
 
     @property
     def strata(self):
@@ -766,11 +1379,241 @@ class StratigraphyCube(BaseCube):
     def strata(self, var):
         self._strata = var
 
+    @property
+    def source_path(self):
+        """:obj:`str` : Path of the data the stratigraphy was computed from.
+
+        Returns None if the source data is not connected to a file.
+        """
+        return self._source_path
+
     @property
     def z(self):
         return self._z
 
+    @property
+    def Z(self):
+        """Vertical mesh.
+
+        A read-only view of :obj:`z`, broadcast without copying.
+        """
+        return _broadcast_coordinate(self.z, 0, self.shape)
+
+
+class EnsembleCube(BaseCube):
+    """EnsembleCube object.
+
+    An ensemble cube stacks the `t-x-y` data of several runs of a model
+    into a single cube, with a new leading ``run`` dimension. The files of
+    the ensemble members are concatenated lazily, without copying any data,
+    so that a computation can be applied to all members at once with `numpy`
+    broadcasting, rather than with a Python loop over cubes of each
+    member. All members must have matching spatial coordinates and times.
+
+    Slicing an ensemble cube returns a
+    :obj:`~deltametrics.cube.CubeVariable` of `r-t-x-y` data. Use
+    :meth:`member` to get a :obj:`~deltametrics.cube.DataCube` of a single
+    member, e.g., for computing sections and stratigraphy.
+
+    Examples
+    --------
+    Compute the final delta-top area of every run of an ensemble, with a
+    single read of the data:
+
+    >>> ensemble = dm.cube.EnsembleCube('ensemble/job_*/pyDeltaRCM_output.nc')  # doctest: +SKIP
+    >>> final_eta = ensemble['eta'][:, -1, :, :]  # doctest: +SKIP
+    >>> land_area = (final_eta > 0).sum(axis=(1, 2))  # doctest: +SKIP
+    """
+
+    _concat_dim = 'run'
+
+    def __init__(self, data, read=[], varset=None, chunks=None,
+                 cache_bytes=None):
+        """Initialize the EnsembleCube.
+
+        Parameters
+        ----------
+        data : :obj:`list` of :obj:`str`, :obj:`str`
+            Paths to the files of the ensemble members, or a pattern matching
+            the files. Files matching a pattern are sorted by name.
+
+        read : :obj:`bool`, optional
+            Which variables to read from dataset into memory. Special option
+            for ``read=True`` to read all available variables into memory.
+
+        varset : :class:`~deltametrics.plot.VariableSet`, optional
+            Pass a `~deltametrics.plot.VariableSet` instance if you wish
+            to style this cube similarly to another cube.
+
+        chunks, cache_bytes : optional
+            Passed to the I/O handler when connecting to the files. See
+            :obj:`~deltametrics.cube.DataCube` for details.
+        """
+        if (type(data) is str) and not glob.has_magic(data):
+            data = [data]
+        if not isinstance(data, (list, tuple, str)):
+            raise TypeError('Invalid type for "data": %s' % type(data))
+        self._chunks = chunks
+        self._cache_bytes = cache_bytes
+
+        super().__init__(data, read, varset, chunks=chunks,
+                         cache_bytes=cache_bytes)
+
+        self._t = np.array(self._dataio['time'], copy=True)
+
+        self._R, self._H, self._L, self._W = \
+            self._dataio.dataset[self.variables[0]].shape
+
+    def __getitem__(self, var):
+        """Return the variable.
+
+        Overload slicing operations for io to return a
+        :obj:`~deltametrics.cube.CubeVariable` instance when slicing.
+
+        Parameters
+        ----------
+        var : :obj:`str`
+            Which variable to slice.
+
+        Returns
+        -------
+        CubeVariable : `~deltametrics.cube.CubeVariable`
+            The instantiated CubeVariable, with dimensions `r-t-x-y` for
+            variables, or the dimensions of the coordinate for coordinates.
+        """
+        _coords = {'t': self.t, 'x': self.x, 'y': self.y}
+        if var in self._coords:
+            _obj = self._dataio.dataset[var].cubevar
+            _obj.initialize(variable=var, coords=_coords)
+            return _obj
+
+        elif var in self._variables:
+            _arr = self._dataio._read_from_memory(var)
+            if _arr is None:
+                _arr = self._dataio.dataset[var]
+            _obj = _arr.cubevar
+            _obj.initialize(variable=var, coords=_coords)
+            return _obj
+
+        else:
+            raise AttributeError('No variable of {cube} named {var}'.format(
+                                 cube=str(self), var=var))
+
+    def member(self, run):
+        """Get a single member of the ensemble.
+
+        Parameters
+        ----------
+        run : :obj:`int`
+            Index of the member along the ``run`` dimension.
+
+        Returns
+        -------
+        cube : :obj:`~deltametrics.cube.DataCube`
+            Cube connected to the file of the member.
+        """
+        return DataCube(self.data_path[run], varset=self.varset,
+                        chunks=self._chunks, cache_bytes=self._cache_bytes)
+
+    def to_file(self, *args, **kwargs):
+        """Writing an ensemble to file is not supported.
+
+        Write each :meth:`member` to file instead.
+        """
+        raise NotImplementedError(
+            'Writing an ensemble to file is not supported.')
+
+    @property
+    def R(self):
+        """Number of members (runs) of the ensemble."""
+        return self._R
+
+    @property
+    def shape(self):
+        """Number of elements in data (RxHxLxW)."""
+        return (self.R, self.H, self.L, self.W)
+
+    @property
+    def z(self):
+        """Vertical coordinate."""
+        return self.t
+
     @property
     def Z(self):
         """Vertical mesh."""
-        return self._Z
+        return self.T
+
+    @property
+    def t(self):
+        """time coordinate."""
+        return self._t
+
+    @property
+    def T(self):
+        """Vertical mesh.
+
+        A read-only view of :obj:`t`, broadcast without copying.
+        """
+        return _broadcast_coordinate(self.t, 0,
+                                     (len(self.t), len(self.y), len(self.x)))
+
+
+def _validate_dtype(dtype):
+    """Validate a floating point `dtype` of derived arrays.
+    """
+    if dtype is None:
+        return None
+    _dtype = np.dtype(dtype)
+    if not np.issubdtype(_dtype, np.floating):
+        raise TypeError(
+            'The "dtype" must be a floating point type, but was: %s' % dtype)
+    return _dtype
+
+
+def _validate_io_options(data, prefetch, fast_open):
+    """Validate the options only supported for a single NetCDF4 or HDF5 file.
+
+    Raises a ``ValueError`` if reading ahead (`prefetch`) or `fast_open` is
+    requested for any other `data`.
+    """
+    if isinstance(data, str):
+        _, _ext = os.path.splitext(os.path.normpath(data))
+        _desc = data
+    else:
+        _ext = None
+        _desc = data if isinstance(data, list) else type(data)
+    if not (prefetch is None) and not (_ext in ('.nc', '.hdf5')):
+        raise ValueError(
+            'Reading ahead is only supported for a single NetCDF4 or HDF5 '
+            'file, but "data" is: %s' % (_desc,))
+    if fast_open and not (_ext in ('.nc', '.hdf5')):
+        raise ValueError(
+            'Fast opening is only supported for a single NetCDF4 or HDF5 '
+            'file, but "data" is: %s' % (_desc,))
+
+
+def _index_to_indexers(index, dims):
+    """Convert a positional `index` into `isel` indexers of `dims`.
+    """
+    if not isinstance(index, tuple):
+        index = (index,)
+    _ellipsis = [i for i, idx in enumerate(index) if idx is Ellipsis]
+    if _ellipsis:
+        _e = _ellipsis[0]
+        _fill = (slice(None),) * (len(dims) - len(index) + 1)
+        index = index[:_e] + _fill + index[_e + 1:]
+    if len(index) > len(dims):
+        raise IndexError(
+            'Too many indices (%s) for data with dimensions %s.' % (
+                len(index), dims))
+    return dict(zip(dims, index))
+
+
+def _broadcast_coordinate(coord, axis, shape):
+    """Broadcast a 1D coordinate along `axis` into a mesh of `shape`.
+
+    The mesh is a read-only view of `coord`, and uses no additional memory.
+    """
+    _shape = [1] * len(shape)
+    _shape[axis] = -1
+    return np.broadcast_to(np.asarray(coord).reshape(_shape), shape)
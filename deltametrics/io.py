@@ -1,27 +1,87 @@
 
 import abc
 import os
+import json
+import shutil
+import tempfile
+import itertools
+import collections
+import concurrent.futures
+import weakref
 from warnings import warn
 
+import numpy as np
 import xarray as xr
 import netCDF4
 
 
+# edge length of the spatial tiles used by the ``chunks='section'`` layout
+_SECTION_TILE = 64
+
+# group holding the plan-layout copies of variables of a dual-layout file;
+# see `rechunk`
+_PLAN_GROUP = 'plan'
+
+# size, in bytes, of the blocks in which variables are written to file; see
+# `_write_blocks`
+_WRITE_BLOCK_BYTES = 2 ** 26
+
+# name of the sidecar file describing a directory of memory-mapped arrays
+_MEMMAP_METADATA = 'metadata.json'
+
+# open NetCDF4 and HDF5 files, shared across all cubes of the process, in
+# order of last use; see `_open_pooled`
+_HANDLE_POOL = collections.OrderedDict()
+
+# number of pooled handles kept open while not used by any connection
+_HANDLE_POOL_SIZE = 32
+
+# number of sweeps over time (each of a variable at the same index) read
+# ahead at once; see `BaseIO._read_ahead`
+_PREFETCH_SWEEPS = 4
+
+# counter ordering the uses of variables read into memory
+_CACHE_CLOCK = itertools.count()
+
+CacheInfo = collections.namedtuple(
+    'CacheInfo', ['hits', 'misses', 'nbytes', 'maxbytes'])
+
+
 class BaseIO(abc.ABC):
     """BaseIO object other file format wrappers inheririt from.
 
     .. note::
         This is an abstract class and cannot be instantiated directly. If you
         wish to subclass to create a new IO format, you must implement the
-        methods ``connect``, ``read``, ``write``, and ``keys``.
+        methods ``connect``, ``read_group``, and ``write``. The ``connect``
+        method must set ``dataset``, an :obj:`xarray.Dataset` of the
+        variables, and ``meta``.
     """
 
-    def __init__(self, data_path, type, write):
+    # number of time slices to read ahead; see `NetCDFIO`
+    prefetch = None
+
+    def __init__(self, data_path, type, write, cache_bytes=None):
         """Initialize the base IO.
         """
+        self.writeable = write
         self.data_path = data_path
         self.type = type
-        self.write = write
+        self.cache_bytes = cache_bytes
+
+        # variables, and windows of variables, read into memory; see `read`
+        self._in_memory_data = _VariableCache()
+        self._in_memory_windows = _VariableCache()
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+        # slices read ahead of a time sweep; see `_read_ahead`
+        self._prefetcher = None
+        self._prefetched = {}
+        self._sweeps = collections.OrderedDict()
+
+        # connecting to a dual-layout file sets this; see `rechunk`
+        self._plan_dataset = None
 
         self.connect()
 
@@ -40,17 +100,180 @@ class BaseIO(abc.ABC):
         Notes
         -----
         The setter method validates the path, and returns a
-        ``FileNotFoundError`` if the file is not found.
+        ``FileNotFoundError`` if the file is not found, unless the IO object
+        was created with writing enabled.
         """
         return self._data_path
 
     @data_path.setter
     def data_path(self, var):
-        if os.path.exists(var):
+        if os.path.exists(var) or self.writeable:
             self._data_path = var
         else:
             raise FileNotFoundError('File not found at supplied path: %s' % var)
 
+    @property
+    def cache_info(self):
+        """`CacheInfo` : Statistics of the variables read into memory.
+
+        Returns a named tuple with the number of accesses of variables
+        served from memory (``hits``) and from the file (``misses``), the
+        memory used by variables read into memory (``nbytes``), and the limit
+        on the memory used (``maxbytes``).
+        """
+        _nbytes = self._in_memory_data.nbytes + \
+            self._in_memory_windows.nbytes
+        return CacheInfo(self._cache_hits, self._cache_misses, _nbytes,
+                         self.cache_bytes)
+
+    def _read_from_memory(self, var):
+        """Return a variable read into memory, or `None` if not in memory.
+
+        A variable not in memory is counted as a miss, unless a window of the
+        variable is in memory (see :obj:`_read_window`).
+        """
+        if var in self._in_memory_data:
+            self._cache_hits += 1
+            return self._in_memory_data[var]
+        elif not (var in self._in_memory_windows):
+            self._cache_misses += 1
+        return None
+
+    def _variable_shape(self, var):
+        """Shape of a variable.
+        """
+        return self.dataset[var].shape
+
+    def _read_slice(self, var, shape, slc):
+        """Return a slice of a variable, or `None` to slice the data directly.
+
+        The slice is taken from a window read into memory (see
+        :obj:`_read_window`), from the slices read ahead of a time sweep (see
+        :obj:`_read_ahead`), or from the plan layout of a dual-layout file
+        (see :obj:`_read_layout`), in that order.
+        """
+        _arr = self._read_window(var, shape, slc)
+        if _arr is None:
+            _arr = self._read_ahead(var, shape, slc)
+        if _arr is None:
+            _arr = self._read_layout(var, slc)
+        return _arr
+
+    def _read_window(self, var, shape, slc):
+        """Return a slice from a window read into memory, or `None`.
+
+        `None` is returned if there is no window of `var` in memory, or if
+        `slc` is not entirely inside the window.
+        """
+        if not (var in self._in_memory_windows):
+            return None
+        _window, _arr = self._in_memory_windows[var]
+        _index = _index_in_window(_window, shape, slc)
+        if _index is None:
+            self._cache_misses += 1
+            return None
+        self._cache_hits += 1
+        return _arr[_index]
+
+    def _read_ahead(self, var, shape, slc):
+        """Return a slice at a single time, and read ahead the next slices.
+
+        When :obj:`prefetch` is set, slicing a variable at time `t` (e.g.,
+        ``[t, :, :]``) returns the slice, and submits reading the same slice
+        at the next :obj:`prefetch` times to a background thread. When the
+        next slices are then accessed, they are returned without waiting on
+        the file. Slices read ahead for a time no longer in the next
+        :obj:`prefetch` times are dropped, as are the slices read ahead for
+        all but the :obj:`_PREFETCH_SWEEPS` most recently accessed sweeps
+        (i.e., variables and indices other than time). `None` is returned if
+        :obj:`prefetch` is not set, if `var` is in memory, or if `slc` is not
+        at a single time.
+        """
+        if (not self.prefetch) or (var in self._in_memory_data) or \
+           not (var in self.dataset.data_vars):
+            return None
+        _slc = slc if isinstance(slc, tuple) else (slc,)
+        _t, _rest = _prefetch_key(shape, _slc)
+        if _t is None:
+            return None
+
+        if self._prefetcher is None:
+            self._prefetcher = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1)
+
+        self._sweeps[(var, _rest)] = None
+        self._sweeps.move_to_end((var, _rest))
+        while len(self._sweeps) > _PREFETCH_SWEEPS:
+            _stale, _ = self._sweeps.popitem(last=False)
+            for _key in [k for k in self._prefetched.keys()
+                         if (k[0], k[2]) == _stale]:
+                self._prefetched.pop(_key).cancel()
+
+        _ahead = range(_t + 1, min(_t + 1 + self.prefetch, shape[0]))
+        for _key in [k for k in self._prefetched.keys()
+                     if (k[0] == var) and (k[2] == _rest)
+                     and (k[1] != _t) and not (k[1] in _ahead)]:
+            self._prefetched.pop(_key).cancel()
+        for _next in _ahead:
+            _key = (var, _next, _rest)
+            if not (_key in self._prefetched):
+                self._prefetched[_key] = self._prefetcher.submit(
+                    self._load_slice, var, (_next, *_slc[1:]))
+
+        _future = self._prefetched.pop((var, _t, _rest), None)
+        if _future is None:
+            return self._load_slice(var, _slc)
+        return _future.result()
+
+    def _stop_read_ahead(self):
+        """Drop all slices read ahead, waiting on any being read.
+        """
+        concurrent.futures.wait([f for f in self._prefetched.values()
+                                 if not f.cancel()])
+        self._prefetched = {}
+        self._sweeps = collections.OrderedDict()
+
+    def _load_slice(self, var, slc):
+        """Read a slice of a variable into memory.
+        """
+        _arr = self._read_layout(var, slc)
+        if _arr is None:
+            _arr = self.dataset[var][slc]
+        return _arr.load()
+
+    def _read_layout(self, var, slc):
+        """Return a slice from the plan layout of a variable, or `None`.
+
+        Slices at a single time are taken from the plan-layout copy of the
+        variable, if the file has one (see :obj:`rechunk`), and `None` is
+        returned for any other slice. `None` is also returned if the slice
+        is in memory (see :obj:`read`), so that it is not read from the
+        file again.
+        """
+        if (self._plan_dataset is None) or \
+           not (var in self._plan_dataset.data_vars):
+            return None
+        _slc = slc if isinstance(slc, tuple) else (slc,)
+        if not isinstance(_slc[0], (int, np.integer)):
+            return None
+        if var in self._in_memory_data:
+            return None
+        if var in self._in_memory_windows:
+            _window, _ = self._in_memory_windows[var]
+            _shape = self._variable_shape(var)
+            if not (_index_in_window(_window, _shape, _slc) is None):
+                return None
+        return self._plan_dataset[var][slc]
+
+    def _evict(self):
+        """Drop the least recently used variables from memory.
+
+        Variables are dropped until the memory used is at most
+        :obj:`cache_bytes`.
+        """
+        _evict_caches((self._in_memory_data, self._in_memory_windows),
+                      self.cache_bytes)
+
     @abc.abstractmethod
     def connect(self):
         """Should connect to the data file.
@@ -61,47 +284,117 @@ class BaseIO(abc.ABC):
         return
 
     @abc.abstractmethod
-    def get_known_variables(self):
-        """Should create list of known variables.
+    def read_group(self, group):
+        """Should read a group of the file into memory.
 
-        This function needs to populate `self.known_variables`.
+        This function should return the group as an :obj:`xarray.Dataset`,
+        or `None` if the group is not found.
         """
         return
 
     @abc.abstractmethod
-    def get_known_coords(self):
-        """A list of known coordinates.
+    def write(self, CubeInstance):
+        """Should write the data to file.
 
-        This function needs to populate `self.known_coords`.
+        Take a :obj:`~deltametrics.cube.Cube` and write it to file.
         """
         return
 
-    @abc.abstractmethod
-    def read(self):
-        """Should read data into memory.
+    def get_known_variables(self):
+        """List known variables.
+
+        These variables are pulled from the loaded dataset.
         """
-        return
+        _vars, _coords = self._variable_names()
+        if ('strata_age' in _vars) or ('strata_depth' in _vars):
+            _coords += ['strata_age', 'strata_depth']
+        self.known_variables = [item for item in _vars if item not in _coords]
 
-    @abc.abstractmethod
-    def write(self):
-        """Should write the data to file.
+    def get_known_coords(self):
+        """List known coordinates.
 
-        Take a :obj:`~deltametrics.cube.Cube` and write it to file.
+        These coordinates are pulled from the loaded dataset.
         """
-        return
+        _, self.known_coords = self._variable_names()
 
-    @abc.abstractmethod
-    def __getitem__(self):
-        """Should slice the data from file.
+    def _variable_names(self):
+        """All variables, and the variables that are coordinates.
         """
-        return
+        return list(self.dataset.variables), list(self.dataset.coords)
+
+    def read(self, var, t=None, region=None):
+        """Read variable from file and into memory.
+
+        Converts `variables` in data file to `xarray` objects for coersion
+        into a :obj:`~deltametrics.cube.Cube` instance.
+
+        Parameters
+        ----------
+        var : `str`
+            Which variable to load from the file.
+
+        t : `slice` or `int`, optional
+            Which times (indices along the first dimension) to read. Default
+            is `None`, which reads all times.
+
+        region : `tuple` of `int`, optional
+            Which part of the domain to read, as indices ``(y0, y1, x0,
+            x1)``. Default is `None`, which reads the entire domain.
+
+            If either `t` or `region` is given, only the window is read, and
+            slices of the variable inside the window are served from memory;
+            see :obj:`~deltametrics.cube.CubeVariable`.
+        """
+        _arr = self.dataset[var]
+        if (t is None) and (region is None):
+            self._in_memory_data[var] = self._load_copy(_arr)
+            self._in_memory_windows.pop(var, None)
+        else:
+            _window = _expand_window(_arr.shape, t, region)
+            self._in_memory_windows[var] = (_window,
+                                            self._load_copy(_arr[_window]))
+        self._evict()
+
+    def _load_copy(self, arr):
+        """Load an array into memory.
+
+        A copy is loaded, so the dataset itself is not held in memory.
+        """
+        return arr.copy(deep=False).load()
+
+    def _reconnect(self):
+        """Connect to the file again after writing to it.
+
+        Variables read into memory from the previous file are dropped.
+        """
+        self.connect()
+        self.get_known_coords()
+        self.get_known_variables()
+        self._in_memory_data = _VariableCache()
+        self._in_memory_windows = _VariableCache()
+
+    def close(self):
+        """Close the connection to the data.
+
+        Slices read ahead are dropped, and the background thread reading
+        ahead is shut down.
+        """
+        self._stop_read_ahead()
+        if not (self._prefetcher is None):
+            self._prefetcher.shutdown()
+            self._prefetcher = None
+
+    def __getitem__(self, var):
+        if var in self._in_memory_data.keys():
+            return self._in_memory_data[var]
+        else:
+            return self.dataset.variables[var]
 
     @property
-    @abc.abstractmethod
     def keys(self):
-        """Should link to all key _names_ stored in file.
+        """Variable names in the dataset.
         """
-        return
+        return [var for var in self.dataset.variables]
 
 
 class NetCDFIO(BaseIO):
@@ -122,7 +415,8 @@ class NetCDFIO(BaseIO):
     `docs <https://www.unidata.ucar.edu/software/netcdf/docs/faq.html>`_.
     """
 
-    def __init__(self, data_path, type, write=False):
+    def __init__(self, data_path, type, write=False, chunks=None,
+                 cache_bytes=None, prefetch=None, fast_open=False):
         """Initialize the NetCDFIO handler.
 
         Initialize a connection to a NetCDF file.
@@ -137,14 +431,57 @@ class NetCDFIO(BaseIO):
             'netcdf' or an HDF5 file, 'hdf5'.
 
         write : `bool`, optional
-            Whether to allow writing to an existing file. Set to False by
-            default, if a file already exists at ``data_path``, writing is
-            disabled, unless ``write`` is set to True.
-        """
+            Whether to allow writing to the file. Set to False by default, if
+            a file already exists at ``data_path``, writing is disabled,
+            unless ``write`` is set to True. If no file exists at
+            ``data_path``, ``write`` must be True, and an empty file is
+            created.
+
+        chunks : `dict`, `int`, `str`, optional
+            Open the file as a `dask`-backed dataset, split into chunks, so
+            that slicing only reads the blocks it touches. Any value accepted
+            by :obj:`xarray.open_dataset` is passed through (e.g., ``{'time':
+            10}`` or ``'auto'``). Additionally, ``'plan'`` chunks the file
+            into single `x-y` plates (one chunk per time), and ``'section'``
+            chunks the file into spatial tiles that span the full time
+            series. Default is `None`, which does not chunk the file. Requires
+            the optional dependency `dask`.
+
+        cache_bytes : `int`, `float`, optional
+            Limit on the memory, in bytes, used by variables read into
+            memory with :obj:`read`. When the limit is exceeded, the least
+            recently used variables are dropped from memory, and are read
+            from the file again when next accessed. Default is `None`, which
+            does not limit the memory used.
 
-        super().__init__(data_path=data_path, type=type, write=write)
+        prefetch : `int`, optional
+            Number of time slices to read ahead in a background thread, when
+            a variable is sliced at a single time (e.g., ``[t, :, :]``).
+            When the time slices are accessed in sequence (e.g., in
+            per-timestep masks, mobility metrics, or animations), reading
+            and decompressing the next slices then overlaps with computation
+            on the current slice. Default is `None`, which does not read
+            ahead.
 
-        self._in_memory_data = {}
+        fast_open : `bool`, optional
+            Whether to read only the header of the file (the names,
+            dimensions, and shapes of variables) when connecting, and to
+            defer opening the dataset and the metadata until they are first
+            accessed. This makes connecting to many files, e.g., to scan
+            the metadata or shapes of the runs of an ensemble, several times
+            faster. Default is `False`.
+        """
+        if not ((prefetch is None) or
+                (isinstance(prefetch, (int, np.integer)) and prefetch >= 0)):
+            raise ValueError(
+                'Invalid value for "prefetch": %s. Must be a '
+                'non-negative integer.' % prefetch)
+        self.chunks = chunks
+        self.prefetch = prefetch
+        self.fast_open = fast_open
+
+        super().__init__(data_path=data_path, type=type, write=write,
+                         cache_bytes=cache_bytes)
 
     def connect(self):
         """Connect to the data file.
@@ -152,99 +489,1664 @@ class NetCDFIO(BaseIO):
         Initialize the file if it does not exist, or simply ``return`` if the
         file already exists. This connection to the data file is "lazy"
         loading, meaning that array values are not being loaded into memory.
+        With :obj:`fast_open`, only the header of the file is read, and the
+        dataset and metadata are opened when first accessed.
 
         .. note::
             This function is automatically called during initialization of any
             IO object, so it is not necessary to call it directly.
 
         """
-        if not os.path.isfile(self.data_path):
-            _tempdataset = netCDF4.Dataset(
-                self.data_path, "w", format="NETCDF4")
-            _tempdataset.close()
-
         if os.path.splitext(self.data_path)[-1] == '.nc':
             _engine = 'netcdf4'
         elif os.path.splitext(self.data_path)[-1] == '.hdf5':
             _engine = 'h5netcdf'
         else:
-            TypeError('File format current unsupported by DeltaMetrics.')
+            raise TypeError('File format current unsupported by DeltaMetrics.')
+        self._engine = _engine
+
+        if not os.path.isfile(self.data_path):
+            _tempdataset = netCDF4.Dataset(
+                self.data_path, "w", format="NETCDF4")
+            _tempdataset.close()
+            self.dataset = xr.Dataset()
+            self.meta = None
+            return
+
+        if not (self.chunks is None):
+            try:
+                import dask  # noqa: F401
+            except ImportError:
+                raise ImportError(
+                    'Chunked reads require the optional dependency `dask`.')
+
+        try:
+            _store, _, _ = _open_pooled(
+                self.data_path, _engine, cache=(self.cache_bytes is None),
+                dataset=False, meta=False, user=self)
+        except (OSError, ValueError) as e:
+            raise TypeError('File format out of scope for DeltaMetrics') from e
+        self._store = _store
 
+        # opened on first access, see the `dataset` and `meta` properties
+        self._dataset = None
+        self._meta = None
+        self._meta_connected = False
+        self._plan_dataset = None
+        if not self.fast_open:
+            self._connect_dataset()
+            self._connect_meta()
+
+    def _connect_dataset(self):
+        """Open the root group of the connected file as a dataset.
+        """
         try:
-            _dataset = xr.open_dataset(self.data_path, engine=_engine)
+            _, _file, _ = _open_pooled(
+                self.data_path, self._engine,
+                cache=(self.cache_bytes is None), meta=False)
+            _dataset = _file
+            if not (self.chunks is None):
+                _dataset = _dataset.chunk(
+                    _expand_chunks(self.chunks, _dataset))
             if set(['time', 'x', 'y']).issubset(set(_dataset.variables)):
-                self.dataset = _dataset.set_coords(['time', 'y', 'x'])
+                _dataset = _dataset.set_coords(['time', 'y', 'x'])
             else:
-                self.dataset = _dataset.set_coords([])
+                _dataset = _dataset.set_coords([])
                 warn('Dimensions "time", "y", and "x" not provided in the \
                       given data file.', UserWarning)
-        except Exception:
-            raise TypeError('File format out of scope for DeltaMetrics')
+        except (OSError, ValueError) as e:
+            raise TypeError('File format out of scope for DeltaMetrics') from e
 
-        try:
-            _meta = xr.open_dataset(self.data_path, group='meta',
-                                    engine=_engine)
-            self.meta = _meta
-        except OSError:
+        # derived datasets do not close the file, so link it explicitly
+        _dataset.set_close(_file.close)
+        self._dataset = _dataset
+
+        _store = self._store
+        if _PLAN_GROUP in _store.ds.groups:
+            _plan = xr.open_dataset(
+                type(_store)(_store._manager, group=_PLAN_GROUP),
+                cache=False)
+            self._plan_dataset = _plan.assign_coords(_dataset.coords)
+        else:
+            self._plan_dataset = None
+
+    def _connect_meta(self):
+        """Open the metadata group of the connected file.
+        """
+        _, _, _meta = _open_pooled(
+            self.data_path, self._engine, cache=(self.cache_bytes is None),
+            dataset=False)
+        self._meta = _meta
+        self._meta_connected = True
+        if self._meta is None:
             warn('No associated metadata was found in the given data file.',
                  UserWarning)
-            self.meta = None
 
-    def get_known_variables(self):
-        """List known variables.
+    def close(self):
+        """Close the connection to the file.
 
-        These variables are pulled from the loaded dataset.
+        The handle to the file is closed, unless the file is still used by
+        other connections (e.g., of other cubes). Handles are also closed
+        once the connection is garbage collected, and are then kept open
+        only for the :obj:`_HANDLE_POOL_SIZE` most recently used files.
+        Reading ahead is stopped.
         """
-        _vars = list(self.dataset.variables)
-        _coords = list(self.dataset.coords)
-        if ('strata_age' in _vars) or ('strata_depth' in _vars):
-            _coords += ['strata_age', 'strata_depth']
-        self.known_variables = [item for item in _vars if item not in _coords]
+        super().close()
+        _leave_pooled(self)
 
-    def get_known_coords(self):
-        """List known coordinates.
+    @property
+    def dataset(self):
+        """:obj:`xarray.Dataset` : The connected dataset.
+        """
+        if self._dataset is None:
+            self._connect_dataset()
+        return self._dataset
 
-        These coordinates are pulled from the loaded dataset.
+    @dataset.setter
+    def dataset(self, var):
+        self._dataset = var
+
+    @property
+    def meta(self):
+        """:obj:`xarray.Dataset` : The metadata of the connected file.
+
+        `None` if the file has no metadata.
         """
-        self.known_coords = list(self.dataset.coords)
+        if not self._meta_connected:
+            self._connect_meta()
+        return self._meta
 
-    def read(self, var):
-        """Read variable from file and into memory.
+    @meta.setter
+    def meta(self, var):
+        self._meta = var
+        self._meta_connected = True
 
-        Converts `variables` in data file to `xarray` objects for coersion
-        into a :obj:`~deltametrics.cube.Cube` instance.
+    def _variable_names(self):
+        """All variables, and the variables that are coordinates.
+
+        These are read from the header of the file if the dataset has not
+        been opened yet.
+        """
+        if self._dataset is None:
+            return _header_variables(self._store.ds)
+        return list(self.dataset.variables), list(self.dataset.coords)
+
+    def _variable_shape(self, var):
+        """Shape of a variable, read from the header if not yet opened.
+        """
+        if self._dataset is None:
+            return tuple(self._store.ds.variables[var].shape)
+        return self.dataset[var].shape
+
+    def read_group(self, group):
+        """Read a group of the file into memory.
 
         Parameters
         ----------
-        var : `str`
-            Which variable to load from the file.
+        group : `str`
+            Name of the group to read.
+
+        Returns
+        -------
+        group : :obj:`xarray.Dataset` or `None`
+            The group, loaded into memory, or `None` if the group is not
+            found in the file.
+        """
+        _store, _, _ = _open_pooled(self.data_path, self._engine,
+                                    cache=(self.cache_bytes is None),
+                                    dataset=False, meta=False)
+        if not (group in _store.ds.groups):
+            return None
+        _group = xr.open_dataset(type(_store)(_store._manager, group=group))
+        return _group.load()
+
+    def write(self, CubeInstance, variables=[], complevel=4,
+              chunksizes=None, compression='zlib', dtype=None):
+        """Write data to file.
+
+        Take a :obj:`~deltametrics.cube.Cube` and write it to file. Any file
+        existing at the path is overwritten, and the IO object is reconnected
+        to the new file afterwards. Other connections to an overwritten file
+        (e.g., of other cubes) are invalidated, with a warning, and must be
+        opened again.
+
+        The written file contains the `x` and `y` coordinates of the cube,
+        the vertical coordinate (`time` for a
+        :obj:`~deltametrics.cube.DataCube`, and `z` for a
+        :obj:`~deltametrics.cube.StratigraphyCube`), any metadata, and the
+        values of each variable in `variables`. For a
+        :obj:`~deltametrics.cube.StratigraphyCube`, the stratigraphy
+        (i.e., `strata`, `strata_coords`, and `data_coords`) is written into
+        the group ``'stratigraphy'``, so that the cube can be reloaded
+        without recomputing it.
+
+        Parameters
+        ----------
+        CubeInstance : :obj:`~deltametrics.cube.BaseCube` subclass instance
+            The cube to write to file.
+
+        variables : `list` of `str`, optional
+            Which variables to write values to file for. Variables of a
+            :obj:`~deltametrics.cube.StratigraphyCube` are written as
+            "frozen" `z-x-y` arrays.
+
+        complevel : `int`, optional
+            Level of compression, from 0 (no compression) to 9 (highest
+            compression). Default is 4.
+
+        chunksizes : `tuple`, `str`, optional
+            Shape of HDF5 chunks to use for three-dimensional variables, or
+            one of the named layouts ``'section'`` (time-contiguous chunks
+            for fast section and time-series access) or ``'plan'`` (one
+            chunk per time, for fast planform access). ``'dual'`` writes
+            the variables in the section layout, and an additional copy in
+            the plan layout (see :obj:`rechunk`). Default is `None`, which
+            uses the netCDF4 library default.
+
+        compression : `str`, optional
+            Compression filter, either ``'zlib'`` (the default) or
+            ``'blosc'`` (Blosc with zstd, which requires a netCDF4 library
+            built with Blosc support, and is typically faster to read).
+
+        dtype : `str`, :obj:`numpy.dtype`, `dict`, optional
+            Data type to write the values of `variables` as, e.g.,
+            ``'float32'``, or a `dict` mapping variables to data types,
+            e.g., ``{'eta': 'float32', 'channel': 'int8'}``. Default is
+            `None`, which writes the values with their type in the cube.
         """
+        if not self.writeable:
+            raise PermissionError(
+                'Writing is disabled for file: %s' % self.data_path)
+        if compression not in ('zlib', 'blosc'):
+            raise ValueError(
+                'Invalid compression: %s. Must be "zlib" or "blosc".'
+                % compression)
+
+        _groups, _variables = _cube_to_datasets(
+            CubeInstance, variables, dtype=dtype, dual=(chunksizes == 'dual'))
+
+        # written next to the file, and moved into place once complete, in
+        # case the values are read from the file being written over
+        _fd, _tmp = tempfile.mkstemp(
+            prefix='.' + os.path.basename(self.data_path), suffix='.tmp',
+            dir=os.path.dirname(os.path.abspath(self.data_path)))
+        os.close(_fd)
         try:
-            _arr = self.dataset[var]
-        except KeyError as e:
-            raise e
+            _mode = 'w'
+            for group, _ds in _groups.items():
+                _ds.to_netcdf(_tmp, mode=_mode, group=group,
+                              format='NETCDF4', engine='netcdf4')
+                _mode = 'a'
+            for var, _arr, _dtype in _variables:
+                for group in _variable_groups(chunksizes):
+                    _write_netcdf_variable(
+                        _tmp, group, var, _arr, _dtype, complevel,
+                        _group_chunksizes(chunksizes, group), compression)
+        except BaseException:
+            os.remove(_tmp)
+            raise
 
-        self._in_memory_data[var] = _arr.load()
+        # wait on slices being read ahead from the file before closing it
+        self._stop_read_ahead()
 
-    def write(self):
-        """Write data to file.
+        # release all handles to the file, including those of other cubes
+        _users = _release_pooled(self.data_path)
+        _users.discard(self)
+        if len(_users) > 0:
+            warn('Rewriting file used by %s other connection(s), e.g., of '
+                 'other cubes: %s. These connections are invalidated, and '
+                 'must be opened again.' % (len(_users), self.data_path),
+                 UserWarning)
+        _set_default_mode(_tmp)
+        os.replace(_tmp, self.data_path)
+
+        self._reconnect()
 
-        Take a :obj:`~deltametrics.cube.Cube` and write it to file.
 
-        .. warning::
-            Not Implemented.
+class ZarrIO(BaseIO):
+    """Utility for consistent IO with Zarr stores.
 
+    Zarr stores a dataset as a directory of individually compressed chunks.
+    Unlike HDF5-based files, a Zarr store can be read by several processes at
+    once without any file locking, so that, for example, worker processes
+    can each read a different time window of the same cube in parallel.
+
+    The public methods of this class are consistent with
+    :obj:`~deltametrics.io.NetCDFIO`. Requires the optional dependency
+    `zarr`. For more information about the format, visit the Zarr
+    `docs <https://zarr.readthedocs.io>`_.
+    """
+
+    def __init__(self, data_path, type='zarr', write=False, chunks=None,
+                 cache_bytes=None):
+        """Initialize the ZarrIO handler.
+
+        Initialize a connection to a Zarr store.
+
+        Parameters
+        ----------
+        data_path : `str`
+            Path to the store to read or write to.
+
+        type : `str`, optional
+            Stores the type of output file loaded, always 'zarr'.
+
+        write : `bool`, optional
+            Whether to allow writing to the store. Set to False by default. If
+            no store exists at ``data_path``, ``write`` must be True, and an
+            empty store is created.
+
+        chunks : `dict`, `int`, `str`, optional
+            Open the store as a `dask`-backed dataset, split into chunks.
+            Pass ``{}`` to use the chunks the store was written with. See
+            :obj:`~deltametrics.io.NetCDFIO` for other valid options. Default
+            is `None`, which does not use `dask`.
+
+        cache_bytes : `int`, `float`, optional
+            Limit on the memory, in bytes, used by variables read into
+            memory with :obj:`read`. When the limit is exceeded, the least
+            recently used variables are dropped from memory, and are read
+            from the file again when next accessed. Default is `None`, which
+            does not limit the memory used.
         """
-        raise NotImplementedError
+        self.chunks = chunks
 
-    def __getitem__(self, var):
-        if var in self._in_memory_data.keys():
-            return self._in_memory_data[var]
+        super().__init__(data_path=data_path, type=type, write=write,
+                         cache_bytes=cache_bytes)
+
+    def connect(self):
+        """Connect to the data store.
+
+        Initialize the store if it does not exist, or lazily connect to the
+        store if it already exists.
+
+        .. note::
+            This function is automatically called during initialization of any
+            IO object, so it is not necessary to call it directly.
+        """
+        try:
+            import zarr  # noqa: F401
+        except ImportError:
+            raise ImportError(
+                'Zarr stores require the optional dependency `zarr`.')
+
+        if not os.path.exists(self.data_path):
+            xr.Dataset().to_zarr(self.data_path, mode='w', consolidated=True)
+            self.dataset = xr.Dataset()
+            self.meta = None
+            return
+
+        _cache = (self.cache_bytes is None)
+        if self.chunks in ('plan', 'section'):
+            _dataset = xr.open_dataset(self.data_path, engine='zarr',
+                                       chunks=None, cache=_cache)
+            _dataset = _dataset.chunk(_expand_chunks(self.chunks, _dataset))
         else:
-            return self.dataset.variables[var]
+            _dataset = xr.open_dataset(self.data_path, engine='zarr',
+                                       chunks=self.chunks, cache=_cache)
 
-    @property
-    def keys(self):
-        """Variable names in file.
+        if set(['time', 'x', 'y']).issubset(set(_dataset.variables)):
+            self.dataset = _dataset.set_coords(['time', 'y', 'x'])
+        else:
+            self.dataset = _dataset.set_coords([])
+            warn('Dimensions "time", "y", and "x" not provided in the \
+                  given data store.', UserWarning)
+
+        if os.path.isdir(os.path.join(self.data_path, _PLAN_GROUP)):
+            _plan = xr.open_dataset(self.data_path, engine='zarr',
+                                    group=_PLAN_GROUP, chunks=None,
+                                    cache=False)
+            self._plan_dataset = _plan.assign_coords(self.dataset.coords)
+        else:
+            self._plan_dataset = None
+
+        self.meta = self.read_group('meta')
+        if self.meta is None:
+            warn('No associated metadata was found in the given data store.',
+                 UserWarning)
+
+    def read_group(self, group):
+        """Read a group of the store into memory.
+
+        Parameters
+        ----------
+        group : `str`
+            Name of the group to read.
+
+        Returns
+        -------
+        group : :obj:`xarray.Dataset` or `None`
+            The group, loaded into memory, or `None` if the group is not
+            found in the store.
         """
-        return [var for var in self.dataset.variables]
+        if not os.path.isdir(os.path.join(self.data_path, group)):
+            return None
+        return xr.open_zarr(self.data_path, group=group, chunks=None).load()
+
+    def write(self, CubeInstance, variables=[], complevel=4,
+              chunksizes=None, compression='blosc', dtype=None):
+        """Write data to the store.
+
+        Take a :obj:`~deltametrics.cube.Cube` and write it to the store. The
+        contents of the store are the same as written by
+        :obj:`NetCDFIO.write <deltametrics.io.NetCDFIO.write>`. Any store
+        existing at the path is overwritten.
+
+        Parameters
+        ----------
+        CubeInstance : :obj:`~deltametrics.cube.BaseCube` subclass instance
+            The cube to write to the store.
+
+        variables : `list` of `str`, optional
+            Which variables to write values to the store for.
+
+        complevel : `int`, optional
+            Level of compression, from 0 (no compression) to 9 (highest
+            compression). Default is 4.
+
+        chunksizes : `tuple`, `str`, optional
+            Shape of chunks to use for three-dimensional variables, or one of
+            the named layouts ``'section'``, ``'plan'``, or ``'dual'`` (see
+            :obj:`NetCDFIO.write <deltametrics.io.NetCDFIO.write>`). Default
+            is `None`, which uses the Zarr library default.
+
+        compression : `str`, optional
+            Compressor, either ``'blosc'`` (Blosc with zstd, the default) or
+            ``'zlib'``.
+
+        dtype : `str`, :obj:`numpy.dtype`, `dict`, optional
+            Data type to write the values of `variables` as. See
+            :obj:`NetCDFIO.write <deltametrics.io.NetCDFIO.write>`.
+        """
+        import numcodecs
+
+        if not self.writeable:
+            raise PermissionError(
+                'Writing is disabled for store: %s' % self.data_path)
+        if compression not in ('zlib', 'blosc'):
+            raise ValueError(
+                'Invalid compression: %s. Must be "zlib" or "blosc".'
+                % compression)
+
+        _groups, _variables = _cube_to_datasets(
+            CubeInstance, variables, dtype=dtype, dual=(chunksizes == 'dual'))
+        if complevel == 0:
+            _compressor = None
+        elif compression == 'zlib':
+            _compressor = numcodecs.Zlib(level=complevel)
+        else:
+            _compressor = numcodecs.Blosc(cname='zstd', clevel=complevel,
+                                          shuffle=numcodecs.Blosc.SHUFFLE)
+
+        # written next to the store, and moved into place once complete,
+        # in case the values are read from the store being written over
+        _tmp = tempfile.mkdtemp(
+            prefix='.' + os.path.basename(os.path.normpath(self.data_path)),
+            suffix='.tmp',
+            dir=os.path.dirname(os.path.abspath(self.data_path)))
+        try:
+            _mode = 'w'
+            for group, _ds in _groups.items():
+                _ds.to_zarr(_tmp, mode=_mode, group=group, consolidated=True)
+                _mode = 'a'
+            for var, _arr, _dtype in _variables:
+                for group in _variable_groups(chunksizes):
+                    _chunksizes = _layout_chunksizes(
+                        _group_chunksizes(chunksizes, group), _arr.shape)
+                    _encoding = dict(compressor=_compressor)
+                    if (_arr.ndim == 3) and not (_chunksizes is None):
+                        _encoding['chunks'] = _chunksizes
+                    _ds = xr.Dataset(
+                        {var: _stream_variable(_arr, _chunksizes, _dtype)})
+                    _ds.to_zarr(_tmp, mode='a', group=group,
+                                encoding={var: _encoding}, consolidated=True)
+        except BaseException:
+            shutil.rmtree(_tmp)
+            raise
+
+        self.dataset.close()
+        shutil.rmtree(self.data_path)
+        _set_default_mode(_tmp)
+        os.replace(_tmp, self.data_path)
+
+        self._reconnect()
+
+
+class MemmapIO(BaseIO):
+    """Utility for consistent IO with memory-mapped raw arrays.
+
+    The data are stored as a directory, with one uncompressed ``.npy`` file
+    per variable, and a small sidecar file ``metadata.json`` recording the
+    dimensions of each variable, which variables are coordinates, and any
+    attributes. Groups (e.g., ``'meta'``) are stored as subdirectories with
+    the same layout.
+
+    Arrays are opened with :obj:`numpy.memmap`, so that slicing a variable
+    returns a view of the file paged in by the operating system, without
+    any decoding or copying. This makes the format the fastest to read of
+    the supported formats, at the cost of disk space. Existing NetCDF4 files
+    are converted with :obj:`from_NetCDFIO`.
+
+    The public methods of this class are consistent with
+    :obj:`~deltametrics.io.NetCDFIO`.
+    """
+
+    def __init__(self, data_path, type='mmap', write=False, chunks=None,
+                 cache_bytes=None):
+        """Initialize the MemmapIO handler.
+
+        Initialize a connection to a memory-mapped array directory.
+
+        Parameters
+        ----------
+        data_path : `str`
+            Path to the directory to read or write to.
+
+        type : `str`, optional
+            Stores the type of output file loaded, always 'mmap'.
+
+        write : `bool`, optional
+            Whether to allow writing to the directory. Set to False by
+            default. If no directory exists at ``data_path``, ``write`` must
+            be True, and an empty directory is created.
+
+        chunks : optional
+            Not used; memory-mapped arrays are always read lazily. Accepted
+            for consistency with the other IO handlers.
+
+        cache_bytes : `int`, `float`, optional
+            Limit on the memory, in bytes, used by variables read into
+            memory with :obj:`read`. When the limit is exceeded, the least
+            recently used variables are dropped from memory, and are read
+            from the file again when next accessed. Default is `None`, which
+            does not limit the memory used.
+        """
+        self.chunks = chunks
+
+        super().__init__(data_path=data_path, type=type, write=write,
+                         cache_bytes=cache_bytes)
+
+    def connect(self):
+        """Connect to the data directory.
+
+        Initialize the directory if it does not exist, or map the arrays of
+        the directory if it already exists.
+
+        .. note::
+            This function is automatically called during initialization of any
+            IO object, so it is not necessary to call it directly.
+        """
+        if not os.path.exists(self.data_path):
+            _write_memmap_group(xr.Dataset(), self.data_path)
+            self.dataset = xr.Dataset()
+            self.meta = None
+            return
+
+        _dataset = _open_memmap_group(self.data_path)
+        if set(['time', 'x', 'y']).issubset(set(_dataset.variables)):
+            self.dataset = _dataset.set_coords(['time', 'y', 'x'])
+        else:
+            self.dataset = _dataset
+            warn('Dimensions "time", "y", and "x" not provided in the \
+                  given data directory.', UserWarning)
+
+        self.meta = self.read_group('meta')
+        if self.meta is None:
+            warn('No associated metadata was found in the given data '
+                 'directory.', UserWarning)
+
+    @staticmethod
+    def from_NetCDFIO(NetCDFIOInstance, data_path, variables=None):
+        """Convert a NetCDF4 file into memory-mapped arrays.
+
+        Variables are copied one time-slice at a time, so that files larger
+        than the available memory can be converted.
+
+        Parameters
+        ----------
+        NetCDFIOInstance : :obj:`~deltametrics.io.NetCDFIO`
+            The connection to the file to convert.
+
+        data_path : `str`
+            Path to write the directory of memory-mapped arrays to. Any
+            directory existing at the path is overwritten.
+
+        variables : `list` of `str`, optional
+            Which variables to convert. Default is `None`, which converts all
+            variables of the file. Coordinates and the metadata group are
+            always converted.
+
+        Returns
+        -------
+        MemmapIO : :obj:`~deltametrics.io.MemmapIO`
+            Connection to the converted arrays.
+
+        Examples
+        --------
+        >>> netcdf_io = dm.io.NetCDFIO('pyDeltaRCM_output.nc', 'netcdf')  # doctest: +SKIP
+        >>> _ = dm.io.MemmapIO.from_NetCDFIO(netcdf_io, 'golf.mmap')  # doctest: +SKIP
+        >>> golfcube = dm.cube.DataCube('golf.mmap')  # doctest: +SKIP
+        """
+        _dataset = NetCDFIOInstance.dataset
+        if variables is None:
+            variables = NetCDFIOInstance.known_variables
+        _keep = list(_dataset.coords) + list(variables)
+        _dataset = _dataset.drop_vars(
+            [v for v in _dataset.variables if v not in _keep])
+
+        _write_memmap_group(_dataset, data_path)
+        if not (NetCDFIOInstance.meta is None):
+            _write_memmap_group(NetCDFIOInstance.meta,
+                                os.path.join(data_path, 'meta'))
+
+        return MemmapIO(data_path)
+
+    def _load_copy(self, arr):
+        """Copy an array out of the memory-mapped file and into memory.
+        """
+        return arr.copy(deep=True)
+
+    def read_group(self, group):
+        """Read a group of the directory into memory.
+
+        Parameters
+        ----------
+        group : `str`
+            Name of the group to read.
+
+        Returns
+        -------
+        group : :obj:`xarray.Dataset` or `None`
+            The group, loaded into memory, or `None` if the group is not
+            found in the directory.
+        """
+        _path = os.path.join(self.data_path, group)
+        if not os.path.isfile(os.path.join(_path, _MEMMAP_METADATA)):
+            return None
+        return _open_memmap_group(_path).copy(deep=True)
+
+    def write(self, CubeInstance, variables=[], complevel=4,
+              chunksizes=None, compression=None, dtype=None):
+        """Write data to the directory.
+
+        Take a :obj:`~deltametrics.cube.Cube` and write it to the directory.
+        The contents of the directory are the same as written by
+        :obj:`NetCDFIO.write <deltametrics.io.NetCDFIO.write>`. Any arrays
+        existing in the directory are overwritten.
+
+        Parameters
+        ----------
+        CubeInstance : :obj:`~deltametrics.cube.BaseCube` subclass instance
+            The cube to write to the directory.
+
+        variables : `list` of `str`, optional
+            Which variables to write values to the directory for.
+
+        complevel : `int`, optional
+            Not used; memory-mapped arrays are never compressed.
+
+        chunksizes : `tuple`, optional
+            Not used; memory-mapped arrays are never chunked.
+
+        compression : `str`, optional
+            Not used; memory-mapped arrays are never compressed.
+
+        dtype : `str`, :obj:`numpy.dtype`, `dict`, optional
+            Data type to write the values of `variables` as. See
+            :obj:`NetCDFIO.write <deltametrics.io.NetCDFIO.write>`.
+        """
+        if not self.writeable:
+            raise PermissionError(
+                'Writing is disabled for directory: %s' % self.data_path)
+
+        # arrays are replaced one at a time; see `_write_memmap_group`
+        _groups, _variables = _cube_to_datasets(CubeInstance, variables,
+                                                dtype=dtype)
+        for group, _ds in _groups.items():
+            if group is None:
+                _write_memmap_group(_ds, self.data_path)
+            else:
+                _write_memmap_group(_ds, os.path.join(self.data_path, group))
+        for var, _arr, _dtype in _variables:
+            _write_memmap_group(xr.Dataset({var: _arr}), self.data_path,
+                                mode='a', dtype=_dtype)
+
+        self._reconnect()
+
+
+class MultiNetCDFIO(BaseIO):
+    """Utility for consistent IO with several NetCDF4 files as one dataset.
+
+    The files are lazily concatenated along the dimension `concat_dim`,
+    without copying any data. Files concatenated along ``'time'`` (e.g.,
+    successive checkpoints of a single model run) must have matching
+    spatial coordinates. Files concatenated along a new dimension (e.g., the
+    ``'run'`` dimension of an ensemble of model runs) must additionally have
+    matching times; the coordinates of the first file are used for all
+    files.
+
+    The public methods of this class are consistent with
+    :obj:`~deltametrics.io.NetCDFIO`. Requires the optional dependency
+    `dask`.
+    """
+
+    def __init__(self, data_path, type='netcdf', write=False, chunks=None,
+                 cache_bytes=None, concat_dim='time'):
+        """Initialize the MultiNetCDFIO handler.
+
+        Parameters
+        ----------
+        data_path : `list` of `str`
+            Paths to the files to read, in the order to concatenate them.
+
+        type : `str`, optional
+            Stores the type of output files loaded, either netCDF4 files,
+            'netcdf' or HDF5 files, 'hdf5'.
+
+        write : `bool`, optional
+            Must be False; writing to several files is not supported.
+
+        chunks : `dict`, `int`, `str`, optional
+            Chunking of the concatenated dataset. See
+            :obj:`~deltametrics.io.NetCDFIO` for valid options. Default is
+            `None`, which uses one chunk per file.
+
+        cache_bytes : `int`, `float`, optional
+            Limit on the memory used by variables read into memory. See
+            :obj:`~deltametrics.io.NetCDFIO`.
+
+        concat_dim : `str`, optional
+            Dimension to concatenate the files along. Default is ``'time'``.
+        """
+        self.chunks = chunks
+        self.concat_dim = concat_dim
+
+        super().__init__(data_path=data_path, type=type, write=write,
+                         cache_bytes=cache_bytes)
+
+    @property
+    def data_path(self):
+        """`list` of `str` : Paths to data files.
+
+        The setter method validates the paths, and returns a
+        ``FileNotFoundError`` if any file is not found.
+        """
+        return self._data_path
+
+    @data_path.setter
+    def data_path(self, var):
+        if self.writeable:
+            raise PermissionError(
+                'Writing to several files is not supported.')
+        if len(var) == 0:
+            raise ValueError('No files given for "data_path".')
+        for _path in var:
+            if not os.path.isfile(_path):
+                raise FileNotFoundError(
+                    'File not found at supplied path: %s' % _path)
+        self._data_path = list(var)
+
+    def connect(self):
+        """Connect to the data files.
+
+        The files are opened lazily, and concatenated into a single
+        `dask`-backed dataset.
+
+        .. note::
+            This function is automatically called during initialization of any
+            IO object, so it is not necessary to call it directly.
+        """
+        _exts = set([os.path.splitext(p)[-1] for p in self.data_path])
+        if _exts == set(['.nc']):
+            _engine = 'netcdf4'
+        elif _exts == set(['.hdf5']):
+            _engine = 'h5netcdf'
+        else:
+            raise TypeError('Files must all be netCDF4 or all be HDF5 files.')
+        self._engine = _engine
+
+        try:
+            import dask  # noqa: F401
+        except ImportError:
+            raise ImportError(
+                'Reading several files requires the optional dependency '
+                '`dask`.')
+
+        _dataset = self._open_concatenated(group=None)
+        if not (self.chunks is None):
+            _dataset = _dataset.chunk(_expand_chunks(self.chunks, _dataset))
+        if not set(['time', 'x', 'y']).issubset(set(_dataset.variables)):
+            warn('Dimensions "time", "y", and "x" not provided in the \
+                  given data files.', UserWarning)
+        self.dataset = _dataset
+
+        self.meta = self.read_group('meta')
+        if self.meta is None:
+            warn('No associated metadata was found in the given data files.',
+                 UserWarning)
+
+    def _open_concatenated(self, group):
+        """Lazily open and concatenate a group of all of the files.
+        """
+        def _set_coords(ds):
+            return ds.set_coords(
+                [v for v in ('time', 'x', 'y') if v in ds.variables])
+
+        # variables without the concatenation dimension are taken from the
+        # first file, unless concatenating along a new dimension
+        _data_vars = 'minimal' if (self.concat_dim == 'time') else 'all'
+        return xr.open_mfdataset(
+            self.data_path, group=group, engine=self._engine,
+            combine='nested', concat_dim=self.concat_dim,
+            preprocess=_set_coords, data_vars=_data_vars, coords='minimal',
+            compat='override')
+
+    def read_group(self, group):
+        """Read a group of the files into memory.
+
+        The group is concatenated in the same way as the root group of the
+        files.
+
+        Parameters
+        ----------
+        group : `str`
+            Name of the group to read.
+
+        Returns
+        -------
+        group : :obj:`xarray.Dataset` or `None`
+            The group, loaded into memory, or `None` if the group is not
+            found in the first file.
+        """
+        _store, _, _ = _open_pooled(self.data_path[0], self._engine,
+                                    dataset=False, meta=False)
+        if not (group in _store.ds.groups):
+            return None
+        return self._open_concatenated(group=group).load()
+
+    def write(self, CubeInstance):
+        """Writing to several files is not supported.
+        """
+        raise NotImplementedError(
+            'Writing to several files is not supported.')
+
+
+class DictIO(BaseIO):
+    """Utility for consistent IO with data already in memory.
+
+    Wraps a `dict` of `t-x-y` arrays, or an :obj:`xarray.Dataset`, so that
+    data generated in memory can be used in a
+    :obj:`~deltametrics.cube.DataCube` without writing it to file first.
+    The arrays are wrapped, not copied.
+
+    The public methods of this class are consistent with
+    :obj:`~deltametrics.io.NetCDFIO`.
+    """
+
+    def __init__(self, data, type='dict', write=False, chunks=None,
+                 cache_bytes=None):
+        """Initialize the DictIO handler.
+
+        Parameters
+        ----------
+        data : :obj:`dict`, :obj:`xarray.Dataset`
+            The data. A `dict` has keys indicating variable names, and values
+            with corresponding `t-x-y` `ndarray` of data, all of the same
+            shape. Optionally, the `dict` may contain the coordinates
+            ``'time'``, ``'x'``, and ``'y'`` as 1D arrays; otherwise, the
+            coordinates are the indices along each dimension. An
+            :obj:`xarray.Dataset` is used as is.
+
+        type : `str`, optional
+            Stores the type of data loaded, always 'dict'.
+
+        write : `bool`, optional
+            Must be False; writing to data in memory is not supported.
+
+        chunks : `dict`, `int`, `str`, optional
+            Chunking of the data. See :obj:`~deltametrics.io.NetCDFIO` for
+            valid options. Default is `None`, which does not chunk the data.
+
+        cache_bytes : `int`, `float`, optional
+            Limit on the memory used by variables read into memory. See
+            :obj:`~deltametrics.io.NetCDFIO`.
+        """
+        self._data = data
+        self.chunks = chunks
+
+        super().__init__(data_path=None, type=type, write=write,
+                         cache_bytes=cache_bytes)
+
+    @property
+    def data_path(self):
+        """`None` : The data are not connected to a file.
+        """
+        return self._data_path
+
+    @data_path.setter
+    def data_path(self, var):
+        if self.writeable:
+            raise PermissionError(
+                'Writing to data in memory is not supported.')
+        self._data_path = var
+
+    def connect(self):
+        """Wrap the data in a dataset.
+
+        .. note::
+            This function is automatically called during initialization of any
+            IO object, so it is not necessary to call it directly.
+        """
+        if isinstance(self._data, xr.Dataset):
+            _dataset = self._data.set_coords(
+                [v for v in ('time', 'x', 'y') if v in self._data.variables])
+        elif isinstance(self._data, dict):
+            _dataset = _dict_to_dataset(self._data)
+        else:
+            raise TypeError(
+                'Invalid type for "data": %s' % type(self._data))
+
+        if not (self.chunks is None):
+            _dataset = _dataset.chunk(_expand_chunks(self.chunks, _dataset))
+        if not set(['time', 'x', 'y']).issubset(set(_dataset.variables)):
+            warn('Dimensions "time", "y", and "x" not provided in the \
+                  given data.', UserWarning)
+        self.dataset = _dataset
+        self.meta = None
+
+    def read_group(self, group):
+        """Data in memory do not have groups.
+
+        Returns
+        -------
+        group : `None`
+        """
+        return None
+
+    def write(self, CubeInstance):
+        """Writing to data in memory is not supported.
+
+        Use :meth:`~deltametrics.cube.BaseCube.to_file` to write the cube to
+        a file.
+        """
+        raise NotImplementedError(
+            'Writing to data in memory is not supported.')
+
+
+def rechunk(data_path, out_path, variables=None, complevel=4,
+            compression=None, dtype=None):
+    """Write a copy of a file in both the section and the plan layout.
+
+    Sections read the full time series of a few columns of the data,
+    whereas planform utilities (e.g., masks) read all columns at a single
+    time. A file chunked for one of these access patterns serves the other
+    badly. This function writes a copy of the data in `data_path` to a new
+    "dual-layout" file at `out_path`, which contains the variables in
+    time-contiguous chunks (the ``'section'`` layout), and an additional
+    copy of the variables in one chunk per time (the ``'plan'`` layout).
+
+    A :obj:`~deltametrics.cube.DataCube` connected to a dual-layout file
+    routes each access to the cheaper layout automatically: slices at a
+    single time (e.g., ``golfcube['eta'][-1, :, :]``) are read from the plan
+    layout, and all other slices, including sections, from the section
+    layout. The dual-layout file is about twice the size of a file with a
+    single layout.
+
+    Parameters
+    ----------
+    data_path : `str`
+        Path to the file to copy. Any path accepted by
+        :obj:`~deltametrics.cube.DataCube` is valid.
+
+    out_path : `str`
+        Path of the new file, either a NetCDF4 (``.nc``) or HDF5
+        (``.hdf5``) file, or a Zarr (``.zarr``) store. Any file existing at
+        the path is overwritten.
+
+    variables : `list` of `str`, optional
+        Which variables to copy. Default is `None`, which copies all
+        variables.
+
+    complevel, compression, dtype : optional
+        Compression and data type of the variables in the new file. See
+        :meth:`~deltametrics.cube.BaseCube.to_file`.
+
+    Examples
+    --------
+    >>> dm.io.rechunk('pyDeltaRCM_output.nc', 'dual.nc')  # doctest: +SKIP
+    >>> golfcube = dm.cube.DataCube('dual.nc')  # doctest: +SKIP
+    """
+    from . import cube
+
+    if os.path.splitext(os.path.normpath(out_path))[-1] == '.mmap':
+        raise ValueError(
+            'Memory-mapped arrays are not chunked, cannot rechunk to: %s'
+            % out_path)
+
+    _cube = cube.DataCube(data_path)
+    if variables is None:
+        variables = [v for v in _cube.variables if v not in _cube.coords]
+    _cube.to_file(out_path, variables=variables, complevel=complevel,
+                  chunksizes='dual', compression=compression, dtype=dtype)
+
+
+def _dict_to_dataset(data):
+    """Wrap a `dict` of `t-x-y` arrays in an `xarray` dataset, without copying.
+    """
+    _coords = {}
+    _variables = {}
+    for key, value in data.items():
+        if key in ('time', 'x', 'y'):
+            _coords[key] = np.asarray(value)
+        else:
+            _variables[key] = value
+
+    if len(_variables) == 0:
+        raise ValueError('No variables found in "data".')
+    _shape = np.shape(next(iter(_variables.values())))
+    if len(_shape) != 3:
+        raise ValueError(
+            'Variables must be three-dimensional (t-x-y), '
+            'but had shape: %s' % str(_shape))
+    for key, value in _variables.items():
+        if np.shape(value) != _shape:
+            raise ValueError(
+                'Shape of variable "%s" does not match the other variables: '
+                '%s' % (key, str(np.shape(value))))
+
+    _dims = ('time', 'x', 'y')
+    _dataset = xr.Dataset(
+        {key: (_dims, value) for key, value in _variables.items()})
+    for dim, n in zip(_dims, _shape):
+        _coord = _coords.get(dim, np.arange(n))
+        if _coord.shape != (n,):
+            raise ValueError(
+                'Coordinate "%s" must be 1D with length %s, but had shape: '
+                '%s' % (dim, n, str(_coord.shape)))
+        _dataset = _dataset.assign_coords({dim: (dim, _coord)})
+    return _dataset
+
+
+def _open_memmap_group(path):
+    """Open a directory of memory-mapped arrays as an `xarray` dataset.
+    """
+    with open(os.path.join(path, _MEMMAP_METADATA)) as f:
+        _metadata = json.load(f)
+
+    _variables = {}
+    for var, dims in _metadata['variables'].items():
+        _arr = np.load(os.path.join(path, var + '.npy'), mmap_mode='r')
+        _variables[var] = (dims, _arr)
+    _dataset = xr.Dataset(_variables, attrs=_metadata['attrs'])
+    return _dataset.set_coords(_metadata['coords'])
+
+
+def _write_memmap_group(dataset, path, mode='w', dtype=None):
+    """Write an `xarray` dataset as a directory of memory-mapped arrays.
+
+    Variables with more than one dimension are copied one index of the first
+    dimension at a time, so that lazily loaded variables are never read
+    into memory in full. With `mode` ``'a'``, the variables are added to
+    the arrays already in the directory. The data variables are cast to
+    `dtype`, if given.
+    """
+    os.makedirs(path, exist_ok=True)
+    if mode == 'a':
+        with open(os.path.join(path, _MEMMAP_METADATA)) as f:
+            _metadata = json.load(f)
+    else:
+        for _file in os.listdir(path):
+            # remove arrays of any variables previously written to the path
+            if _file.endswith('.npy') and \
+               (os.path.splitext(_file)[0] not in dataset.variables):
+                os.remove(os.path.join(path, _file))
+        _metadata = {'coords': [], 'variables': {}, 'attrs': {}}
+    _metadata['coords'] += [str(c) for c in dataset.coords
+                            if str(c) not in _metadata['coords']]
+    _metadata['attrs'].update({str(k): np.asarray(v).tolist()
+                               for k, v in dataset.attrs.items()})
+
+    for var in dataset.variables:
+        _var = dataset[var].variable
+        if (dtype is None) or (var in dataset.coords):
+            _dtype = _var.dtype
+        else:
+            _dtype = np.dtype(dtype)
+        _file = os.path.join(path, str(var) + '.npy')
+        if os.path.isfile(_file):
+            # unlink first, so that existing maps of the file remain valid
+            os.remove(_file)
+        _arr = np.lib.format.open_memmap(_file, mode='w+',
+                                         dtype=_dtype, shape=_var.shape)
+        if _var.ndim > 1:
+            for i in range(_var.shape[0]):
+                _arr[i] = _var[i].values
+        else:
+            _arr[...] = _var.values
+        _arr.flush()
+        del _arr
+        _metadata['variables'][str(var)] = [str(d) for d in _var.dims]
+
+    with open(os.path.join(path, _MEMMAP_METADATA), 'w') as f:
+        json.dump(_metadata, f, indent=2)
+
+
+class _VariableCache(dict):
+    """Variables read into memory.
+
+    A `dict`, which additionally records when each key was last set or
+    looked up, for dropping the least recently used variables.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.last_used = {}
+
+    def __getitem__(self, key):
+        _value = super().__getitem__(key)
+        self.last_used[key] = next(_CACHE_CLOCK)
+        return _value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.last_used[key] = next(_CACHE_CLOCK)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        del self.last_used[key]
+
+    def pop(self, key, *args):
+        self.last_used.pop(key, None)
+        return super().pop(key, *args)
+
+    @property
+    def nbytes(self):
+        """`int` : Memory used by the values, in bytes.
+        """
+        _nbytes = 0
+        for _value in self.values():
+            if isinstance(_value, tuple):
+                _value = _value[-1]  # (window, array) pairs
+            _nbytes += getattr(_value, 'nbytes', 0)
+        return _nbytes
+
+
+def _evict_caches(caches, cache_bytes):
+    """Drop the least recently used values of several caches.
+
+    Values are dropped across all of the :obj:`_VariableCache` `caches`,
+    until the memory used together is at most `cache_bytes`. Nothing is
+    dropped if `cache_bytes` is `None`.
+    """
+    if cache_bytes is None:
+        return
+    while sum(c.nbytes for c in caches) > cache_bytes:
+        _cache, _key = min(
+            [(c, k) for c in caches for k in c.keys()],
+            key=lambda ck: ck[0].last_used[ck[1]])
+        del _cache[_key]
+
+
+def _expand_window(shape, t, region):
+    """Expand the `t` and `region` of a partial read into a tuple of slices.
+
+    Returns a slice with explicit `start` and `stop` for each dimension of
+    an array of `shape`.
+    """
+    if t is None:
+        t = slice(None)
+    elif isinstance(t, (int, np.integer)):
+        t = slice(t, t + 1) if (t != -1) else slice(t, None)
+    if region is None:
+        region = (None, None, None, None)
+    if len(region) != 4:
+        raise ValueError(
+            '"region" must be given as (y0, y1, x0, x1), but was: %s'
+            % str(region))
+
+    if len(shape) != 3:
+        raise ValueError(
+            'Windows can only be read from three-dimensional variables.')
+
+    _window = []
+    for slc, n in zip((t, slice(*region[:2]), slice(*region[2:])), shape):
+        start, stop, step = slc.indices(n)
+        if (step != 1) or (stop <= start):
+            raise ValueError(
+                'Window must be a non-empty range with step 1, but was: %s'
+                % str(slc))
+        _window.append(slice(start, stop))
+    return tuple(_window)
+
+
+def _prefetch_key(shape, slc):
+    """Split a slice at a single time into the time and a hashable key.
+
+    Returns the time, made non-negative, and a key for the remaining
+    indices of `slc`, or ``(None, None)`` if `slc` is not at a single time
+    or the remaining indices cannot be compared (e.g., index arrays).
+    """
+    _t = slc[0]
+    if not isinstance(_t, (int, np.integer)) or \
+       not (-shape[0] <= _t < shape[0]):
+        return None, None
+    _rest = []
+    for _idx in slc[1:]:
+        if isinstance(_idx, slice):
+            _rest.append((_idx.start, _idx.stop, _idx.step))
+        elif isinstance(_idx, (int, np.integer)) or (_idx is Ellipsis):
+            _rest.append(_idx)
+        else:
+            return None, None
+    return int(_t) % shape[0], tuple(_rest)
+
+
+def _index_in_window(window, shape, slc):
+    """Translate an index into an index of the data read for a window.
+
+    Parameters
+    ----------
+    window : `tuple` of `slice`
+        The window, as returned from :obj:`_expand_window`.
+
+    shape : `tuple` of `int`
+        The shape of the full array.
+
+    slc
+        The index into the full array.
+
+    Returns
+    -------
+    index : `tuple` or `None`
+        The index into the data read for the window, or `None` if `slc` is
+        not entirely inside the window (or is not a basic index of integers
+        and slices).
+    """
+    if not isinstance(slc, tuple):
+        slc = (slc,)
+    if sum(i is Ellipsis for i in slc) > 1:
+        return None
+    if Ellipsis in slc:
+        _i = slc.index(Ellipsis)
+        _fill = (slice(None),) * (len(shape) - len(slc) + 1)
+        slc = slc[:_i] + _fill + slc[_i + 1:]
+    slc = slc + (slice(None),) * (len(shape) - len(slc))
+    if len(slc) != len(shape):
+        return None
+
+    _index = []
+    for idx, win, n in zip(slc, window, shape):
+        if isinstance(idx, (int, np.integer)):
+            idx = int(idx) + n if (idx < 0) else int(idx)
+            if not (win.start <= idx < win.stop):
+                return None
+            _index.append(idx - win.start)
+        elif isinstance(idx, slice):
+            _range = range(*idx.indices(n))
+            if (len(_range) == 0) or (_range.step < 0):
+                return None
+            if (_range[0] < win.start) or (_range[-1] >= win.stop):
+                return None
+            _index.append(slice(_range[0] - win.start,
+                                _range[-1] - win.start + 1, _range.step))
+        else:
+            return None
+    return tuple(_index)
+
+
+def _open_pooled(data_path, engine, cache=True, dataset=True, meta=True,
+                 user=None):
+    """Open a NetCDF4 or HDF5 file, or reuse an open handle to the file.
+
+    Handles are shared by all connections to a file, and are keyed by the
+    absolute path and the modification time of the file, so that a file
+    modified since it was opened is opened again. The root group and the
+    ``'meta'`` group are read through the same handle.
+
+    The connection `user` is recorded as using the handle, until it is
+    garbage collected or leaves the pool (see :obj:`_leave_pooled`).
+    Handles not used by any connection are kept open for the
+    :obj:`_HANDLE_POOL_SIZE` most recently used files, and the least
+    recently used are closed.
+
+    If `cache` is False, the dataset is opened without the `xarray` cache
+    that keeps every variable in memory once it has been loaded in full.
+
+    The root group and the ``'meta'`` group are only opened as `xarray`
+    datasets if `dataset` and `meta`, respectively, are True (or if they were
+    opened already), so that the handle alone can be used to read the header
+    of the file.
+
+    Returns
+    -------
+    store : :obj:`xarray.backends.AbstractDataStore`
+        The handle to the root group of the file.
+
+    dataset : :obj:`xarray.Dataset` or `None`
+        The root group of the file, or `None` if not opened.
+
+    meta : :obj:`xarray.Dataset` or `None`
+        The ``'meta'`` group of the file, or `None` if not opened or if the
+        file does not have a ``'meta'`` group.
+    """
+    _path = os.path.abspath(data_path)
+    _mtime = os.stat(_path).st_mtime_ns
+    _key = (_path, _mtime, engine, cache)
+    if _key not in _HANDLE_POOL:
+        # handles to earlier versions of the file
+        _release_pooled(_path, keep=_mtime)
+
+        if engine == 'netcdf4':
+            _Store = xr.backends.NetCDF4DataStore
+        else:
+            _Store = xr.backends.H5NetCDFStore
+        _HANDLE_POOL[_key] = [_Store.open(_path), None, None,
+                              weakref.WeakSet()]
+    _HANDLE_POOL.move_to_end(_key)
+
+    _entry = _HANDLE_POOL[_key]
+    if not (user is None):
+        _entry[3].add(user)
+    _evict_pooled(keep=_key)
+
+    _store = _entry[0]
+    if dataset and (_entry[1] is None):
+        _entry[1] = xr.open_dataset(_store, cache=cache)
+    if meta and (_entry[2] is None) and ('meta' in _store.ds.groups):
+        _entry[2] = xr.open_dataset(type(_store)(_store._manager,
+                                                 group='meta'))
+    return tuple(_entry[:3])
+
+
+def _header_variables(header):
+    """List the variables and coordinates from the header of a file.
+
+    The coordinates are identified the same way as when the file is opened
+    as an `xarray` dataset by :obj:`NetCDFIO`.
+
+    Parameters
+    ----------
+    header : :obj:`netCDF4.Dataset`, :obj:`h5netcdf.File`
+        The open file.
+
+    Returns
+    -------
+    variables, coords : `list` of `str`
+        All variables, and the variables that are coordinates, in the order
+        of the file.
+    """
+    _vars = list(header.variables)
+    _coords = set(v for v in _vars if v in header.dimensions)
+    for v in _vars:
+        _var = header.variables[v]
+        if hasattr(_var, 'attrs'):
+            _attrs = _var.attrs  # h5netcdf
+        else:
+            _attrs = {k: _var.getncattr(k) for k in _var.ncattrs()}
+        _coords.update(str(_attrs.get('coordinates', '')).split())
+    if set(['time', 'x', 'y']).issubset(set(_vars)):
+        _coords.update(['time', 'x', 'y'])
+    return _vars, [v for v in _vars if v in _coords]
+
+
+def _release_pooled(data_path, keep=None):
+    """Close and forget all pooled handles to a file.
+
+    Handles to the version of the file modified at time `keep` are kept.
+    Handles are closed even if still used by connections, which are
+    returned as a `set`.
+    """
+    _path = os.path.abspath(data_path)
+    _users = set()
+    for _key in [k for k in _HANDLE_POOL.keys()
+                 if (k[0] == _path) and (k[1] != keep)]:
+        _store, _, _, _in_use = _HANDLE_POOL.pop(_key)
+        _users.update(_in_use)
+        _store.close()
+    return _users
+
+
+def _leave_pooled(user):
+    """Stop a connection from using pooled handles.
+
+    Handles no longer used by any connection are closed.
+    """
+    for _key in [k for k, v in _HANDLE_POOL.items() if user in v[3]]:
+        _in_use = _HANDLE_POOL[_key][3]
+        _in_use.discard(user)
+        if len(_in_use) == 0:
+            _HANDLE_POOL.pop(_key)[0].close()
+
+
+def _evict_pooled(keep=None):
+    """Close the least recently used handles not used by any connection.
+
+    Handles are closed until at most :obj:`_HANDLE_POOL_SIZE` handles
+    are pooled, or all remaining handles are used. The handle keyed by
+    `keep` is never closed.
+    """
+    _idle = [k for k, v in _HANDLE_POOL.items()
+             if (len(v[3]) == 0) and (k != keep)]
+    for _key in _idle[:max(len(_HANDLE_POOL) - _HANDLE_POOL_SIZE, 0)]:
+        _HANDLE_POOL.pop(_key)[0].close()
+
+
+def _expand_chunks(chunks, dataset):
+    """Expand the named chunk layouts into an `xarray` chunks mapping.
+
+    Values of `chunks` other than ``'plan'`` and ``'section'`` are returned
+    unchanged.
+    """
+    if chunks not in ('plan', 'section'):
+        return chunks
+
+    if 'time' in dataset.variables:
+        _tdim = dataset['time'].dims[0]
+    else:
+        _tdim = list(dataset.dims)[0]
+
+    _chunks = {}
+    for dim in dataset.dims:
+        if chunks == 'plan':
+            _chunks[dim] = 1 if (dim == _tdim) else -1
+        else:
+            _chunks[dim] = -1 if (dim == _tdim) else _SECTION_TILE
+    return _chunks
+
+
+def _layout_chunksizes(chunksizes, shape):
+    """Expand the named chunk layouts into the chunk shape of a variable.
+
+    Values of `chunksizes` other than ``'plan'`` and ``'section'`` are
+    returned unchanged.
+    """
+    if isinstance(chunksizes, str):
+        if chunksizes == 'plan':
+            return (1, *shape[1:])
+        elif chunksizes == 'section':
+            return (shape[0], *[min(n, _SECTION_TILE) for n in shape[1:]])
+        else:
+            raise ValueError(
+                'Invalid chunksizes: %s. Must be "plan" or "section".'
+                % chunksizes)
+    return chunksizes
+
+
+def _group_chunksizes(chunksizes, group):
+    """Resolve the chunks of a group of a dual-layout file.
+
+    The root group of a dual-layout file is in the section layout, and the
+    plan group in the plan layout. Other values of `chunksizes` are
+    returned unchanged.
+    """
+    if chunksizes != 'dual':
+        return chunksizes
+    return 'plan' if (group == _PLAN_GROUP) else 'section'
+
+
+def _variable_groups(chunksizes):
+    """Groups that each variable is written into for the `chunksizes`.
+
+    A dual-layout file has a copy of each variable in the plan group.
+    """
+    return [None, _PLAN_GROUP] if (chunksizes == 'dual') else [None]
+
+
+def _write_netcdf_variable(data_path, group, var, arr, dtype, complevel,
+                           chunksizes, compression):
+    """Write a variable to a netCDF4 file, one block at a time.
+
+    The values of `arr` are read, cast to `dtype`, and written one block of
+    :obj:`_write_blocks` at a time, so that the variable is never held in
+    memory in full. `compression` is either ``'zlib'``, or ``'blosc'``
+    (Blosc with zstd, which `xarray` does not pass through to netCDF4).
+    """
+    _chunksizes = _layout_chunksizes(chunksizes, arr.shape)
+    _dtype = arr.dtype if (dtype is None) else np.dtype(dtype)
+    if complevel == 0:
+        _compression = None
+    else:
+        _compression = 'blosc_zstd' if (compression == 'blosc') else 'zlib'
+    with netCDF4.Dataset(data_path, 'a') as _file:
+        _group = _file if (group is None) else _file[group]
+        for dim, n in zip(arr.dims, arr.shape):
+            if not (dim in _group.dimensions):
+                _group.createDimension(dim, n)
+        _var = _group.createVariable(
+            var, _dtype, arr.dims, compression=_compression,
+            complevel=complevel, blosc_shuffle=1, chunksizes=_chunksizes)
+        _var.setncatts(arr.attrs)
+        for _slc in _iter_blocks(
+                arr.shape, _write_blocks(arr.shape, _dtype.itemsize,
+                                         _chunksizes)):
+            _var[_slc] = np.asarray(arr[_slc].values, dtype=_dtype)
+
+
+def _write_blocks(shape, itemsize, chunksizes):
+    """Shape of the blocks in which a variable is written to file.
+
+    Blocks are made of whole chunks of the file (`chunksizes`, or one time
+    if `None`), so that each chunk is written once, stacked along the first
+    dimension up to about :obj:`_WRITE_BLOCK_BYTES`.
+    """
+    if chunksizes is None:
+        chunksizes = (1, *shape[1:])
+    _chunkbytes = itemsize * int(np.prod(chunksizes))
+    _n = max(_WRITE_BLOCK_BYTES // max(_chunkbytes, 1), 1)
+    return (min(chunksizes[0] * _n, shape[0]), *chunksizes[1:])
+
+
+def _iter_blocks(shape, blocks):
+    """Iterate over the blocks of an array, as tuples of slices.
+    """
+    _ranges = [range(0, n, b) for n, b in zip(shape, blocks)]
+    for _starts in itertools.product(*_ranges):
+        yield tuple(slice(i, i + b) for i, b in zip(_starts, blocks))
+
+
+def _stream_variable(arr, chunksizes, dtype=None):
+    """Prepare the values of a variable to be written by `xarray`.
+
+    If `dask` is available, the values are split into the blocks of
+    :obj:`_write_blocks`, so that writing reads one block at a time;
+    otherwise, the variable is read in full when written. The values are
+    cast to `dtype`, if given.
+    """
+    try:
+        import dask  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        _itemsize = arr.dtype.itemsize
+        if not (dtype is None):
+            _itemsize = max(_itemsize, np.dtype(dtype).itemsize)
+        _blocks = _write_blocks(arr.shape, _itemsize, chunksizes)
+        arr = arr.chunk(dict(zip(arr.dims, _blocks)))
+    if not (dtype is None):
+        arr = arr.astype(dtype)
+    return arr
+
+
+def _set_default_mode(path):
+    """Set the permissions of a temporary file or directory from the umask.
+
+    Temporary files and directories are created readable only by the owner,
+    so that they are given the permissions of any other new file or
+    directory before they are moved into place.
+    """
+    _umask = os.umask(0)
+    os.umask(_umask)
+    _mode = 0o777 if os.path.isdir(path) else 0o666
+    os.chmod(path, _mode & ~_umask)
+
+
+def _cube_to_datasets(CubeInstance, variables, dtype=None, dual=False):
+    """Collect the contents of a cube into `xarray` datasets for writing.
+
+    The datasets hold the coordinates, the metadata, and the stratigraphy
+    of the cube. The values of `variables` are not read; they are returned
+    separately, to be written one variable at a time (see
+    :obj:`_cube_variables`).
+
+    Parameters
+    ----------
+    CubeInstance : :obj:`~deltametrics.cube.BaseCube` subclass instance
+        The cube to collect.
+
+    variables : `list` of `str`
+        Which variables to collect values for.
+
+    dtype : `str`, :obj:`numpy.dtype`, `dict`, optional
+        Data type to cast the values of `variables` to, or a `dict` mapping
+        variables to data types. Variables not in the `dict` are not cast.
+
+    dual : `bool`, optional
+        Whether to add the plan group, to write a copy of `variables` into
+        in the plan layout.
+
+    Returns
+    -------
+    groups : `dict`
+        Datasets to write, keyed by the group name, where `None` is the root
+        group.
+
+    variables : iterator
+        The name, values, and data type of each of `variables`; see
+        :obj:`_cube_variables`.
+    """
+    from . import cube
+
+    for var in variables:
+        if var in CubeInstance.coords:
+            raise ValueError(
+                'Cannot write coordinate "%s" as a variable.' % var)
+
+    if isinstance(CubeInstance, cube.StratigraphyCube):
+        _vdim, _vcoord = 'z', np.asarray(CubeInstance.z)
+    else:
+        _vdim, _vcoord = 'time', np.asarray(CubeInstance.t)
+    _dims = (_vdim, 'length', 'width')
+
+    _x = np.array(CubeInstance.dataio['x'])
+    _y = np.array(CubeInstance.dataio['y'])
+    if _x.ndim == 2:
+        _xdims, _ydims = ('length', 'width'), ('length', 'width')
+    else:
+        _xdims, _ydims = ('length',), ('width',)
+    _coords = {_vdim: (_vdim, _vcoord), 'x': (_xdims, _x), 'y': (_ydims, _y)}
+
+    _groups = {None: xr.Dataset(coords=_coords)}
+    if dual:
+        # coordinates are shared with the root group
+        _groups[_PLAN_GROUP] = xr.Dataset()
+
+    if isinstance(CubeInstance, cube.StratigraphyCube):
+        # write the time coordinate and the stratigraphy mapping
+        _t = np.array(CubeInstance.dataio['time'])
+        _groups[None] = _groups[None].assign_coords(time=('time', _t))
+        _strat = xr.Dataset({
+            'strata_coords': (('n_coords', 'n_dims'),
+                              CubeInstance.strata_coords),
+            'data_coords': (('n_coords', 'n_dims'),
+                            CubeInstance.data_coords),
+            'strata': (('time', 'length', 'width'), CubeInstance.strata)})
+        if isinstance(CubeInstance.source_path, str):
+            _strat.attrs['source_path'] = os.path.abspath(
+                CubeInstance.source_path)
+        _groups['stratigraphy'] = _strat
+
+    if not (CubeInstance.meta is None):
+        _groups['meta'] = CubeInstance.meta.load()
+
+    return _groups, _cube_variables(CubeInstance, variables, _dims, dtype)
+
+
+def _cube_variables(CubeInstance, variables, dims, dtype=None):
+    """Iterate over the values of variables of a cube, for writing.
+
+    Yields the name of each variable, its values as an
+    :obj:`xarray.DataArray` with dimensions `dims` and without coordinates,
+    and the data type to write it as (see :obj:`_cube_to_datasets`). Values
+    read from a file are yielded lazily. Values of a
+    :obj:`~deltametrics.cube.StratigraphyCube` placed into stratigraphic
+    position are computed when yielded, and are not kept in the cube, so
+    that only one variable is held in memory at a time.
+    """
+    from . import cube
+
+    for var in variables:
+        if isinstance(dtype, dict):
+            _dtype = dtype.get(var, None)
+        else:
+            _dtype = dtype
+        if isinstance(CubeInstance, cube.StratigraphyCube) and \
+           not (var in CubeInstance._frozen_variables):
+            _arr = xr.DataArray(
+                CubeInstance._stratigraphic_values(var, cache=False),
+                dims=dims)
+        else:
+            _arr = CubeInstance[var].data
+            _arr = _arr.drop_vars(list(_arr.coords))
+            _arr = _arr.rename(
+                {d: n for d, n in zip(_arr.dims, dims) if d != n})
+        yield var, _arr, _dtype
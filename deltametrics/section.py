@@ -2,6 +2,7 @@ import abc
 import warnings
 
 import numpy as np
+import xarray as xr
 from scipy import sparse
 
 import matplotlib.pyplot as plt
@@ -348,7 +349,7 @@ class BaseSection(abc.ABC):
         if type(self.cube) is cube.DataCube:
             if self.cube._knows_stratigraphy:
                 return DataSectionVariable(
-                    _data=self.cube[var].data.values[:, self._y, self._x],
+                    _data=self._take_section(self.cube[var]),
                     _s=self.s, _z=self.z,
                     _psvd_mask=self.cube.strat_attr.psvd_idx[:, self._y, self._x],  # noqa: E501
                     _strat_attr=self.cube.strat_attr(
@@ -356,12 +357,13 @@ class BaseSection(abc.ABC):
                     )
             else:
                 return DataSectionVariable(
-                    _data=self.cube[var].data.values[:, self._y, self._x],
+                    _data=self._take_section(self.cube[var]),
                     _s=self.s, _z=self.z
                     )
         elif type(self.cube) is cube.StratigraphyCube:
+            # fill only the section columns of the stratigraphy
             return StratigraphySectionVariable(
-                _data=self.cube[var].data.values[:, self._y, self._x],
+                _data=self.cube._take_section(var, self._y, self._x),
                 _s=self.s, _z=self.z
                 )
         elif self.cube is None:
@@ -371,6 +373,18 @@ class BaseSection(abc.ABC):
             raise TypeError('Unknown Cube type encountered: %s'
                             % type(self.cube))
 
+    def _take_section(self, CubeVariableInstance):
+        """Extract the section columns from a cube variable.
+
+        The section is sliced from the underlying (possibly lazy) data
+        before values are pulled into memory, so that only the data along
+        the section trace are read from disk. This is equivalent to
+        ``CubeVariableInstance.data.values[:, self._y, self._x]``.
+        """
+        _y = xr.DataArray(self._y, dims='s')
+        _x = xr.DataArray(self._x, dims='s')
+        return CubeVariableInstance.data[:, _y, _x].values
+
     def show(self, SectionAttribute, style='shaded', data=None,
              label=False, colorbar=True, colorbar_label=False, ax=None):
         """Show the section.
@@ -721,7 +735,7 @@ class StrikeSection(BaseSection):
         """Calculate coordinates of the strike section.
         """
         if self._input_xlim is None:
-            _nx = self.cube['eta'].shape[2]
+            _nx = self.cube.shape[2]
             self._x = np.arange(_nx)
         else:
             self._x = np.arange(self._input_xlim[0], self._input_xlim[1])
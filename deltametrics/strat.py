@@ -1,4 +1,5 @@
 import abc
+import concurrent.futures
 
 import numpy as np
 import xarray as xr
@@ -35,7 +36,8 @@ def compute_compensation(line1, line2):
 
 
 def compute_boxy_stratigraphy_volume(elev, prop, dz=None, z=None,
-                                     return_cube=False):
+                                     return_cube=False, dtype=None,
+                                     n_workers=None, tile_shape=None):
     """Process t-x-y data volume to boxy stratigraphy volume.
 
     This function returns a "frozen" cube of stratigraphy
@@ -64,6 +66,21 @@ def compute_boxy_stratigraphy_volume(elev, prop, dz=None, z=None,
         :obj:`~deltametrics.cube.FrozenStratigraphyCube` instance. Default is
         to return an `ndarray` and :obj:`elevations` `ndarray`.
 
+    dtype : :obj:`str`, :obj:`numpy.dtype`, optional
+        Floating point type of the stratigraphy, e.g., ``'float32'``. Default
+        is `None`, which uses ``float64``.
+
+    n_workers : :obj:`int`, optional
+        Number of processes to compute the stratigraphy with. Stratigraphic
+        columns are independent in x-y, so the x-y domain is split into
+        tiles (see `tile_shape`), which are computed in parallel and merged.
+        Default is `None`, which computes in this process.
+
+    tile_shape : :obj:`tuple` of :obj:`int`, optional
+        Shape of the x-y tiles, e.g., ``(100, 100)``. Default is `None`,
+        which does not split the domain, or, if `n_workers` is given,
+        splits the domain into `n_workers` strips along the first x-y axis.
+
     Returns
     -------
     stratigraphy :
@@ -77,19 +94,19 @@ def compute_boxy_stratigraphy_volume(elev, prop, dz=None, z=None,
     if elev.ndim != 3:
         raise ValueError('Input arrays must be three-dimensional.')
 
-    # compute preservation from low-level funcs
-    strata, _ = _compute_elevation_to_preservation(elev)
+    # compute preservation from low-level funcs, for each x-y tile
     z = _determine_strat_coordinates(elev, dz=dz, z=z)
-    strata_coords, data_coords = _compute_preservation_to_cube(strata, z=z)
-
-    # copy data out and into the stratigraphy based on coordinates
-    nx, ny = strata.shape[1:]
-    stratigraphy = np.full((len(z), nx, ny), np.nan)  # preallocate nans
-    _cut = prop.data.values[data_coords[:, 0], data_coords[:, 1],
-                            data_coords[:, 2]]
-    stratigraphy[strata_coords[:, 0],
-                 strata_coords[:, 1],
-                 strata_coords[:, 2]] = _cut
+    _dtype = float if (dtype is None) else dtype
+    _results = _map_xy_tiles(_compute_boxy_volume_tile, (elev, prop),
+                             (z, _dtype), n_workers=n_workers,
+                             tile_shape=tile_shape)
+    nx, ny = elev.shape[1:]
+    if len(_results) == 1:
+        _, stratigraphy = _results[0]
+    else:
+        stratigraphy = np.empty((len(z), nx, ny), dtype=_dtype)
+        for _tile, _strat in _results:
+            stratigraphy[(slice(None),) + _tile] = _strat
 
     elevations = np.tile(z, (ny, nx, 1)).T
 
@@ -101,7 +118,8 @@ def compute_boxy_stratigraphy_volume(elev, prop, dz=None, z=None,
 
 def compute_boxy_stratigraphy_coordinates(elev, dz=None, z=None,
                                           return_cube=False,
-                                          return_strata=False):
+                                          return_strata=False,
+                                          n_workers=None, tile_shape=None):
     """Process t-x-y data volume to boxy stratigraphy coordinates.
 
     This function computes the corresponding preservation of `t-x-y`
@@ -121,14 +139,30 @@ def compute_boxy_stratigraphy_coordinates(elev, dz=None, z=None,
     dz : :obj:`float`
         Vertical resolution of stratigraphy, in meters.
 
+    n_workers : :obj:`int`, optional
+        Number of processes to compute the stratigraphy with. Stratigraphic
+        columns are independent in x-y, so the x-y domain is split into
+        tiles (see `tile_shape`), which are computed in parallel and merged.
+        Default is `None`, which computes in this process.
+
+    tile_shape : :obj:`tuple` of :obj:`int`, optional
+        Shape of the x-y tiles, e.g., ``(100, 100)``. Default is `None`,
+        which does not split the domain, or, if `n_workers` is given,
+        splits the domain into `n_workers` strips along the first x-y axis.
+
     Returns
     -------
     stratigraphy_cube :
     """
-    # compute preservation from low-level funcs
-    strata, _ = _compute_elevation_to_preservation(elev)
+    # compute preservation from low-level funcs, for each x-y tile
     z = _determine_strat_coordinates(elev, dz=dz, z=z)
-    strata_coords, data_coords = _compute_preservation_to_cube(strata, z=z)
+    _results = _map_xy_tiles(_compute_boxy_coordinates_tile, (elev,), (z,),
+                             n_workers=n_workers, tile_shape=tile_shape)
+    if len(_results) == 1:
+        _, (strata_coords, data_coords, strata) = _results[0]
+    else:
+        strata_coords, data_coords, strata = _merge_coordinate_tiles(
+            _results, elev.shape, len(z))
 
     if return_cube:
         raise NotImplementedError
@@ -236,7 +270,8 @@ class MeshStratigraphyAttributes(BaseStratigraphyAttributes):
         because the column cannot change with preservation.
     """
 
-    def __init__(self, elev, **kwargs):
+    def __init__(self, elev, dtype=None, n_workers=None, tile_shape=None,
+                 **kwargs):
         """
         We can precompute several attributes of the stratigraphy, including
         which voxels are preserved, what their row indicies in the sparse
@@ -249,35 +284,43 @@ class MeshStratigraphyAttributes(BaseStratigraphyAttributes):
 
         elev :
             elevation t-x-y array to compute from
+
+        dtype : :obj:`str`, :obj:`numpy.dtype`, optional
+            Floating point type of the elevation attributes (e.g.,
+            :obj:`strata` and ``psvd_flld``). Default is `None`, which uses
+            ``float64`` (and the type of `elev` for :obj:`strata`).
+
+        n_workers, tile_shape : optional
+            Number of processes, and shape of the x-y tiles, to compute the
+            attributes with. See
+            :obj:`~deltametrics.strat.compute_boxy_stratigraphy_coordinates`.
         """
         super().__init__('mesh')
 
-        _eta = elev.data.copy()
-        _strata, _psvd = _compute_elevation_to_preservation(_eta)
-        _psvd[0, ...] = True
-        self.strata = _strata
-
-        self.psvd_vxl_cnt = _psvd.sum(axis=0, dtype=int)
-        self.psvd_vxl_idx = _psvd.cumsum(axis=0, dtype=int)
-        self.psvd_vxl_cnt_max = int(self.psvd_vxl_cnt.max())
-        self.psvd_idx = _psvd.astype(bool)  # guarantee bool
+        _eta = elev.data.copy().load()  # computed in memory, even if chunked
+        if not (dtype is None):
+            _eta = _eta.astype(dtype)
+        _dtype = float if (dtype is None) else dtype
+        _results = _map_xy_tiles(_compute_mesh_tile, (_eta,), (_dtype,),
+                                 n_workers=n_workers, tile_shape=tile_shape)
+        if len(_results) == 1:
+            _, _attrs = _results[0]
+        else:
+            _attrs = _merge_mesh_tiles(_results, _eta.shape, _dtype)
+        (self.strata, self.psvd_idx, self.psvd_vxl_cnt, self.psvd_vxl_idx,
+         self.psvd_vxl_eta) = _attrs
+        self.psvd_vxl_cnt_max = self.psvd_vxl_eta.shape[0]
 
-        # Determine the elevation of any voxel that is preserved.
-        # These are matrices that are size n_preserved-x-y.
-        #    psvd_vxl_eta : records eta for each entry in the preserved matrix.
+        # Fill above the last preserved voxel with its elevation
         #    psvd_flld    : fills above with final eta entry (for pcolormesh).
-        self.psvd_vxl_eta = np.full((self.psvd_vxl_cnt_max,
-                                     *_eta.shape[1:]), np.nan)
-        self.psvd_flld = np.full((self.psvd_vxl_cnt_max,
-                                  *_eta.shape[1:]), np.nan)
-        for i in np.arange(_eta.shape[1]):
-            for j in np.arange(_eta.shape[2]):
-                self.psvd_vxl_eta[0:self.psvd_vxl_cnt[i, j], i, j] = _eta.data[
-                    self.psvd_idx[:, i, j], i, j].copy()
-                self.psvd_flld[0:self.psvd_vxl_cnt[i, j], i, j] = _eta.data[
-                    self.psvd_idx[:, i, j], i, j].copy()
-                self.psvd_flld[self.psvd_vxl_cnt[i, j]:, i, j] = self.psvd_flld[  # noqa: E501
-                    self.psvd_vxl_cnt[i, j] - 1, i, j]
+        _top = np.take_along_axis(
+            self.psvd_vxl_eta, self.psvd_vxl_cnt[np.newaxis, ...] - 1, axis=0)
+        _above = (np.arange(self.psvd_vxl_cnt_max)[:, np.newaxis, np.newaxis]
+                  >= self.psvd_vxl_cnt[np.newaxis, ...])
+        self.psvd_flld = np.where(_above, _top, self.psvd_vxl_eta)
+
+        # arrays with spare capacity, to append to (see `append`)
+        self._buffers = {}
 
     def __call__(self, _dir, _x0, _x1):
         """Get a slice out of the stratigraphy attributes.
@@ -319,6 +362,117 @@ class MeshStratigraphyAttributes(BaseStratigraphyAttributes):
             raise ValueError('Bad "_dir" argument: %s' % str(_dir))
         return strat_attr
 
+    def append(self, elev):
+        """Update the attributes with elevation at new times.
+
+        Use to keep the stratigraphy of a running model up to date, e.g.,
+        each time a new output is saved, without recomputing from the start.
+        The result is identical to computing the attributes from the
+        elevation of all times.
+
+        A new surface preserves a new voxel where it is above the final
+        strata surface, and otherwise only caps (erodes) the strata below
+        it. Only the columns eroded by the new surface are recomputed, and
+        the arrays keep spare capacity along their first axis, so that an
+        update costs only as much as the columns it affects.
+
+        Parameters
+        ----------
+        elev : :obj:`ndarray` or :obj:`xr.core.dataarray.DataArray`
+            The `x-y` elevation at a new time, or the `t-x-y` elevation at
+            several new times, appended after the last time.
+
+        Examples
+        --------
+        >>> golfcube = dm.sample_data.golf()
+        >>> sa = dm.strat.MeshStratigraphyAttributes(golfcube['eta'])
+        >>> eta_new = golfcube['eta'][-1, :, :] - 0.1  # e.g., a new output
+        >>> sa.append(eta_new)
+        >>> sa.strata.shape
+        (102, 100, 200)
+        """
+        _elev = _as_ndarray(elev)
+        if _elev.ndim == (self.strata.ndim - 1):
+            _elev = _elev[np.newaxis, ...]
+        if _elev.shape[1:] != self.strata.shape[1:]:
+            raise ValueError(
+                'Mismatched shapes of "elev" %s and strata %s.' % (
+                    _elev.shape, self.strata.shape))
+        for _e in _elev:
+            self._append_surface(_e.astype(self.strata.dtype, copy=False))
+
+    def _append_surface(self, e):
+        """Update the attributes with the `x-y` elevation `e` at a new time.
+        """
+        _final = self.strata[-1, ...].copy()
+        _new = _final < e  # new voxel preserved on top
+        _eroded = ~(e >= _final)  # capped by the new surface (or nan)
+
+        # eroded columns: cap the strata and drop the voxels above the cap
+        _i, _j = np.nonzero(_eroded)
+        if _i.size > 0:
+            _strata = np.minimum(self.strata[:, _i, _j], e[_i, _j])
+            _psvd = np.ones(_strata.shape, dtype=bool)
+            _psvd[1:] = _strata[:-1] < _strata[1:]
+            _idx = _psvd.cumsum(axis=0, dtype=int)
+            self.strata[:, _i, _j] = _strata
+            self.psvd_idx[:, _i, _j] = _psvd
+            self.psvd_vxl_idx[:, _i, _j] = _idx
+            self.psvd_vxl_cnt[_i, _j] = _idx[-1]
+            _dropped = (np.arange(self.psvd_vxl_cnt_max)[:, np.newaxis]
+                        >= _idx[-1])
+            _vxl_eta = self.psvd_vxl_eta[:, _i, _j]
+            _vxl_eta[_dropped] = np.nan
+            self.psvd_vxl_eta[:, _i, _j] = _vxl_eta
+
+        # the new time, for all columns
+        _last_idx = self.psvd_vxl_idx[-1, ...] + _new
+        self._extend('strata', 1)[-1, ...] = e
+        self._extend('psvd_idx', 1)[-1, ...] = _new
+        self._extend('psvd_vxl_idx', 1)[-1, ...] = _last_idx
+        self.psvd_vxl_cnt[_new] += 1
+
+        # resize the preserved matrices to the most preserved voxels
+        _cnt_max = int(self.psvd_vxl_cnt.max())
+        _rows = self.psvd_vxl_cnt_max
+        if _cnt_max > _rows:
+            self._extend('psvd_vxl_eta', _cnt_max - _rows)[_rows:] = np.nan
+            self._extend('psvd_flld', _cnt_max - _rows)[_rows:] = \
+                self.psvd_flld[_rows - 1]  # filled with the final entry
+        else:
+            self.psvd_vxl_eta = self.psvd_vxl_eta[:_cnt_max]
+            self.psvd_flld = self.psvd_flld[:_cnt_max]
+        self.psvd_vxl_cnt_max = _cnt_max
+
+        # place the new voxels, and refill the changed columns
+        _i, _j = np.nonzero(_new)
+        self.psvd_vxl_eta[self.psvd_vxl_cnt[_i, _j] - 1, _i, _j] = e[_i, _j]
+        _i, _j = np.nonzero(_new | _eroded)
+        _cnt = self.psvd_vxl_cnt[_i, _j]
+        _vxl_eta = self.psvd_vxl_eta[:, _i, _j]
+        _top = _vxl_eta[_cnt - 1, np.arange(_cnt.size)]
+        _above = np.arange(_cnt_max)[:, np.newaxis] >= _cnt
+        self.psvd_flld[:, _i, _j] = np.where(_above, _top, _vxl_eta)
+
+    def _extend(self, name, n):
+        """Extend the array attribute `name` by `n` rows along the first axis.
+
+        The new rows are not initialized. The array is a view of a buffer
+        with spare capacity, which is doubled when full, so that repeated
+        appends only occasionally copy the array.
+        """
+        _arr = getattr(self, name)
+        _len = _arr.shape[0] + n
+        _buffer = self._buffers.get(name)
+        if (_buffer is None) or not (_arr.base is _buffer) or \
+           (_buffer.shape[0] < _len):
+            _buffer = np.empty((max(_len, 2 * _arr.shape[0]),
+                                *_arr.shape[1:]), dtype=_arr.dtype)
+            _buffer[:_arr.shape[0]] = _arr
+            self._buffers[name] = _buffer
+        setattr(self, name, _buffer[:_len])
+        return getattr(self, name)
+
     @property
     def data(self):
         return self._data
@@ -348,7 +502,8 @@ class MeshStratigraphyAttributes(BaseStratigraphyAttributes):
         return self._psvd_vxl_cnt
 
 
-def _compute_elevation_to_preservation(elev):
+def _compute_elevation_to_preservation(elev, strata=None, psvd=None,
+                                       chunk_size=None):
     """Compute the preserved elevations of stratigraphy.
 
     Given elevation data alone, we can compute the preserved stratal surfaces.
@@ -357,6 +512,14 @@ def _compute_elevation_to_preservation(elev):
     determining when was the most recent time that the bed elevation was equal
     to a given elevation.
 
+    The elevation data can be streamed through in blocks of `chunk_size`
+    times, from the last time backward, keeping only the running minimum
+    elevation (a single `x-y` "plate") between blocks. With a lazily loaded
+    `elev` (e.g., a :obj:`~deltametrics.cube.CubeVariable` of a cube
+    connected to a file), and `strata` and `psvd` arrays on disk (e.g., a
+    :obj:`numpy.memmap` or a `zarr` array), preservation can then be computed
+    for data larger than memory.
+
     This function is declared as private and not part of the public API,
     however some users may find it helpful. The function is heavily utlized
     internally. Function inputs and outputs are standard numpy `ndarray`, so
@@ -367,6 +530,16 @@ def _compute_elevation_to_preservation(elev):
     elev : :obj:`ndarray` or :obj:`xr.core.dataarray.DataArray`
         The `t-x-y` volume of elevation data to determine stratigraphy.
 
+    strata, psvd : array-like, optional
+        Arrays, with the shape of `elev`, to write the stratal surface
+        elevations and preservation into, block by block. Any array that
+        supports assignment to a slice along the first axis can be used.
+        Default is `None`, which allocates an `ndarray` in memory.
+
+    chunk_size : :obj:`int`, optional
+        Number of times of `elev` read (and written to `strata` and `psvd`)
+        at once. Default is `None`, which reads all times at once.
+
     Returns
     -------
     strata : :obj:`ndarray`
@@ -378,26 +551,47 @@ def _compute_elevation_to_preservation(elev):
         To determine whether time from a given *timestep* is preserved, use
         ``psvd.nonzero()[0] - 1``.
     """
-    psvd = np.zeros_like(elev.data, dtype=bool)  # bool, if retained
-    strata = np.zeros_like(elev.data)  # elev of surface at each t
-
-    nt = strata.shape[0]
-    if isinstance(elev, np.ndarray) is True:
+    if isinstance(elev, (np.ndarray, xr.core.dataarray.DataArray)) is True:
         _elev = elev
-    elif isinstance(elev, xr.core.dataarray.DataArray) is True:
-        _elev = elev.values
     else:  # case where elev is a CubeVariable
-        _elev = elev.data.values
-
-    strata[-1, ...] = _elev[-1, ...]
-    for j in np.arange(nt - 2, -1, -1):
-        strata[j, ...] = np.minimum(_elev[j, ...],
-                                    strata[j + 1, ...])
-        psvd[j + 1, ...] = np.less(strata[j, ...],
-                                   strata[j + 1, ...])
+        _elev = elev.data
+
+    nt = _elev.shape[0]
+    if strata is None:
+        strata = np.empty(_elev.shape, dtype=_elev.dtype)  # elev of surface
+    if psvd is None:
+        psvd = np.zeros(_elev.shape, dtype=bool)  # bool, if retained
+    if (chunk_size is None) or (chunk_size > nt):
+        chunk_size = nt
+    if not (int(chunk_size) > 0):
+        raise ValueError(
+            '"chunk_size" must be a positive integer, but was: %s'
+            % chunk_size)
+    chunk_size = int(chunk_size)
+
+    plate = None  # elev of surface at the time after the current block
+    for t1 in range(nt, 0, -chunk_size):
+        t0 = max(t1 - chunk_size, 0)
+        _e = np.asarray(_elev[t0:t1])
+        if isinstance(strata, np.ndarray):
+            _s = strata[t0:t1]  # computed in place
+        else:
+            _s = np.empty(_e.shape, dtype=strata.dtype)
+
+        # running minimum backward in time, continued from the later block
+        np.minimum.accumulate(_e[::-1], axis=0, out=_s[::-1])
+        if not (plate is None):
+            np.minimum(_s, plate, out=_s)
+            psvd[t1] = np.less(_s[-1], plate)
+        psvd[t0 + 1:t1] = np.less(_s[:-1], _s[1:])
+        if not isinstance(strata, np.ndarray):
+            strata[t0:t1] = _s
+        plate = np.array(_s[0], copy=True)
+
     if nt > 1:  # allows a single-time elevation-series to return
-        psvd[0, ...] = np.less(strata[0, ...],
-                               strata[1, ...])
+        psvd[0] = psvd[1]  # i.e., strata[0] < strata[1]
+    else:
+        psvd[0] = False
 
     return strata, psvd
 
@@ -446,16 +640,20 @@ def _compute_preservation_to_cube(strata, z):
 
     While stratigraphy is time-dependent, preservation at any spatial x-y
     location is independent of any other location. Thus, the computation is
-    vectorized to sweep through all "stratigraphic columns" simultaneously.
-    The operation works by beginning at the highest elevation of the
-    stratigraphic volume, and sweeping down though all elevations with an
-    `x-y` "plate". The plate indicates whether sediments are preserved below
-    the current iteration elevation, at each x-y location.
-
-    Once the iteration elevation is less than the strata surface at any x-y
-    location, there will *always* be sediments preserved below it, at every
-    elevation. We simply need to determine which time interval these sediments
-    record. Then we store this time indicator into the sparse array.
+    vectorized over all "stratigraphic columns" simultaneously. Sediments
+    are preserved at every elevation below the final strata surface of a
+    column, so the number of preserved elevations of each column is found
+    once, up front, from the final surface. The preserved elevations are
+    ordered from the highest elevation of the stratigraphic volume down.
+
+    We simply need to determine which time interval the sediments at each
+    elevation record. Because the strata surfaces of a column never
+    decrease in time, this is a binary search of the column (i.e.,
+    ``searchsorted``) for the elevation, rather than a scan of all times.
+    The surfaces are ranked among the elevations and offset by column, so
+    that all columns are searched for all of their preserved elevations
+    with a single ``searchsorted``. Then we store this time indicator into
+    the sparse array.
 
     So, in the end, coordinates in resultant boxy stratigraphy are linked to
     `t-x-y` coordinates in the data source, by building a mapping that can be
@@ -487,34 +685,88 @@ def _compute_preservation_to_cube(strata, z):
         An `N x 3` array of `t-x-y` coordinates where information is to be
         extracted from the data array. Rows in `data_coords` correspond
         with rows in `strat_coords`.
+
+    .. note::
+
+        The coordinates are stored with the smallest unsigned integer type
+        that fits the dimensions of the stratigraphy and data (e.g.,
+        `uint16` for dimensions up to 65536), rather than `int64`, which
+        reduces the memory of the mapping by up to eight times.
     """
-    # preallocate boxy arrays and helpers
-    plate = np.atleast_1d(np.zeros(strata.shape[1:], dtype=np.int8))
-    strat_coords, data_coords = [], []  # preallocate sparse idx lists
-    _zero = np.array([0])
-
-    # the main loop through the elevations
-    seek_elev = strata[-1, ...]  # the first seek is the last surface
-    for k in np.arange(len(z) - 1, -1, -1):  # for every z, from the top
-        e = z[k]  # which elevation for this iteration
-        whr = e < seek_elev  # where elev is below strat surface
-        t = np.maximum(_zero, (np.argmin(strata[:, ...] <= e, axis=0) - 1))
-        plate[whr] = int(1)  # track locations in the plate
-
-        xy = plate.nonzero()
-        ks = np.full((np.count_nonzero(plate)), k)  # might be faster way
-        idxs = t[xy]  # must happen before incrementing counter
-
-        strat_ks = np.column_stack((ks, *xy))
-        data_idxs = np.column_stack((idxs, *xy))
-        strat_coords.append(strat_ks)  # list of numpy arrays
-        data_coords.append(data_idxs)
-
-    strat_coords = np.vstack(strat_coords)  # to single (N x 3) array
-    data_coords = np.vstack(data_coords)
+    z = np.asarray(z)
+    nt = strata.shape[0]
+    _xy_shape = strata.shape[1:] if (strata.ndim > 1) else (1,)
+    _strata = strata.reshape((nt, -1))  # t-by-column
+    strat_dtype = _coordinate_dtype((len(z), *strata.shape[1:]))
+    data_dtype = _coordinate_dtype(strata.shape)
+
+    # number of preserved elevations of each column: every elevation below
+    # the final surface, or below any higher elevation below the surface
+    _top = _strata[-1, :]
+    _lowest_above = np.minimum.accumulate(z[::-1])[::-1]
+    n_preserved = np.searchsorted(_lowest_above, _top, side='left')
+    _nan_base = np.zeros(_top.shape, dtype=bool)
+    if np.issubdtype(_strata.dtype, np.floating):
+        n_preserved[np.isnan(_top)] = 0
+        _nan_base = np.isnan(_strata[0, :])
+
+    # the preserved elevations of all columns, column after column
+    ncols = _strata.shape[1]
+    _start = np.cumsum(n_preserved) - n_preserved
+    _k = np.arange(n_preserved.sum()) - np.repeat(_start, n_preserved)
+
+    # a surface is at or below z[k] if fewer than rank(z[k]) + 1 elevations
+    # are below the surface. Ranks are offset by column, so that the ranks
+    # of all columns, one column after another, never decrease, and all
+    # elevations of all columns are searched at once (compared at the
+    # precision of ``strata <= z[k]``)
+    _z = z.astype(np.result_type(_strata, *z[:1]), copy=False)
+    _z_sorted = np.unique(_z)
+    _offset = np.arange(ncols) * (len(_z_sorted) + 1)
+    _ranks = (np.searchsorted(_z_sorted, _strata.T, side='left')
+              + _offset[:, np.newaxis])  # column-by-t
+    _query = np.searchsorted(_z_sorted, _z)[_k]
+    del _k
+    _query += np.repeat(_offset, n_preserved)
+    _n_below = np.searchsorted(_ranks.ravel(), _query, side='right')
+    del _query, _ranks
+    _n_below -= np.repeat(np.arange(ncols) * nt, n_preserved)
+
+    # time interval recorded: the last time the surface is below z[k]
+    _n_below[_n_below == nt] = 0
+    _n_below -= 1
+    _t = np.maximum(_n_below, 0).astype(data_dtype)
+    del _n_below
+
+    # ordered by elevation from the top, then by column
+    _from_top = np.arange(len(z) - 1, -1, -1)
+    _levels, cols = np.nonzero(
+        n_preserved[np.newaxis, :] > _from_top[:, np.newaxis])
+    k = _from_top.astype(strat_dtype)[_levels]
+    del _levels
+    t = _t[_start[cols] + k]
+    del _t
+    t[_nan_base[cols]] = 0
+
+    strat_coords = np.empty((cols.size, len(_xy_shape) + 1),
+                            dtype=strat_dtype)
+    data_coords = np.empty((cols.size, len(_xy_shape) + 1), dtype=data_dtype)
+    strat_coords[:, 0] = k
+    data_coords[:, 0] = t
+    del k, t
+    for _d, _c in enumerate(np.unravel_index(np.arange(ncols), _xy_shape)):
+        strat_coords[:, _d + 1] = _c.astype(strat_dtype)[cols]
+        data_coords[:, _d + 1] = strat_coords[:, _d + 1]
+
     return strat_coords, data_coords
 
 
+def _coordinate_dtype(shape):
+    """Smallest unsigned integer type to index an array of `shape`.
+    """
+    return np.min_scalar_type(max(max(shape) - 1, 0))
+
+
 def _determine_strat_coordinates(elev, z=None, dz=None, nz=None):
     """Return a valid Z array for stratigraphy based on inputs.
 
@@ -567,3 +819,163 @@ def _determine_strat_coordinates(elev, z=None, dz=None, nz=None):
         return np.linspace(min_dos, max_dos, num=nz, endpoint=True)
     else:
         raise RuntimeError('No coordinates determined. Check inputs.')
+
+
+def _compute_mesh_tile(eta, dtype):
+    """Compute the mesh stratigraphy attributes of a `t-x-y` tile.
+
+    Returns the stratal surfaces, the preserved index, and the count,
+    cumulative count, and elevation of the preserved voxels. See
+    :obj:`MeshStratigraphyAttributes`.
+    """
+    _strata, _psvd = _compute_elevation_to_preservation(eta)
+    _psvd[0, ...] = True
+
+    psvd_vxl_cnt = _psvd.sum(axis=0, dtype=int)
+    psvd_vxl_idx = _psvd.cumsum(axis=0, dtype=int)
+    psvd_vxl_cnt_max = int(psvd_vxl_cnt.max())
+    psvd_idx = _psvd.astype(bool)  # guarantee bool
+
+    # Determine the elevation of any voxel that is preserved.
+    # These are matrices that are size n_preserved-x-y.
+    #    psvd_vxl_eta : records eta for each entry in the preserved matrix.
+    #    Each preserved voxel is moved to its row in the preserved
+    #    matrix (its count along the column, from psvd_vxl_idx), for all
+    #    x-y columns at once.
+    psvd_vxl_eta = np.full((psvd_vxl_cnt_max, *eta.shape[1:]), np.nan,
+                           dtype=dtype)
+    _t, _i, _j = psvd_idx.nonzero()
+    _k = psvd_vxl_idx[_t, _i, _j] - 1
+    psvd_vxl_eta[_k, _i, _j] = eta[_t, _i, _j]
+    return _strata, psvd_idx, psvd_vxl_cnt, psvd_vxl_idx, psvd_vxl_eta
+
+
+def _merge_mesh_tiles(results, shape, dtype):
+    """Merge the mesh stratigraphy attributes of x-y tiles.
+    """
+    _first = results[0][1]
+    _strata = np.empty(shape, dtype=_first[0].dtype)
+    _psvd_idx = np.empty(shape, dtype=bool)
+    _cnt = np.empty(shape[1:], dtype=int)
+    _idx = np.empty(shape, dtype=int)
+    _cnt_max = max(int(_attrs[2].max()) for _, _attrs in results)
+    _vxl_eta = np.full((_cnt_max, *shape[1:]), np.nan, dtype=dtype)
+    for _tile, _attrs in results:
+        _txy = (slice(None),) + _tile
+        _strata[_txy] = _attrs[0]
+        _psvd_idx[_txy] = _attrs[1]
+        _cnt[_tile] = _attrs[2]
+        _idx[_txy] = _attrs[3]
+        _vxl_eta[(slice(0, _attrs[4].shape[0]),) + _tile] = _attrs[4]
+    return _strata, _psvd_idx, _cnt, _idx, _vxl_eta
+
+
+def _compute_boxy_coordinates_tile(elev, z):
+    """Compute the boxy stratigraphy coordinates of a `t-x-y` tile.
+    """
+    strata, _ = _compute_elevation_to_preservation(elev)
+    strata_coords, data_coords = _compute_preservation_to_cube(strata, z=z)
+    return strata_coords, data_coords, strata
+
+
+def _merge_coordinate_tiles(results, shape, nz):
+    """Merge the boxy stratigraphy coordinates of x-y tiles.
+
+    The coordinates of each tile are offset to the full domain, and sorted
+    to the order computed for the full domain at once (from the top of the
+    stratigraphy down, and by x-y within each elevation).
+    """
+    strat_dtype = _coordinate_dtype((nz, *shape[1:]))
+    data_dtype = _coordinate_dtype(shape)
+    strata = np.empty(shape, dtype=results[0][1][2].dtype)
+    strata_coords, data_coords = [], []
+    for _tile, (_sc, _dc, _strata) in results:
+        _sc, _dc = _sc.astype(strat_dtype), _dc.astype(data_dtype)
+        for _c in (_sc, _dc):
+            _c[:, 1] += _tile[0].start
+            _c[:, 2] += _tile[1].start
+        strata_coords.append(_sc)
+        data_coords.append(_dc)
+        strata[(slice(None),) + _tile] = _strata
+    strata_coords = np.vstack(strata_coords)
+    data_coords = np.vstack(data_coords)
+    _order = np.lexsort((strata_coords[:, 2], strata_coords[:, 1],
+                         -strata_coords[:, 0].astype(np.int64)))
+    return strata_coords[_order], data_coords[_order], strata
+
+
+def _compute_boxy_volume_tile(elev, prop, z, dtype):
+    """Compute the boxy stratigraphy volume of a `t-x-y` tile.
+    """
+    strata, _ = _compute_elevation_to_preservation(elev)
+    strata_coords, data_coords = _compute_preservation_to_cube(strata, z=z)
+
+    # copy data out and into the stratigraphy based on coordinates
+    stratigraphy = np.full((len(z), *prop.shape[1:]), np.nan,
+                           dtype=dtype)  # preallocate nans
+    _cut = np.take(prop,
+                   np.ravel_multi_index(tuple(data_coords.T), prop.shape))
+    np.put(stratigraphy,
+           np.ravel_multi_index(tuple(strata_coords.T), stratigraphy.shape),
+           _cut)
+    return stratigraphy
+
+
+def _map_xy_tiles(func, arrays, args=(), n_workers=None, tile_shape=None):
+    """Apply `func` to the x-y tiles of `t-x-y` arrays.
+
+    Stratigraphic columns are independent in x-y, so the domain is split
+    into tiles of `tile_shape`, and ``func(*tiles_of_arrays, *args)`` is
+    computed for each tile, in a pool of `n_workers` processes if given.
+    Returns a list of ``(tile, result)`` pairs, where `tile` is a tuple of
+    the x and y slices of the tile (an empty tuple if not tiled).
+    """
+    arrays = [_as_ndarray(_arr) for _arr in arrays]
+    _shape = arrays[0].shape
+    if not (n_workers is None):
+        if not (int(n_workers) == n_workers) or (n_workers < 1):
+            raise ValueError(
+                '"n_workers" must be a positive integer, but was: %s'
+                % n_workers)
+        n_workers = int(n_workers)
+        if tile_shape is None:
+            tile_shape = (-(-_shape[1] // n_workers), _shape[2])
+
+    if tile_shape is None:
+        _tiles = [()]
+    else:
+        if len(_shape) != 3:
+            raise ValueError(
+                'Input arrays must be three-dimensional to use tiles.')
+        if (len(tile_shape) != 2) or (min(tile_shape) < 1):
+            raise ValueError(
+                '"tile_shape" must be two positive integers, but was: %s'
+                % str(tile_shape))
+        _tiles = [(slice(i, min(i + tile_shape[0], _shape[1])),
+                   slice(j, min(j + tile_shape[1], _shape[2])))
+                  for i in range(0, _shape[1], tile_shape[0])
+                  for j in range(0, _shape[2], tile_shape[1])]
+
+    def _tile_arrays(_tile):
+        return [_arr[(slice(None),) + _tile] for _arr in arrays]
+
+    if (n_workers is None) or (n_workers == 1) or (len(_tiles) == 1):
+        return [(_tile, func(*_tile_arrays(_tile), *args))
+                for _tile in _tiles]
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=n_workers) as _pool:
+        _futures = [_pool.submit(func, *_tile_arrays(_tile), *args)
+                    for _tile in _tiles]
+        return [(_tile, _future.result())
+                for _tile, _future in zip(_tiles, _futures)]
+
+
+def _as_ndarray(arr):
+    """Values of an `ndarray`, `DataArray`, or `CubeVariable`.
+    """
+    if isinstance(arr, np.ndarray):
+        return arr
+    elif isinstance(arr, xr.core.dataarray.DataArray):
+        return arr.values
+    else:  # case where arr is a CubeVariable
+        return arr.data.values
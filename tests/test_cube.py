@@ -1,9 +1,12 @@
 import pytest
 
+import os
+
 import numpy as np
 import xarray as xr
 
 from deltametrics import cube
+from deltametrics import io
 
 from deltametrics import plot
 from deltametrics import section
@@ -115,6 +118,75 @@ class TestDataCubeNoStratigraphy:
         with pytest.raises(utils.NoStratigraphyError):
             rcm8cube.sections['testsection']['velocity'].as_stratigraphy()
 
+    def test_init_cube_chunks(self):
+        rcm8cube = cube.DataCube(rcm8_path, chunks='plan')
+        assert rcm8cube.dataio.chunks == 'plan'
+        assert rcm8cube.shape == self.fixeddatacube.shape
+        assert np.all(rcm8cube['eta'][-1, :, :].values ==
+                      self.fixeddatacube['eta'][-1, :, :].values)
+
+    def test_chunked_cube_section_matches(self):
+        rcm8cube = cube.DataCube(rcm8_path, chunks='section')
+        sc = section.StrikeSection(rcm8cube, y=10)
+        fsc = section.StrikeSection(self.fixeddatacube, y=10)
+        assert np.all(sc['velocity'] == fsc['velocity'])
+
+    def test_read_window(self):
+        rcm8cube = cube.DataCube(rcm8_path)
+        rcm8cube.read('eta', t=slice(10, 20), region=(5, 50, 0, 100))
+        assert rcm8cube.dataio._in_memory_data == {}
+        _window, _arr = rcm8cube.dataio._in_memory_windows['eta']
+        assert _arr.shape == (10, 45, 100)
+        # inside the window
+        assert np.all(rcm8cube['eta'][12:15, 10, :50].values ==
+                      self.fixeddatacube['eta'][12:15, 10, :50].values)
+        assert rcm8cube['eta'][15, 5:50, :100].shape == (45, 100)
+        # outside the window
+        assert np.all(rcm8cube['eta'][-1, :, :].values ==
+                      self.fixeddatacube['eta'][-1, :, :].values)
+
+    def test_read_window_then_all(self):
+        rcm8cube = cube.DataCube(rcm8_path)
+        rcm8cube.read(['eta', 'velocity'], t=5)
+        assert len(rcm8cube.dataio._in_memory_windows) == 2
+        rcm8cube.read('eta')
+        assert list(rcm8cube.dataio._in_memory_windows.keys()) == ['velocity']
+        assert rcm8cube['eta'][5, ...].shape == (120, 240)
+
+    def test_read_window_invalid(self):
+        rcm8cube = cube.DataCube(rcm8_path)
+        with pytest.raises(ValueError):
+            rcm8cube.read('eta', region=(0, 10))
+        with pytest.raises(ValueError):
+            rcm8cube.read('eta', t=slice(10, 5))
+
+    def test_cache_info(self):
+        rcm8cube = cube.DataCube(rcm8_path, cache_bytes=1e9)
+        _hits, _misses = rcm8cube.dataio.cache_info[:2]
+        _ = rcm8cube['eta'][5, ...]
+        assert rcm8cube.dataio.cache_info.misses == _misses + 1
+        rcm8cube.read('eta')
+        _ = rcm8cube['eta'][5, ...]
+        assert rcm8cube.dataio.cache_info.hits == _hits + 1
+        rcm8cube.read('velocity', t=slice(0, 10))
+        _ = rcm8cube['velocity'][5, ...]
+        _ = rcm8cube['velocity'][20, ...]
+        assert rcm8cube.dataio.cache_info.hits == _hits + 2
+        assert rcm8cube.dataio.cache_info.misses == _misses + 2
+        assert rcm8cube.dataio.cache_info.maxbytes == 1e9
+
+    def test_get_many(self):
+        _vars = ['eta', 'velocity', 'discharge']
+        ds = self.fixeddatacube.get_many(_vars, (-1, slice(5, 10)))
+        assert isinstance(ds, xr.Dataset)
+        for var in _vars:
+            assert np.all(ds[var].values ==
+                          self.fixeddatacube[var][-1, 5:10, :].values)
+        ds = self.fixeddatacube.get_many(_vars, (..., 3))
+        assert ds['eta'].shape == self.fixeddatacube.shape[:2]
+        with pytest.raises(IndexError):
+            self.fixeddatacube.get_many(_vars, (1, 2, 3, 4))
+
     def test_fixeddatacube_init_varset(self):
         assert type(self.fixeddatacube.varset) is plot.VariableSet
 
@@ -175,6 +247,26 @@ class TestDataCubeNoStratigraphy:
     def test_fixeddatacube_T(self):
         assert self.fixeddatacube.T.shape == (51, 120, 240)
 
+    def test_fixeddatacube_T_broadcast(self):
+        _T = self.fixeddatacube.T
+        assert _T.strides[1:] == (0, 0)
+        assert not _T.flags.writeable
+        assert np.all(_T[:, 10, 20] == self.fixeddatacube.t)
+
+    def test_time_variable_broadcast(self):
+        _time = self.fixeddatacube['time']
+        assert _time.shape == (51, 120, 240)
+        assert _time.data.values.strides[1:] == (0, 0)
+        assert np.all(_time[:, 10, 20].values == self.fixeddatacube.t)
+
+    def test_dict_cube_X_Y_broadcast(self):
+        dictcube = cube.DataCube({'eta': np.zeros((5, 10, 15)),
+                                  'x': np.arange(10), 'y': np.arange(15)})
+        _X, _Y = np.meshgrid(np.arange(10), np.arange(15))
+        assert np.all(dictcube.X == _X)
+        assert np.all(dictcube.Y == _Y)
+        assert dictcube.X.strides[0] == 0
+
     def test_fixeddatacube_H(self):
         assert self.fixeddatacube.H == 51
 
@@ -271,6 +363,86 @@ class TestDataCubeWithStratigraphy:
         assert _take2.shape == (51, 240)
 
 
+class TestPrefetchCube:
+
+    fixeddatacube = cube.DataCube(rcm8_path)
+    prefetchcube = cube.DataCube(rcm8_path, prefetch=2)
+
+    def test_time_sweep(self):
+        for t in range(self.fixeddatacube.shape[0]):
+            assert np.all(self.prefetchcube['eta'][t, :, :].values ==
+                          self.fixeddatacube['eta'][t, :, :].values)
+
+    def test_stratigraphy_from_prefetch(self):
+        _cube = cube.DataCube(rcm8_path, prefetch=2)
+        _ = _cube['eta'][3, :, :]
+        sc = cube.StratigraphyCube.from_DataCube(_cube, dz=0.1)
+        fc = cube.StratigraphyCube.from_DataCube(self.fixeddatacube, dz=0.1)
+        assert np.all(sc.z == fc.z)
+        assert np.all(sc['eta'].data.values == fc['eta'].data.values,
+                      where=np.isfinite(fc['eta'].data.values))
+
+    def test_prefetch_unsupported(self, tmp_path):
+        _path = str(tmp_path / 'rcm8.zarr')
+        self.fixeddatacube.to_file(_path, variables=['eta'])
+        with pytest.raises(ValueError):
+            _ = cube.DataCube(_path, prefetch=2)
+        with pytest.raises(ValueError, match=r'Reading ahead'):
+            _ = cube.DataCube([rcm8_path, rcm8_path], prefetch=2)
+        with pytest.raises(ValueError, match=r'Reading ahead'):
+            _ = cube.DataCube({'eta': np.zeros((5, 10, 15))}, prefetch=2)
+
+
+class TestFastOpenCube:
+
+    fixeddatacube = cube.DataCube(rcm8_path)
+
+    def test_matches_default(self):
+        fastcube = cube.DataCube(rcm8_path, fast_open=True)
+        assert fastcube.dataio._dataset is None
+        assert fastcube.shape == self.fixeddatacube.shape
+        assert fastcube.variables == self.fixeddatacube.variables
+        assert np.all(fastcube.t == self.fixeddatacube.t)
+        assert np.all(fastcube.x == self.fixeddatacube.x)
+        assert np.all(fastcube['eta'][10, :, 5].values ==
+                      self.fixeddatacube['eta'][10, :, 5].values)
+
+    def test_fast_open_unsupported(self, tmp_path):
+        _path = str(tmp_path / 'rcm8.zarr')
+        self.fixeddatacube.to_file(_path, variables=['eta'])
+        with pytest.raises(ValueError):
+            _ = cube.DataCube(_path, fast_open=True)
+        with pytest.raises(ValueError, match=r'Fast opening'):
+            _ = cube.DataCube([rcm8_path, rcm8_path], fast_open=True)
+        with pytest.raises(ValueError, match=r'Fast opening'):
+            _ = cube.DataCube({'eta': np.zeros((5, 10, 15))}, fast_open=True)
+
+
+class TestDtypeCube:
+
+    def test_default_dtype(self):
+        rcm8cube = cube.DataCube(rcm8_path, stratigraphy_from='eta')
+        assert rcm8cube.dtype is None
+        assert rcm8cube.strat_attr.psvd_flld.dtype == np.float64
+
+    def test_float32_dtype(self):
+        rcm8cube = cube.DataCube(rcm8_path, stratigraphy_from='eta',
+                                 dtype='float32')
+        assert rcm8cube.dtype == np.float32
+        assert rcm8cube.strat_attr.psvd_flld.dtype == np.float32
+        assert rcm8cube.strat_attr.psvd_vxl_eta.dtype == np.float32
+        sc8cube = cube.StratigraphyCube.from_DataCube(rcm8cube)
+        assert sc8cube.dtype == np.float32
+        assert sc8cube.strata.dtype == np.float32
+        assert sc8cube['velocity'].data.dtype == np.float32
+        sc = section.StrikeSection(sc8cube, y=5)
+        assert sc['velocity'].dtype == np.float32
+
+    def test_invalid_dtype(self):
+        with pytest.raises(TypeError):
+            _ = cube.DataCube(rcm8_path, dtype='int32')
+
+
 class TestStratigraphyCube:
 
     # create a fixed cube for variable existing, type checks
@@ -287,6 +459,55 @@ class TestStratigraphyCube:
         frzn = self.fixedstratigraphycube.export_frozen_variable('time')
         assert frzn.ndim == 3
 
+    def test_export_frozen_variable_cube(self, tmp_path):
+        _path = str(tmp_path / 'frozen.nc')
+        frzn = self.fixedstratigraphycube.export_frozen_variable(
+            'velocity', return_cube=True, data_path=_path, dtype='float32')
+        assert type(frzn) is cube.StratigraphyCube
+        assert frzn.shape == self.fixedstratigraphycube.shape
+        assert frzn['velocity'].data.dtype == np.float32
+
+    def test_export_frozen_variable_cube_no_path(self):
+        with pytest.raises(ValueError):
+            _ = self.fixedstratigraphycube.export_frozen_variable(
+                'velocity', return_cube=True)
+
+    def test_stratigraphic_data_reused(self):
+        first = self.fixedstratigraphycube['velocity'].data.values
+        second = self.fixedstratigraphycube['velocity'].data.values
+        assert np.shares_memory(first, second)
+        assert not first.flags.writeable
+
+    def test_stratigraphic_data_dtype(self):
+        sc32 = cube.StratigraphyCube(
+            self.fixeddatacube, stratigraphy_from='eta', dz=0.1,
+            dtype='float32')
+        v32 = sc32['velocity'].data.values
+        v64 = self.fixedstratigraphycube['velocity'].data.values
+        assert v32.dtype == np.float32
+        assert np.allclose(v32, v64, equal_nan=True)
+
+    def test_stratigraphic_data_cache_bytes(self):
+        sc = cube.StratigraphyCube(
+            self.fixeddatacube, stratigraphy_from='eta', dz=0.1,
+            cache_bytes=0)
+        first = sc['velocity'].data.values
+        second = sc['velocity'].data.values
+        assert not np.shares_memory(first, second)
+        assert np.array_equal(first, second, equal_nan=True)
+
+    def test_get_many(self):
+        sc = cube.StratigraphyCube.from_DataCube(self.fixeddatacube)
+        _vars = ['velocity', 'discharge', 'time']
+        ds = sc.get_many(_vars, (slice(None), 10))
+        assert isinstance(ds, xr.Dataset)
+        assert ds['velocity'].dims == ('z', 'y')
+        for var in _vars:
+            assert np.array_equal(ds[var].values,
+                                  sc[var].data.values[:, 10, :],
+                                  equal_nan=True)
+        assert 'velocity' in sc._stratigraphic_data
+
     def test_var_export_frozen(self):
         fv = self.fixedstratigraphycube['time'].as_frozen()
         assert isinstance(fv, np.ndarray)
@@ -295,6 +516,105 @@ class TestStratigraphyCube:
         assert fv.ndim == 3
 
 
+class TestStratigraphyCubeFile:
+
+    fixeddatacube = cube.DataCube(rcm8_path)
+    fixedstratigraphycube = cube.StratigraphyCube.from_DataCube(fixeddatacube)
+
+    def test_to_file_and_reload(self, tmp_path):
+        p = str(tmp_path / 'sc8cube.nc')
+        self.fixedstratigraphycube.to_file(p, variables=['velocity'])
+        sc = cube.StratigraphyCube(p)
+        assert sc.shape == self.fixedstratigraphycube.shape
+        assert sc.source_path == rcm8_path
+        assert np.all(sc.z == self.fixedstratigraphycube.z)
+        assert np.all(sc.strata_coords ==
+                      self.fixedstratigraphycube.strata_coords)
+        assert np.all(sc.data_coords ==
+                      self.fixedstratigraphycube.data_coords)
+        assert np.all(sc.strata == self.fixedstratigraphycube.strata)
+        assert sc._frozen_variables == ['velocity']
+        assert 'eta' in sc.variables
+
+    def test_to_file_does_not_keep_variables(self, tmp_path):
+        p = str(tmp_path / 'sc8cube.nc')
+        sc8cube = cube.StratigraphyCube.from_DataCube(self.fixeddatacube)
+        sc8cube.to_file(p, variables=['velocity', 'eta'])
+        assert len(sc8cube._stratigraphic_data) == 0
+
+    def test_reloaded_variables_match(self, tmp_path):
+        p = str(tmp_path / 'sc8cube.hdf5')
+        self.fixedstratigraphycube.to_file(p, variables=['velocity'])
+        sc = cube.StratigraphyCube(p)
+        assert sc.dataio.type == 'hdf5'
+        for var in ['velocity', 'eta', 'time']:
+            assert np.allclose(
+                sc[var].data.values,
+                self.fixedstratigraphycube[var].data.values,
+                equal_nan=True)
+
+    def test_reloaded_section(self, tmp_path):
+        p = str(tmp_path / 'sc8cube.nc')
+        self.fixedstratigraphycube.to_file(p)
+        sc = cube.StratigraphyCube(p)
+        sc.register_section('test', section.StrikeSection(y=10))
+        assert sc.sections['test']['velocity'].shape == \
+            self.fixedstratigraphycube.shape[::2]
+
+    def test_reloaded_from_zarr(self, tmp_path):
+        p = str(tmp_path / 'sc8cube.zarr')
+        self.fixedstratigraphycube.to_file(p, variables=['velocity'])
+        sc = cube.StratigraphyCube(p)
+        assert sc.dataio.type == 'zarr'
+        assert np.all(sc.strata == self.fixedstratigraphycube.strata)
+        assert np.allclose(
+            sc['velocity'].data.values,
+            self.fixedstratigraphycube['velocity'].data.values,
+            equal_nan=True)
+
+    def test_datacube_from_zarr(self, tmp_path):
+        p = str(tmp_path / 'rcm8cube.zarr')
+        self.fixeddatacube.to_file(p, variables=['eta', 'velocity'])
+        dc = cube.DataCube(p, chunks={})
+        assert dc.dataio.type == 'zarr'
+        assert dc.variables == ['eta', 'velocity']
+        assert np.all(dc['eta'].data.values ==
+                      self.fixeddatacube['eta'].data.values)
+
+    def test_datacube_from_memmap(self, tmp_path):
+        p = str(tmp_path / 'rcm8cube.mmap')
+        io.MemmapIO.from_NetCDFIO(self.fixeddatacube.dataio, p)
+        dc = cube.DataCube(p)
+        assert dc.dataio.type == 'mmap'
+        assert dc.variables == self.fixeddatacube.variables
+        assert np.all(dc['velocity'].data.values ==
+                      self.fixeddatacube['velocity'].data.values)
+        sc = cube.StratigraphyCube.from_DataCube(dc)
+        assert np.all(sc.strata == self.fixedstratigraphycube.strata)
+
+    def test_no_stratigraphy_in_file(self):
+        with pytest.raises(ValueError, match=r'No stratigraphy found *.'):
+            _ = cube.StratigraphyCube(rcm8_path)
+
+    def test_to_file_over_connected_file(self):
+        with pytest.raises(ValueError):
+            self.fixeddatacube.to_file(rcm8_path)
+
+    @pytest.mark.parametrize('ext', ['.nc', '.zarr', '.mmap'])
+    def test_to_file_failed_removes_new_file(self, tmp_path, ext):
+        p = str(tmp_path / ('failed' + ext))
+        with pytest.raises(AttributeError):
+            self.fixeddatacube.to_file(p, variables=['not_a_variable'])
+        assert not os.path.exists(p)
+
+    def test_to_file_failed_keeps_existing_file(self, tmp_path):
+        p = str(tmp_path / 'existing.nc')
+        self.fixeddatacube.to_file(p, variables=['eta'])
+        with pytest.raises(TypeError):
+            self.fixeddatacube.to_file(p, variables=['eta'], dtype='float16')
+        assert 'eta' in cube.DataCube(p).variables
+
+
 class TestFrozenStratigraphyCube:
 
     fixeddatacube = cube.DataCube(rcm8_path)
@@ -316,6 +636,124 @@ class TestFrozenStratigraphyCube:
         assert np.all(fixd_log == frzn_log)
 
 
+def _split_rcm8(tmp_path):
+    """Split the rcm8 file into two files along time."""
+    _ds = xr.open_dataset(rcm8_path)
+    _paths = [str(tmp_path / 'rcm8_a.nc'), str(tmp_path / 'rcm8_b.nc')]
+    _ds.isel(time=slice(0, 20)).to_netcdf(_paths[0])
+    _ds.isel(time=slice(20, None)).to_netcdf(_paths[1])
+    _ds.close()
+    return _paths
+
+
+class TestMultiFileCube:
+
+    fixeddatacube = cube.DataCube(rcm8_path)
+
+    def test_init_from_list(self, tmp_path):
+        _paths = _split_rcm8(tmp_path)
+        mfcube = cube.DataCube(_paths)
+        assert type(mfcube.dataio) is io.MultiNetCDFIO
+        assert mfcube.data_path == _paths
+        assert mfcube.shape == self.fixeddatacube.shape
+        assert mfcube.variables == self.fixeddatacube.variables
+        assert np.all(mfcube.t == self.fixeddatacube.t)
+        assert np.all(mfcube['eta'][18:22, 10, :].values ==
+                      self.fixeddatacube['eta'][18:22, 10, :].values)
+
+    def test_init_from_pattern(self, tmp_path):
+        _paths = _split_rcm8(tmp_path)
+        mfcube = cube.DataCube(str(tmp_path / 'rcm8_*.nc'))
+        assert mfcube.data_path == _paths
+
+    def test_pattern_no_match(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            _ = cube.DataCube(str(tmp_path / 'nothing_*.nc'))
+
+    def test_section_matches(self, tmp_path):
+        mfcube = cube.DataCube(_split_rcm8(tmp_path))
+        sc = section.StrikeSection(mfcube, y=10)
+        fsc = section.StrikeSection(self.fixeddatacube, y=10)
+        assert np.all(sc['velocity'] == fsc['velocity'])
+
+    def test_to_file_over_connected_file(self, tmp_path):
+        _paths = _split_rcm8(tmp_path)
+        mfcube = cube.DataCube(_paths)
+        with pytest.raises(ValueError):
+            mfcube.to_file(_paths[1])
+
+
+class TestEnsembleCube:
+
+    fixeddatacube = cube.DataCube(rcm8_path)
+    ensemblecube = cube.EnsembleCube([rcm8_path, rcm8_path])
+
+    def test_shape(self):
+        assert self.ensemblecube.R == 2
+        assert self.ensemblecube.shape == (2, *self.fixeddatacube.shape)
+        assert self.ensemblecube['eta'].shape == (2, *self.fixeddatacube.shape)
+        assert np.all(self.ensemblecube.t == self.fixeddatacube.t)
+
+    def test_vectorized_slice(self):
+        _final = self.ensemblecube['eta'][:, -1, :, :]
+        assert _final.shape == (2, 120, 240)
+        assert np.all(_final[1].values ==
+                      self.fixeddatacube['eta'][-1, :, :].values)
+
+    def test_coords(self):
+        assert self.ensemblecube['time'].shape == self.fixeddatacube.t.shape
+
+    def test_member(self):
+        _member = self.ensemblecube.member(1)
+        assert type(_member) is cube.DataCube
+        assert _member.data_path == rcm8_path
+
+    def test_single_path(self):
+        _ensemble = cube.EnsembleCube(rcm8_path)
+        assert _ensemble.R == 1
+
+    def test_to_file_not_supported(self, tmp_path):
+        with pytest.raises(NotImplementedError):
+            self.ensemblecube.to_file(str(tmp_path / 'ensemble.nc'))
+
+
+class TestDictCube:
+
+    fixeddatacube = cube.DataCube(rcm8_path)
+
+    def test_init_from_dict(self):
+        _eta = self.fixeddatacube['eta'].data.values
+        dictcube = cube.DataCube({'eta': _eta,
+                                  'time': self.fixeddatacube.t})
+        assert type(dictcube.dataio) is io.DictIO
+        assert dictcube.data_path is None
+        assert dictcube.shape == self.fixeddatacube.shape
+        assert dictcube.variables == ['eta']
+        assert np.all(dictcube.t == self.fixeddatacube.t)
+        assert np.shares_memory(dictcube['eta'].data.values, _eta)
+
+    def test_init_from_dataset(self):
+        dictcube = cube.DataCube(self.fixeddatacube.dataio.dataset)
+        assert type(dictcube.dataio) is io.DictIO
+        assert dictcube.shape == self.fixeddatacube.shape
+        assert np.all(dictcube['velocity'][10, :, 5].values ==
+                      self.fixeddatacube['velocity'][10, :, 5].values)
+
+    def test_stratigraphy(self):
+        dictcube = cube.DataCube(
+            {'eta': self.fixeddatacube['eta'].data.values},
+            stratigraphy_from='eta')
+        assert dictcube._knows_stratigraphy is True
+
+    def test_to_file(self, tmp_path):
+        _path = str(tmp_path / 'dict.nc')
+        dictcube = cube.DataCube(
+            {'eta': self.fixeddatacube['eta'].data.values})
+        dictcube.to_file(_path, variables=['eta'])
+        filecube = cube.DataCube(_path)
+        assert filecube.shape == dictcube.shape
+
+
 class TestLandsatCube:
 
     landsatcube = cube.DataCube(hdf_path)
@@ -2,11 +2,14 @@ import pytest
 
 import sys
 import os
+import mmap
+import warnings
 
 import numpy as np
 import xarray as xr
 
 from deltametrics import io
+from deltametrics import cube
 from deltametrics.sample_data import _get_rcm8_path, _get_landsat_path
 import utilities
 
@@ -26,6 +29,34 @@ def test_netcdf_io_keys():
     assert len(netcdf_io.keys) == 11
 
 
+def test_netcdf_io_chunks_passthrough():
+    netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf', chunks='auto')
+    assert netcdf_io.chunks == 'auto'
+    assert netcdf_io.dataset['eta'].chunks is not None
+
+
+def test_netcdf_io_chunks_plan():
+    netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf', chunks='plan')
+    _tchunks, _lchunks, _wchunks = netcdf_io.dataset['eta'].chunks
+    assert np.all(np.array(_tchunks) == 1)
+    assert len(_lchunks) == 1
+    assert len(_wchunks) == 1
+
+
+def test_netcdf_io_chunks_section():
+    netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf', chunks='section')
+    _tchunks, _lchunks, _wchunks = netcdf_io.dataset['eta'].chunks
+    assert len(_tchunks) == 1
+    assert np.all(np.array(_lchunks) <= io._SECTION_TILE)
+    assert np.all(np.array(_wchunks) <= io._SECTION_TILE)
+
+
+def test_netcdf_io_nochunks_default():
+    netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf')
+    assert netcdf_io.chunks is None
+    assert netcdf_io.dataset['eta'].chunks is None
+
+
 def test_netcdf_io_nomemory():
     netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf')
     dataset_size = sys.getsizeof(netcdf_io.dataset)
@@ -113,6 +144,14 @@ def test_invalid_file(tmp_path):
         io.NetCDFIO(p, 'netcdf')
 
 
+def test_unreadable_file(tmp_path):
+    p = tmp_path / 'unreadable.nc'
+    p.write_text('not a netcdf file')
+    with pytest.raises(TypeError) as excinfo:
+        io.NetCDFIO(str(p), 'netcdf')
+    assert isinstance(excinfo.value.__cause__, OSError)
+
+
 def test_readvar_intomemory():
     netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf')
     assert netcdf_io._in_memory_data == {}
@@ -133,3 +172,521 @@ def test_netcdf_no_metadata():
     # works fine, because there is no `connect` call in io init
     netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf')
     assert len(netcdf_io._in_memory_data.keys()) == 0
+
+
+def test_write_disabled_default():
+    netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf')
+    assert netcdf_io.writeable is False
+    rcm8cube = cube.DataCube(rcm8_path)
+    with pytest.raises(PermissionError):
+        netcdf_io.write(rcm8cube)
+
+
+def test_write_new_file(tmp_path):
+    p = str(tmp_path / 'written.nc')
+    netcdf_io = io.NetCDFIO(p, 'netcdf', write=True)
+    assert netcdf_io.keys == []
+    rcm8cube = cube.DataCube(rcm8_path)
+    netcdf_io.write(rcm8cube, variables=['eta'])
+    assert netcdf_io.known_variables == ['eta']
+    assert np.all(netcdf_io['eta'].values == rcm8cube['eta'].data.values)
+    assert np.all(netcdf_io['time'].values == rcm8cube.t)
+
+
+def test_write_coordinate_error(tmp_path):
+    p = str(tmp_path / 'written.nc')
+    netcdf_io = io.NetCDFIO(p, 'netcdf', write=True)
+    rcm8cube = cube.DataCube(rcm8_path)
+    with pytest.raises(ValueError):
+        netcdf_io.write(rcm8cube, variables=['time'])
+
+
+def test_read_group_missing():
+    netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf')
+    assert netcdf_io.read_group('nonexistant') is None
+
+
+def test_write_rewrite_file(tmp_path):
+    p = str(tmp_path / 'written.nc')
+    rcm8cube = cube.DataCube(rcm8_path)
+    netcdf_io = io.NetCDFIO(p, 'netcdf', write=True)
+    netcdf_io.write(rcm8cube, variables=['eta'])
+    netcdf_io.write(rcm8cube, variables=['velocity'])
+    assert netcdf_io.known_variables == ['velocity']
+
+
+def test_write_named_chunks_dtype(tmp_path):
+    p = str(tmp_path / 'written.nc')
+    rcm8cube = cube.DataCube(rcm8_path)
+    netcdf_io = io.NetCDFIO(p, 'netcdf', write=True)
+    netcdf_io.write(rcm8cube, variables=['eta', 'velocity'],
+                    chunksizes='section',
+                    dtype={'eta': 'float32', 'velocity': 'int8'})
+    assert netcdf_io['eta'].dtype == np.float32
+    assert netcdf_io['velocity'].dtype == np.int8
+    assert netcdf_io.dataset['eta'].encoding['chunksizes'] == (51, 64, 64)
+    netcdf_io.write(rcm8cube, variables=['eta'], chunksizes='plan')
+    assert netcdf_io.dataset['eta'].encoding['chunksizes'] == (1, 120, 240)
+
+
+def test_write_blosc(tmp_path):
+    p = str(tmp_path / 'written.nc')
+    rcm8cube = cube.DataCube(rcm8_path)
+    netcdf_io = io.NetCDFIO(p, 'netcdf', write=True)
+    netcdf_io.write(rcm8cube, variables=['eta'], compression='blosc',
+                    chunksizes='plan')
+    assert netcdf_io.dataset['eta'].encoding['chunksizes'] == (1, 120, 240)
+    assert np.all(netcdf_io['eta'].values == rcm8cube['eta'].data.values)
+    with pytest.raises(ValueError):
+        netcdf_io.write(rcm8cube, variables=['eta'], compression='lzma')
+
+
+def test_write_streams_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(io, '_WRITE_BLOCK_BYTES', 10000)
+    rcm8cube = cube.DataCube(rcm8_path)
+    for ext in ('.nc', '.zarr', '.mmap'):
+        p = str(tmp_path / ('written' + ext))
+        rcm8cube.to_file(p, variables=['eta', 'velocity'],
+                         chunksizes='section', dtype={'eta': 'float32'})
+        _cube = cube.DataCube(p)
+        assert _cube['eta'].data.dtype == np.float32
+        assert np.all(_cube['eta'].data.values ==
+                      rcm8cube['eta'].data.values.astype(np.float32))
+        assert np.all(_cube['velocity'].data.values ==
+                      rcm8cube['velocity'].data.values)
+    # nothing is left behind from writing
+    assert sorted(os.listdir(tmp_path)) == \
+        ['written.mmap', 'written.nc', 'written.zarr']
+
+
+@pytest.mark.parametrize('ext', ['.nc', '.zarr'])
+def test_write_default_mode(tmp_path, ext):
+    _umask = os.umask(0o022)
+    try:
+        p = str(tmp_path / ('rcm8' + ext))
+        cube.DataCube(rcm8_path).to_file(p, variables=['eta'])
+    finally:
+        os.umask(_umask)
+    _mode = 0o755 if os.path.isdir(p) else 0o644
+    assert (os.stat(p).st_mode & 0o777) == _mode
+
+
+def test_write_blocks():
+    assert io._write_blocks((51, 120, 240), 8, (51, 64, 64)) == (51, 64, 64)
+    assert io._write_blocks((51, 120, 240), 8, None)[1:] == (120, 240)
+    _blocks = list(io._iter_blocks((5, 3), (2, 2)))
+    assert len(_blocks) == 6
+    assert _blocks[-1] == (slice(4, 6), slice(2, 4))
+
+
+def test_zarr_io_write_new_store(tmp_path):
+    p = str(tmp_path / 'written.zarr')
+    zarr_io = io.ZarrIO(p, write=True)
+    assert zarr_io.type == 'zarr'
+    assert zarr_io.keys == []
+    rcm8cube = cube.DataCube(rcm8_path)
+    zarr_io.write(rcm8cube, variables=['eta'], chunksizes=(5, 20, 20))
+    assert zarr_io.known_variables == ['eta']
+    assert np.all(zarr_io['eta'].values == rcm8cube['eta'].data.values)
+    assert np.all(zarr_io['time'].values == rcm8cube.t)
+    assert zarr_io.dataset['eta'].encoding['chunks'] == (5, 20, 20)
+
+
+def test_zarr_io_chunks(tmp_path):
+    p = str(tmp_path / 'written.zarr')
+    rcm8cube = cube.DataCube(rcm8_path)
+    io.ZarrIO(p, write=True).write(rcm8cube, variables=['eta'],
+                                   chunksizes=(5, 20, 20))
+    zarr_io = io.ZarrIO(p, chunks={})
+    assert zarr_io.dataset['eta'].data.chunksize == (5, 20, 20)
+    zarr_io = io.ZarrIO(p, chunks='plan')
+    assert zarr_io.dataset['eta'].data.chunksize == (1, 120, 240)
+    zarr_io = io.ZarrIO(p)
+    assert isinstance(zarr_io.dataset['eta'].data, np.ndarray)
+
+
+def test_zarr_io_write_disabled_default(tmp_path):
+    p = str(tmp_path / 'written.zarr')
+    rcm8cube = cube.DataCube(rcm8_path)
+    io.ZarrIO(p, write=True).write(rcm8cube, variables=['eta'])
+    zarr_io = io.ZarrIO(p)
+    assert zarr_io.writeable is False
+    with pytest.raises(PermissionError):
+        zarr_io.write(rcm8cube)
+
+
+def test_zarr_io_read_group_missing(tmp_path):
+    p = str(tmp_path / 'written.zarr')
+    zarr_io = io.ZarrIO(p, write=True)
+    assert zarr_io.read_group('nonexistant') is None
+
+
+def test_memmap_io_from_netcdf(tmp_path):
+    p = str(tmp_path / 'rcm8.mmap')
+    netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf')
+    memmap_io = io.MemmapIO.from_NetCDFIO(netcdf_io, p)
+    assert memmap_io.type == 'mmap'
+    assert memmap_io.known_variables == netcdf_io.known_variables
+    assert memmap_io.known_coords == netcdf_io.known_coords
+    assert os.path.isfile(os.path.join(p, 'metadata.json'))
+    for var in ['eta', 'time', 'x']:
+        assert np.all(memmap_io[var].values == netcdf_io[var].values)
+
+
+def test_memmap_io_from_netcdf_variables(tmp_path):
+    p = str(tmp_path / 'rcm8.mmap')
+    netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf')
+    memmap_io = io.MemmapIO.from_NetCDFIO(netcdf_io, p, variables=['eta'])
+    assert memmap_io.known_variables == ['eta']
+
+
+def test_memmap_io_zero_copy(tmp_path):
+    p = str(tmp_path / 'rcm8.mmap')
+    netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf')
+    memmap_io = io.MemmapIO.from_NetCDFIO(netcdf_io, p, variables=['eta'])
+    _slc = memmap_io.dataset['eta'][3].values
+    assert _slc.flags.writeable is False
+    _base = _slc
+    while isinstance(_base, np.ndarray):
+        _base = _base.base
+    assert isinstance(_base, mmap.mmap)
+
+
+def test_memmap_io_write_new_directory(tmp_path):
+    p = str(tmp_path / 'written.mmap')
+    memmap_io = io.MemmapIO(p, write=True)
+    assert memmap_io.keys == []
+    rcm8cube = cube.DataCube(rcm8_path)
+    memmap_io.write(rcm8cube, variables=['eta'])
+    assert memmap_io.known_variables == ['eta']
+    assert np.all(memmap_io['eta'].values == rcm8cube['eta'].data.values)
+    memmap_io.write(rcm8cube, variables=['velocity'])
+    assert memmap_io.known_variables == ['velocity']
+    assert not os.path.isfile(os.path.join(p, 'eta.npy'))
+
+
+def test_memmap_io_write_disabled_default(tmp_path):
+    p = str(tmp_path / 'written.mmap')
+    io.MemmapIO(p, write=True)
+    memmap_io = io.MemmapIO(p)
+    assert memmap_io.writeable is False
+    with pytest.raises(PermissionError):
+        memmap_io.write(cube.DataCube(rcm8_path))
+
+
+def test_memmap_io_read_copies(tmp_path):
+    p = str(tmp_path / 'rcm8.mmap')
+    netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf')
+    memmap_io = io.MemmapIO.from_NetCDFIO(netcdf_io, p, variables=['eta'])
+    memmap_io.read('eta', t=slice(0, 3))
+    memmap_io.read('eta')
+    assert memmap_io.cache_info.nbytes == memmap_io['eta'].nbytes
+    assert memmap_io['eta'].values.flags.writeable is True
+
+
+def test_minimal_io_subclass():
+    class _ListIO(io.BaseIO):
+        def connect(self):
+            self.dataset = xr.Dataset({'eta': (('time', 'x', 'y'),
+                                               np.zeros((2, 3, 4)))})
+            self.meta = None
+
+        def read_group(self, group):
+            return None
+
+        def write(self, CubeInstance):
+            raise NotImplementedError
+
+    _io = _ListIO(rcm8_path, 'list', write=False)
+    assert _io.known_variables == ['eta']
+    assert _io.keys == ['eta']
+    _io.read('eta', t=0)
+    assert _io.cache_info.hits == 0
+    assert _io._read_slice('eta', (2, 3, 4), (0, 1)).shape == (4,)
+    assert _io.cache_info.hits == 1
+
+
+def test_netcdf_io_shared_handle():
+    netcdf_io_a = io.NetCDFIO(rcm8_path, 'netcdf')
+    netcdf_io_b = io.NetCDFIO(rcm8_path, 'netcdf')
+    _key = [k for k in io._HANDLE_POOL.keys()
+            if k[0] == os.path.abspath(rcm8_path)]
+    assert len(_key) == 1
+    assert netcdf_io_a.meta is netcdf_io_b.meta
+    netcdf_io_a.dataset.close()
+    assert np.all(netcdf_io_b['eta'].values ==
+                  netcdf_io_a['eta'].values)
+
+
+def test_netcdf_io_modified_file_reopened(tmp_path):
+    p = str(tmp_path / 'written.nc')
+    rcm8cube = cube.DataCube(rcm8_path)
+    rcm8cube.to_file(p, variables=['eta'])
+    netcdf_io_a = io.NetCDFIO(p, 'netcdf')
+    rcm8cube.to_file(p, variables=['velocity'])
+    netcdf_io_b = io.NetCDFIO(p, 'netcdf')
+    assert netcdf_io_a.known_variables == ['eta']
+    assert netcdf_io_b.known_variables == ['velocity']
+    _key = [k for k in io._HANDLE_POOL.keys() if k[0] == p]
+    assert len(_key) == 1
+
+
+def test_netcdf_io_close(tmp_path):
+    p = str(tmp_path / 'written.nc')
+    cube.DataCube(rcm8_path).to_file(p, variables=['eta'])
+    netcdf_io_a = io.NetCDFIO(p, 'netcdf')
+    netcdf_io_b = io.NetCDFIO(p, 'netcdf')
+    netcdf_io_a.close()
+    assert len([k for k in io._HANDLE_POOL.keys() if k[0] == p]) == 1
+    netcdf_io_b.close()
+    assert len([k for k in io._HANDLE_POOL.keys() if k[0] == p]) == 0
+
+
+def test_handle_pool_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(io, '_HANDLE_POOL_SIZE', 1)
+    rcm8cube = cube.DataCube(rcm8_path)
+    _paths = [str(tmp_path / ('written_%s.nc' % i)) for i in range(3)]
+    for p in _paths:
+        rcm8cube.to_file(p, variables=['eta'])
+    for p in _paths:
+        io.NetCDFIO(p, 'netcdf')  # not used once opened
+    _pooled = [k[0] for k in io._HANDLE_POOL.keys() if k[0] in _paths]
+    assert _pooled == _paths[-1:]
+    netcdf_io = io.NetCDFIO(_paths[0], 'netcdf')
+    rcm8cube.to_file(str(tmp_path / 'other.nc'), variables=['eta'])
+    _ = io.NetCDFIO(str(tmp_path / 'other.nc'), 'netcdf')
+    # files in use are never closed
+    assert _paths[0] in [k[0] for k in io._HANDLE_POOL.keys()]
+    assert np.all(netcdf_io['eta'][0].values == rcm8cube['eta'][0].values)
+
+
+def test_write_invalidates_other_connections(tmp_path):
+    p = str(tmp_path / 'written.nc')
+    rcm8cube = cube.DataCube(rcm8_path)
+    rcm8cube.to_file(p, variables=['eta'])
+    netcdf_io = io.NetCDFIO(p, 'netcdf')
+    with pytest.warns(UserWarning, match=r'1 other connection'):
+        rcm8cube.to_file(p, variables=['velocity'])
+    del netcdf_io
+    with warnings.catch_warnings():
+        warnings.filterwarnings('error', message='Rewriting')
+        rcm8cube.to_file(p, variables=['eta'])
+
+
+def test_netcdf_io_read_window():
+    netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf')
+    netcdf_io.read('eta', t=slice(2, 6), region=(0, 10, 20, 40))
+    _window, _arr = netcdf_io._in_memory_windows['eta']
+    assert _window == (slice(2, 6), slice(0, 10), slice(20, 40))
+    assert np.all(_arr.values ==
+                  netcdf_io.dataset['eta'][2:6, 0:10, 20:40].values)
+    assert 'eta' not in netcdf_io._in_memory_data.keys()
+
+
+def test_index_in_window():
+    _shape = (51, 120, 240)
+    _window = io._expand_window(_shape, slice(10, 20), (0, 50, 100, 200))
+    assert io._index_in_window(_window, _shape, (12, 5, slice(100, 110))) == \
+        (2, 5, slice(0, 10, 1))
+    assert io._index_in_window(_window, _shape, (12, Ellipsis)) is None
+    assert io._index_in_window(_window, _shape, (slice(10, 20), 0, 150)) == \
+        (slice(0, 10, 1), 0, 50)
+    assert io._index_in_window(_window, _shape, (-40, 0, 150)) == (1, 0, 50)
+    assert io._index_in_window(_window, _shape, (5, 0, 150)) is None
+    assert io._index_in_window(_window, _shape, ([10, 11], 0, 150)) is None
+
+
+def test_netcdf_io_cache_bytes_evicts():
+    netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf')
+    _nbytes = netcdf_io.dataset['eta'].nbytes
+    netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf', cache_bytes=2.5 * _nbytes)
+    netcdf_io.read('eta')
+    netcdf_io.read('velocity')
+    assert list(netcdf_io._in_memory_data.keys()) == ['eta', 'velocity']
+    _ = netcdf_io['eta']  # eta is now the most recently used
+    netcdf_io.read('depth')
+    assert list(netcdf_io._in_memory_data.keys()) == ['eta', 'depth']
+    assert netcdf_io.cache_info.nbytes == 2 * _nbytes
+    assert netcdf_io.cache_info.maxbytes == 2.5 * _nbytes
+
+
+def test_evict_caches():
+    _first, _second = io._VariableCache(), io._VariableCache()
+    _first['a'] = np.zeros(10)
+    _second['b'] = np.zeros(10)
+    _first['c'] = np.zeros(10)
+    _ = _second['b']  # b is now the most recently used
+    io._evict_caches((_first, _second), None)
+    assert len(_first) + len(_second) == 3
+    io._evict_caches((_first, _second), 160)
+    assert list(_first.keys()) == ['c'] and list(_second.keys()) == ['b']
+    io._evict_caches((_first, _second), 0)
+    assert len(_first) + len(_second) == 0
+
+
+def test_netcdf_io_cache_bytes_dataset_not_loaded():
+    netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf', cache_bytes=1e9)
+    netcdf_io.read('eta')
+    assert netcdf_io.dataset['eta'].variable._in_memory is False
+    assert netcdf_io._in_memory_data['eta'].variable._in_memory is True
+
+
+def test_netcdf_io_cache_bytes_too_large():
+    netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf', cache_bytes=10)
+    netcdf_io.read('eta')
+    assert netcdf_io._in_memory_data == {}
+    assert netcdf_io.cache_info.nbytes == 0
+
+
+def test_dict_io_zero_copy():
+    _eta = np.random.rand(5, 10, 15)
+    dict_io = io.DictIO({'eta': _eta, 'time': np.arange(5) * 2.})
+    assert dict_io.known_variables == ['eta']
+    assert np.shares_memory(dict_io['eta'].values, _eta)
+    assert np.all(dict_io['time'].values == np.arange(5) * 2.)
+    assert np.all(dict_io['x'].values == np.arange(10))
+    dict_io.read('eta')
+    assert np.shares_memory(dict_io['eta'].values, _eta)
+
+
+def test_dict_io_from_dataset():
+    _ds = xr.open_dataset(rcm8_path)
+    dict_io = io.DictIO(_ds)
+    assert 'eta' in dict_io.known_variables
+    assert dict_io.read_group('meta') is None
+
+
+def test_dict_io_shape_mismatch():
+    with pytest.raises(ValueError):
+        _ = io.DictIO({'eta': np.zeros((5, 10, 15)),
+                       'velocity': np.zeros((5, 10, 10))})
+    with pytest.raises(ValueError):
+        _ = io.DictIO({'eta': np.zeros((10, 15))})
+    with pytest.raises(ValueError):
+        _ = io.DictIO({'eta': np.zeros((5, 10, 15)), 'time': np.arange(4)})
+
+
+def test_dict_io_write_disabled():
+    with pytest.raises(PermissionError):
+        _ = io.DictIO({'eta': np.zeros((5, 10, 15))}, write=True)
+
+
+def test_rechunk_dual_layout(tmp_path):
+    p = str(tmp_path / 'dual.nc')
+    io.rechunk(rcm8_path, p, variables=['eta', 'velocity'])
+    netcdf_io = io.NetCDFIO(p, 'netcdf')
+    assert netcdf_io.known_variables == ['eta', 'velocity']
+    assert netcdf_io.dataset['eta'].encoding['chunksizes'] == (51, 64, 64)
+    assert netcdf_io._plan_dataset['eta'].encoding['chunksizes'] == \
+        (1, 120, 240)
+    _slc = netcdf_io._read_layout('eta', (10, slice(None), slice(None)))
+    assert np.all(_slc.values == netcdf_io['eta'][10, :, :].values)
+    assert netcdf_io._read_layout('eta', (slice(None), 10, 10)) is None
+
+
+def test_rechunk_dual_layout_cube(tmp_path):
+    p = str(tmp_path / 'dual.zarr')
+    io.rechunk(rcm8_path, p)
+    rcm8cube = cube.DataCube(rcm8_path)
+    dualcube = cube.DataCube(p)
+    assert set(dualcube.variables) == set(rcm8cube.variables)
+    assert np.all(dualcube['eta'][-1, :, :].values ==
+                  rcm8cube['eta'][-1, :, :].values)
+    assert np.all(dualcube['eta'][:, 10, 10].values ==
+                  rcm8cube['eta'][:, 10, 10].values)
+
+
+def test_rechunk_read_into_memory(tmp_path):
+    p = str(tmp_path / 'dual.nc')
+    io.rechunk(rcm8_path, p, variables=['eta'])
+    dualcube = cube.DataCube(p)
+    dualcube.read('eta')
+    _hits = dualcube.dataio.cache_info.hits
+    for t in range(5):
+        _ = dualcube['eta'][t, :, :]
+    assert dualcube.dataio.cache_info.hits == _hits + 5
+    assert dualcube.dataio._read_layout('eta', (0, slice(None))) is None
+    windowcube = cube.DataCube(p)
+    windowcube.read('eta', t=slice(0, 3))
+    assert windowcube.dataio._read_layout('eta', (1, slice(None))) is None
+    assert not (windowcube.dataio._read_layout('eta', (4,)) is None)
+
+
+def test_rechunk_memmap_error(tmp_path):
+    with pytest.raises(ValueError):
+        io.rechunk(rcm8_path, str(tmp_path / 'dual.mmap'))
+
+
+def test_read_layout_single_layout():
+    netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf')
+    assert netcdf_io._read_layout('eta', (10, slice(None))) is None
+
+
+def test_netcdf_io_prefetch():
+    netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf', prefetch=3)
+    _slc = (10, slice(None), slice(None))
+    _arr = netcdf_io._read_slice('eta', netcdf_io['eta'].shape, _slc)
+    assert np.all(_arr.values == netcdf_io['eta'][10, :, :].values)
+    assert sorted(k[1] for k in netcdf_io._prefetched) == [11, 12, 13]
+    _slc = (11, slice(None), slice(None))
+    _arr = netcdf_io._read_slice('eta', netcdf_io['eta'].shape, _slc)
+    assert np.all(_arr.values == netcdf_io['eta'][11, :, :].values)
+    assert sorted(k[1] for k in netcdf_io._prefetched) == [12, 13, 14]
+    # sections are not read ahead
+    _slc = (slice(None), 10, slice(None))
+    assert netcdf_io._read_slice('eta', netcdf_io['eta'].shape, _slc) is None
+
+
+def test_netcdf_io_prefetch_stale_sweeps(monkeypatch):
+    monkeypatch.setattr(io, '_PREFETCH_SWEEPS', 1)
+    netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf', prefetch=2)
+    _slc = (10, slice(None), slice(None))
+    _ = netcdf_io._read_slice('eta', netcdf_io['eta'].shape, _slc)
+    _ = netcdf_io._read_slice('velocity', netcdf_io['velocity'].shape, _slc)
+    assert sorted(k[:2] for k in netcdf_io._prefetched.keys()) == \
+        [('velocity', 11), ('velocity', 12)]
+    _slc = (10, 5, slice(None))
+    _ = netcdf_io._read_slice('velocity', netcdf_io['velocity'].shape, _slc)
+    assert sorted(k[2][0] for k in netcdf_io._prefetched.keys()) == [5, 5]
+
+
+def test_netcdf_io_prefetch_close():
+    netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf', prefetch=2)
+    _slc = (10, slice(None), slice(None))
+    _ = netcdf_io._read_slice('eta', netcdf_io['eta'].shape, _slc)
+    _prefetcher = netcdf_io._prefetcher
+    netcdf_io.close()
+    assert netcdf_io._prefetcher is None
+    assert netcdf_io._prefetched == {}
+    with pytest.raises(RuntimeError):
+        _prefetcher.submit(print)
+
+
+def test_netcdf_io_prefetch_invalid():
+    with pytest.raises(ValueError):
+        _ = io.NetCDFIO(rcm8_path, 'netcdf', prefetch=-1)
+    with pytest.raises(ValueError):
+        _ = io.NetCDFIO(rcm8_path, 'netcdf', prefetch=2.5)
+
+
+def test_prefetch_key():
+    assert io._prefetch_key((51, 120, 240), (-1, slice(None), 10)) == \
+        (50, ((None, None, None), 10))
+    assert io._prefetch_key((51, 120, 240), (slice(0, 5), 10)) == \
+        (None, None)
+    assert io._prefetch_key((51, 120, 240), (5, [1, 2])) == (None, None)
+
+
+def test_netcdf_io_fast_open():
+    io._release_pooled(rcm8_path)
+    netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf', fast_open=True)
+    assert netcdf_io._dataset is None
+    assert netcdf_io._meta_connected is False
+    _netcdf_io = io.NetCDFIO(rcm8_path, 'netcdf')
+    assert netcdf_io.known_variables == _netcdf_io.known_variables
+    assert netcdf_io.known_coords == _netcdf_io.known_coords
+    assert netcdf_io._variable_shape('eta') == (51, 120, 240)
+    # opened on first access
+    assert netcdf_io.dataset['eta'].shape == (51, 120, 240)
+    assert (netcdf_io.meta is None) == (_netcdf_io.meta is None)
+    assert netcdf_io._meta_connected is True
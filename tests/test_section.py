@@ -734,6 +734,20 @@ class TestSectionFromStratigraphyCube:
         with pytest.raises(AttributeError):
             self.sc8cube.sections['test']['badvariablename']
 
+    def test_strat_getitem_section_only(self):
+        sc8cube = cube.StratigraphyCube.from_DataCube(self.rcm8cube)
+        sec = section.PathSection(
+            sc8cube, path=np.array([[10, 5], [50, 100], [10, 5]]))
+        for var in ['velocity', 'time']:
+            s = sec[var]
+            assert len(sc8cube._stratigraphic_data) == 0
+            _full = sc8cube[var].data.values[:, sec._y, sec._x]
+            assert np.array_equal(np.asarray(s), _full, equal_nan=True)
+            # data in memory are sliced directly
+            assert np.array_equal(np.asarray(sec[var]), _full,
+                                  equal_nan=True)
+            sc8cube._stratigraphic_data.pop(var)
+
     def test_strat_getitem_broken_cube(self):
         sass = section.StrikeSection(y=5)
         with pytest.raises(AttributeError, match=r'No cube connected.*.'):
@@ -67,6 +67,22 @@ class TestComputeBoxyStratigraphyVolume:
                            match=r'You must specify "z", "dz", or "nz.'):
             strat.compute_boxy_stratigraphy_volume(self.elev, self.time)
 
+    def test_tiled_matches(self):
+        s, e = strat.compute_boxy_stratigraphy_volume(
+            self.elev, self.time, dz=0.05)
+        st, et = strat.compute_boxy_stratigraphy_volume(
+            self.elev, self.time, dz=0.05, n_workers=2, tile_shape=(50, 70))
+        assert np.array_equal(s, st, equal_nan=True)
+        assert np.all(e == et)
+
+    def test_bad_tiles(self):
+        with pytest.raises(ValueError):
+            strat.compute_boxy_stratigraphy_volume(
+                self.elev, self.time, dz=0.05, n_workers=0)
+        with pytest.raises(ValueError):
+            strat.compute_boxy_stratigraphy_volume(
+                self.elev, self.time, dz=0.05, tile_shape=(10,))
+
 
 class TestComputeBoxyStratigraphyCoordinates:
 
@@ -105,6 +121,61 @@ class TestComputeBoxyStratigraphyCoordinates:
             strat.compute_boxy_stratigraphy_coordinates(
                 self.elev[:, 10, 120].squeeze())
 
+    def test_tiled_matches(self):
+        sc, dc, s = strat.compute_boxy_stratigraphy_coordinates(
+            self.elev, dz=0.05, return_strata=True)
+        sct, dct, st = strat.compute_boxy_stratigraphy_coordinates(
+            self.elev, dz=0.05, return_strata=True, tile_shape=(25, 30))
+        assert sct.dtype == sc.dtype
+        assert np.all(sct == sc)
+        assert np.all(dct == dc)
+        assert np.all(st == s)
+
+
+class TestMeshStratigraphyAttributes:
+
+    def test_tiled_matches(self):
+        sa = strat.MeshStratigraphyAttributes(rcm8cube['eta'])
+        sat = strat.MeshStratigraphyAttributes(
+            rcm8cube['eta'], n_workers=2, tile_shape=(60, 100))
+        assert sat.psvd_vxl_cnt_max == sa.psvd_vxl_cnt_max
+        for attr in ['strata', 'psvd_idx', 'psvd_vxl_cnt', 'psvd_vxl_idx',
+                     'psvd_vxl_eta', 'psvd_flld']:
+            assert np.array_equal(getattr(sat, attr), getattr(sa, attr),
+                                  equal_nan=True)
+
+    def test_matches_column_by_column(self):
+        rng = np.random.default_rng(0)
+        e = xr.DataArray(np.cumsum(rng.normal(0, 1, (30, 6, 8)), axis=0))
+        sa = strat.MeshStratigraphyAttributes(e.cubevar)
+        assert sa.psvd_vxl_eta.shape == (sa.psvd_vxl_cnt_max, 6, 8)
+        for i in range(6):
+            for j in range(8):
+                _n = sa.psvd_vxl_cnt[i, j]
+                _col = e.values[sa.psvd_idx[:, i, j], i, j]
+                assert np.all(sa.psvd_vxl_eta[:_n, i, j] == _col)
+                assert np.all(np.isnan(sa.psvd_vxl_eta[_n:, i, j]))
+                assert np.all(sa.psvd_flld[:_n, i, j] == _col)
+                assert np.all(sa.psvd_flld[_n:, i, j] == _col[-1])
+
+    def test_append_matches_recompute(self):
+        rng = np.random.default_rng(1)
+        e = np.cumsum(rng.normal(0, 1, (30, 6, 8)), axis=0)
+        sa = strat.MeshStratigraphyAttributes(xr.DataArray(e[:10]).cubevar)
+        sa.append(e[10])
+        sa.append(e[11:])
+        full = strat.MeshStratigraphyAttributes(xr.DataArray(e).cubevar)
+        for _attr in ('strata', 'psvd_idx', 'psvd_vxl_cnt', 'psvd_vxl_idx',
+                      'psvd_vxl_eta', 'psvd_flld'):
+            assert np.array_equal(getattr(sa, _attr), getattr(full, _attr),
+                                  equal_nan=True)
+        assert sa.psvd_vxl_cnt_max == full.psvd_vxl_cnt_max
+
+    def test_append_bad_shape(self):
+        sa = strat.MeshStratigraphyAttributes(rcm8cube['eta'])
+        with pytest.raises(ValueError, match=r'Mismatched shapes'):
+            sa.append(np.zeros((2, 3)))
+
 
 class TestComputeElevationToPreservation:
 
@@ -227,6 +298,34 @@ class TestComputeElevationToPreservation:
         assert np.all(s[-1, ...] == e[-1, ...])
         assert np.all(s[0, ...] == np.min(e, axis=0))
 
+    def test_3d_chunked_matches(self):
+        e = np.cumsum(np.random.normal(0, 1, (25, 6, 8)), axis=0)
+        s, p = strat._compute_elevation_to_preservation(e)
+        for chunk_size in [1, 4, 25]:
+            sc, pc = strat._compute_elevation_to_preservation(
+                e, chunk_size=chunk_size)
+            assert np.all(sc == s)
+            assert np.all(pc == p)
+
+    def test_3d_chunked_to_disk(self, tmp_path):
+        e = rcm8cube['eta']
+        s, p = strat._compute_elevation_to_preservation(e)
+        _s = np.lib.format.open_memmap(
+            str(tmp_path / 'strata.npy'), mode='w+', dtype=s.dtype,
+            shape=s.shape)
+        _p = np.lib.format.open_memmap(
+            str(tmp_path / 'psvd.npy'), mode='w+', dtype=bool, shape=s.shape)
+        sc, pc = strat._compute_elevation_to_preservation(
+            e, strata=_s, psvd=_p, chunk_size=8)
+        assert sc is _s
+        assert np.all(np.load(str(tmp_path / 'strata.npy')) == s)
+        assert np.all(np.load(str(tmp_path / 'psvd.npy')) == p)
+
+    def test_bad_chunk_size(self):
+        with pytest.raises(ValueError):
+            strat._compute_elevation_to_preservation(
+                np.zeros((6, 4, 4)), chunk_size=0)
+
 
 class TestComputePreservationToCube:
 
@@ -238,6 +337,34 @@ class TestComputePreservationToCube:
         sc3, dc3 = strat._compute_preservation_to_cube(np.array([1, 2, 3]), z)
         # assert np.all(sc1 == np.array([3, 2, 1, 0]))
 
+    @pytest.mark.parametrize('dtype', [np.float64, np.float32])
+    def test_matches_sweep_of_all_times(self, dtype):
+        e = np.cumsum(np.random.normal(0, 1, (20, 5, 6)), axis=0)
+        z = strat._determine_strat_coordinates(e, dz=0.25)
+        s, _ = strat._compute_elevation_to_preservation(e.astype(dtype))
+        sc, dc = strat._compute_preservation_to_cube(s, z)
+        # reference: sweep all times of all columns at every elevation
+        _sc, _dc = [], []
+        for k in np.arange(len(z) - 1, -1, -1):
+            t = np.maximum(0, np.argmin(s <= z[k], axis=0) - 1)
+            xy = (z[k] < s[-1]).nonzero()
+            _sc.append(np.column_stack((np.full(len(xy[0]), k), *xy)))
+            _dc.append(np.column_stack((t[xy], *xy)))
+        assert np.all(sc == np.vstack(_sc))
+        assert np.all(dc == np.vstack(_dc))
+
+    def test_compact_dtypes(self):
+        s = np.cumsum(np.ones((300, 4, 5)), axis=0)
+        z = np.arange(0, 300, step=1)
+        sc, dc = strat._compute_preservation_to_cube(s, z)
+        assert sc.dtype == np.uint16
+        assert dc.dtype == np.uint16
+        assert sc[:, 0].max() == 299
+        assert dc[:, 0].max() == 298
+        sc, dc = strat._compute_preservation_to_cube(s[:200], z[:200])
+        assert sc.dtype == np.uint8
+        assert dc.dtype == np.uint8
+
 
 class TestOneDimStratigraphyExamples:
     """Tests for various cases of 1d stratigraphy."""